@@ -0,0 +1,54 @@
+-- Índices compostos para os filtros do DataService
+-- Gerado com scripts/dev-tools/index-advisor.py a partir dos formatos de query do
+-- DataService (filtros por ano/mes/unidade/squad/tipo/categoria + intervalo de datas).
+-- CREATE INDEX CONCURRENTLY não roda dentro de transação: execute fora de BEGIN/COMMIT.
+
+-- ========== produtos_vendidos ==========
+
+-- Totais do resumo e listagem filtrados por ano/mes/unidade (squad filtrado no índice).
+-- Com select(produtos_vendidos), a soma vira index-only scan.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_produtos_vendidos_ano_mes_unidade_semana_domingo
+    ON produtos_vendidos (ano, mes, unidade, semana_domingo)
+    INCLUDE (produtos_vendidos, squad);
+
+-- Totais e listagem por intervalo de semana_domingo (data_inicio/data_fim)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_produtos_vendidos_semana_domingo
+    ON produtos_vendidos (semana_domingo)
+    INCLUDE (produtos_vendidos, unidade);
+
+-- Listas de filtros (unidades e squads disponíveis)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_produtos_vendidos_unidade
+    ON produtos_vendidos (unidade);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_produtos_vendidos_squad
+    ON produtos_vendidos (squad);
+
+-- ========== estornos_cancelamento ==========
+
+-- Totais de cancelamentos/estornos do resumo (sempre filtrados por tipo).
+-- Com select(valor), a soma vira index-only scan.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estornos_cancelamento_tipo_ano_mes_unidade_data
+    ON estornos_cancelamento (tipo, ano, mes, unidade, data)
+    INCLUDE (valor, categoria, squad);
+
+-- Listagem completa filtrada por ano/mes/unidade
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estornos_cancelamento_ano_mes_unidade_data
+    ON estornos_cancelamento (ano, mes, unidade, data);
+
+-- Listagem completa por intervalo de datas
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estornos_cancelamento_data
+    ON estornos_cancelamento (data);
+
+-- Listas de filtros (unidades, squads e categorias disponíveis)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estornos_cancelamento_unidade
+    ON estornos_cancelamento (unidade);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estornos_cancelamento_squad
+    ON estornos_cancelamento (squad);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estornos_cancelamento_categoria
+    ON estornos_cancelamento (categoria);
+
+-- Atualiza estatísticas e o visibility map (necessário para index-only scan)
+VACUUM (ANALYZE) estornos_cancelamento;
+VACUUM (ANALYZE) produtos_vendidos;
@@ -0,0 +1,179 @@
+-- Particionamento mensal (RANGE) das tabelas fato
+--
+--   produtos_vendidos      -> semana_domingo
+--   estornos_cancelamento  -> data
+--   dados_indicadores      -> data_referencia
+--
+-- Cada tabela é recriada como particionada, com uma partição por mês (tabela_pAAAAMM)
+-- e uma partição DEFAULT para datas fora das partições criadas. Com o predicado de
+-- data enviado pelo DataService, o PostgreSQL descarta (prune) as partições fora do
+-- período e o tempo das consultas recentes não cresce com o histórico.
+--
+-- Pré-requisitos: executar em janela de manutenção (a cópia bloqueia escritas) e
+-- garantir que não há linhas com data_venda/data_referencia nula. Em produtos_vendidos,
+-- semana_domingo é criada se não existir e preenchida a partir do período importado;
+-- a importação passa a gravá-la (ImportService.semana_domingo).
+-- Os índices da migration 001 são recriados aqui na tabela particionada.
+
+-- ========== Funções de manutenção ==========
+
+-- Domingo que fecha a semana de `dia` (mesma regra de ImportService.semana_domingo)
+CREATE OR REPLACE FUNCTION domingo_da_semana(dia DATE)
+RETURNS DATE AS $$
+    SELECT dia + (7 - EXTRACT(ISODOW FROM dia)::INTEGER) % 7
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Cria as partições mensais de `tabela` cobrindo os meses de `inicio` a `fim`
+CREATE OR REPLACE FUNCTION criar_particoes_mensais(tabela TEXT, inicio DATE, fim DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    mes DATE := date_trunc('month', inicio)::DATE;
+    particao TEXT;
+    criadas INTEGER := 0;
+BEGIN
+    WHILE mes <= fim LOOP
+        particao := format('%s_p%s', tabela, to_char(mes, 'YYYYMM'));
+        IF to_regclass(particao) IS NULL THEN
+            BEGIN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    particao, tabela, mes, (mes + INTERVAL '1 month')::DATE
+                );
+                criadas := criadas + 1;
+            EXCEPTION WHEN check_violation THEN
+                -- A partição DEFAULT já tem linhas do mês: mantém nela até uma manutenção manual
+                RAISE NOTICE 'Partição % não criada: DEFAULT já contém linhas do período', particao;
+            END;
+        END IF;
+        mes := (mes + INTERVAL '1 month')::DATE;
+    END LOOP;
+    RETURN criadas;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Garante partições do mês atual até `meses` à frente nas três tabelas.
+-- Chamada no deploy por scripts/garantir-particoes.py (Database.garantir_particoes)
+-- e, se disponível, diariamente pelo pg_cron; os workers não criam partições.
+CREATE OR REPLACE FUNCTION garantir_particoes_futuras(meses INTEGER DEFAULT 3)
+RETURNS INTEGER AS $$
+DECLARE
+    fim DATE := (CURRENT_DATE + make_interval(months => meses))::DATE;
+    criadas INTEGER := 0;
+BEGIN
+    criadas := criadas + criar_particoes_mensais('produtos_vendidos', CURRENT_DATE, fim);
+    criadas := criadas + criar_particoes_mensais('estornos_cancelamento', CURRENT_DATE, fim);
+    criadas := criadas + criar_particoes_mensais('dados_indicadores', CURRENT_DATE, fim);
+    RETURN criadas;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ========== Conversão das tabelas ==========
+
+BEGIN;
+
+-- Libera os nomes de constraints e índices para as novas tabelas
+ALTER TABLE produtos_vendidos RENAME CONSTRAINT produtos_vendidos_pkey TO produtos_vendidos_legado_pkey;
+ALTER TABLE estornos_cancelamento RENAME CONSTRAINT estornos_cancelamento_pkey TO estornos_cancelamento_legado_pkey;
+ALTER TABLE dados_indicadores RENAME CONSTRAINT dados_indicadores_pkey TO dados_indicadores_legado_pkey;
+ALTER TABLE dados_indicadores RENAME CONSTRAINT dados_indicadores_indicador_id_data_referencia_key
+    TO dados_indicadores_legado_indicador_id_data_referencia_key;
+DROP INDEX IF EXISTS idx_dados_indicadores_indicador_id;
+DROP INDEX IF EXISTS idx_dados_indicadores_data_referencia;
+DROP INDEX IF EXISTS idx_produtos_vendidos_ano_mes_unidade_semana_domingo;
+DROP INDEX IF EXISTS idx_produtos_vendidos_semana_domingo;
+DROP INDEX IF EXISTS idx_produtos_vendidos_unidade;
+DROP INDEX IF EXISTS idx_produtos_vendidos_squad;
+DROP INDEX IF EXISTS idx_estornos_cancelamento_tipo_ano_mes_unidade_data;
+DROP INDEX IF EXISTS idx_estornos_cancelamento_ano_mes_unidade_data;
+DROP INDEX IF EXISTS idx_estornos_cancelamento_data;
+DROP INDEX IF EXISTS idx_estornos_cancelamento_unidade;
+DROP INDEX IF EXISTS idx_estornos_cancelamento_squad;
+DROP INDEX IF EXISTS idx_estornos_cancelamento_categoria;
+
+-- produtos_vendidos
+-- Linhas gravadas pela importação antes desta migration não têm a coluna de partição
+ALTER TABLE produtos_vendidos ADD COLUMN IF NOT EXISTS semana_domingo DATE;
+UPDATE produtos_vendidos
+SET semana_domingo = domingo_da_semana(COALESCE(periodo_fim, data_venda, created_at::DATE))
+WHERE semana_domingo IS NULL;
+ALTER TABLE produtos_vendidos RENAME TO produtos_vendidos_legado;
+CREATE TABLE produtos_vendidos (
+    LIKE produtos_vendidos_legado INCLUDING DEFAULTS INCLUDING GENERATED
+) PARTITION BY RANGE (semana_domingo);
+-- A chave primária de uma tabela particionada precisa conter a coluna de partição
+ALTER TABLE produtos_vendidos ADD PRIMARY KEY (id, semana_domingo);
+CREATE TABLE produtos_vendidos_default PARTITION OF produtos_vendidos DEFAULT;
+
+-- estornos_cancelamento
+ALTER TABLE estornos_cancelamento RENAME TO estornos_cancelamento_legado;
+CREATE TABLE estornos_cancelamento (
+    LIKE estornos_cancelamento_legado INCLUDING DEFAULTS INCLUDING GENERATED
+) PARTITION BY RANGE (data);
+ALTER TABLE estornos_cancelamento ADD PRIMARY KEY (id, data);
+CREATE TABLE estornos_cancelamento_default PARTITION OF estornos_cancelamento DEFAULT;
+
+-- dados_indicadores
+ALTER TABLE dados_indicadores RENAME TO dados_indicadores_legado;
+CREATE TABLE dados_indicadores (
+    LIKE dados_indicadores_legado INCLUDING DEFAULTS INCLUDING GENERATED
+) PARTITION BY RANGE (data_referencia);
+ALTER TABLE dados_indicadores ADD PRIMARY KEY (id, data_referencia);
+-- (indicador_id, data_referencia) já contém a coluna de partição
+ALTER TABLE dados_indicadores ADD UNIQUE (indicador_id, data_referencia);
+ALTER TABLE dados_indicadores
+    ADD FOREIGN KEY (indicador_id) REFERENCES indicadores(id) ON DELETE CASCADE;
+CREATE TABLE dados_indicadores_default PARTITION OF dados_indicadores DEFAULT;
+
+-- Partições mensais cobrindo o histórico existente; os próximos meses vêm da função
+SELECT criar_particoes_mensais('produtos_vendidos',
+    COALESCE((SELECT MIN(semana_domingo) FROM produtos_vendidos_legado), CURRENT_DATE), CURRENT_DATE);
+SELECT criar_particoes_mensais('estornos_cancelamento',
+    COALESCE((SELECT MIN(data) FROM estornos_cancelamento_legado), CURRENT_DATE), CURRENT_DATE);
+SELECT criar_particoes_mensais('dados_indicadores',
+    COALESCE((SELECT MIN(data_referencia) FROM dados_indicadores_legado), CURRENT_DATE), CURRENT_DATE);
+SELECT garantir_particoes_futuras(3);
+
+-- Cópia dos dados (cada linha vai para a partição do seu mês)
+INSERT INTO produtos_vendidos SELECT * FROM produtos_vendidos_legado;
+INSERT INTO estornos_cancelamento SELECT * FROM estornos_cancelamento_legado;
+INSERT INTO dados_indicadores SELECT * FROM dados_indicadores_legado;
+
+-- Índices (criados em cada partição automaticamente). Em dados_indicadores, a
+-- constraint UNIQUE (indicador_id, data_referencia) já atende as buscas por indicador.
+
+CREATE INDEX idx_produtos_vendidos_ano_mes_unidade_semana_domingo
+    ON produtos_vendidos (ano, mes, unidade, semana_domingo)
+    INCLUDE (produtos_vendidos, squad);
+CREATE INDEX idx_produtos_vendidos_semana_domingo
+    ON produtos_vendidos (semana_domingo)
+    INCLUDE (produtos_vendidos, unidade);
+CREATE INDEX idx_produtos_vendidos_unidade ON produtos_vendidos (unidade);
+CREATE INDEX idx_produtos_vendidos_squad ON produtos_vendidos (squad);
+
+CREATE INDEX idx_estornos_cancelamento_tipo_ano_mes_unidade_data
+    ON estornos_cancelamento (tipo, ano, mes, unidade, data)
+    INCLUDE (valor, categoria, squad);
+CREATE INDEX idx_estornos_cancelamento_ano_mes_unidade_data
+    ON estornos_cancelamento (ano, mes, unidade, data);
+CREATE INDEX idx_estornos_cancelamento_data ON estornos_cancelamento (data);
+CREATE INDEX idx_estornos_cancelamento_unidade ON estornos_cancelamento (unidade);
+CREATE INDEX idx_estornos_cancelamento_squad ON estornos_cancelamento (squad);
+CREATE INDEX idx_estornos_cancelamento_categoria ON estornos_cancelamento (categoria);
+
+-- Trigger de updated_at
+CREATE TRIGGER update_dados_indicadores_updated_at BEFORE UPDATE ON dados_indicadores
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+COMMIT;
+
+ANALYZE produtos_vendidos;
+ANALYZE estornos_cancelamento;
+ANALYZE dados_indicadores;
+
+-- Após validar os dados, remova as tabelas antigas:
+-- DROP TABLE produtos_vendidos_legado;
+-- DROP TABLE estornos_cancelamento_legado;
+-- DROP TABLE dados_indicadores_legado;
+
+-- Opcional (Supabase com pg_cron): garante as partições futuras todo dia
+-- SELECT cron.schedule('particoes-mensais', '0 3 * * *', 'SELECT garantir_particoes_futuras(3)');
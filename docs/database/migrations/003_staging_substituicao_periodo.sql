@@ -0,0 +1,67 @@
+-- Reimportação idempotente de produtos_vendidos: troca atômica de um período
+--
+-- O backend PostgreSQL direto usa uma tabela temporária (ON COMMIT DROP) e não
+-- depende desta migration. Pelo Supabase (PostgREST), os lotes são gravados em
+-- produtos_vendidos_staging com um lote_id e a função abaixo aplica a troca em
+-- uma única transação: remove o período e copia o lote com INSERT ... SELECT.
+
+CREATE TABLE IF NOT EXISTS produtos_vendidos_staging (
+    lote_id UUID NOT NULL,
+    sku VARCHAR(255),
+    nome VARCHAR(500) NOT NULL,
+    categoria VARCHAR(255),
+    operacao VARCHAR(100),
+    montavel BOOLEAN DEFAULT FALSE,
+    quantidade INTEGER NOT NULL,
+    valor_unitario DECIMAL(15,2),
+    subtotal DECIMAL(15,2),
+    descontos DECIMAL(15,2) DEFAULT 0,
+    valor_total DECIMAL(15,2) NOT NULL,
+    data_venda DATE,
+    periodo_inicio DATE,
+    periodo_fim DATE,
+    semana_domingo DATE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_produtos_vendidos_staging_lote_id
+    ON produtos_vendidos_staging (lote_id);
+
+-- Troca o período pelo conteúdo do lote e retorna as contagens alteradas
+CREATE OR REPLACE FUNCTION substituir_periodo_produtos_vendidos(
+    p_lote_id UUID,
+    p_periodo_inicio DATE,
+    p_periodo_fim DATE
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_removidos INTEGER;
+    v_inseridos INTEGER;
+BEGIN
+    -- Serializa reimportações concorrentes da tabela
+    PERFORM pg_advisory_xact_lock(hashtext('produtos_vendidos'));
+
+    DELETE FROM produtos_vendidos
+    WHERE periodo_inicio >= p_periodo_inicio AND periodo_fim <= p_periodo_fim;
+    GET DIAGNOSTICS v_removidos = ROW_COUNT;
+
+    INSERT INTO produtos_vendidos (
+        sku, nome, categoria, operacao, montavel, quantidade, valor_unitario,
+        subtotal, descontos, valor_total, data_venda, periodo_inicio, periodo_fim,
+        semana_domingo
+    )
+    SELECT sku, nome, categoria, operacao, montavel, quantidade, valor_unitario,
+           subtotal, descontos, valor_total, data_venda, periodo_inicio, periodo_fim,
+           semana_domingo
+    FROM produtos_vendidos_staging
+    WHERE lote_id = p_lote_id;
+    GET DIAGNOSTICS v_inseridos = ROW_COUNT;
+
+    DELETE FROM produtos_vendidos_staging WHERE lote_id = p_lote_id;
+
+    RETURN jsonb_build_object('removidos', v_removidos, 'inseridos', v_inseridos);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Lotes abandonados (ex.: processo interrompido) podem ser limpos periodicamente:
+-- DELETE FROM produtos_vendidos_staging WHERE created_at < NOW() - INTERVAL '1 day';
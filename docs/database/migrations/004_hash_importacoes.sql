@@ -0,0 +1,56 @@
+-- Deduplicação de importações por hash
+--
+-- hash_arquivo: SHA-256 do arquivo enviado. Um reenvio idêntico para o mesmo
+-- período já concluído é ignorado no upload.
+-- hash_linha: hash (pd.util.hash_pandas_object, uint64 gravado como BIGINT) da linha
+-- normalizada. No modo 'incremental', o importador compara os hashes do arquivo
+-- com os do período e só insere/remove a diferença.
+
+ALTER TABLE importacoes_arquivos ADD COLUMN IF NOT EXISTS hash_arquivo VARCHAR(64);
+
+CREATE INDEX IF NOT EXISTS idx_importacoes_arquivos_hash_arquivo
+    ON importacoes_arquivos (hash_arquivo)
+    WHERE status = 'concluido';
+
+ALTER TABLE produtos_vendidos ADD COLUMN IF NOT EXISTS hash_linha BIGINT;
+ALTER TABLE produtos_vendidos_staging ADD COLUMN IF NOT EXISTS hash_linha BIGINT;
+
+-- Leitura dos hashes de um período (index-only scan)
+CREATE INDEX IF NOT EXISTS idx_produtos_vendidos_periodo_hash_linha
+    ON produtos_vendidos (periodo_inicio, periodo_fim)
+    INCLUDE (hash_linha);
+
+-- Troca de período da migration 003, agora copiando hash_linha
+CREATE OR REPLACE FUNCTION substituir_periodo_produtos_vendidos(
+    p_lote_id UUID,
+    p_periodo_inicio DATE,
+    p_periodo_fim DATE
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_removidos INTEGER;
+    v_inseridos INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('produtos_vendidos'));
+
+    DELETE FROM produtos_vendidos
+    WHERE periodo_inicio >= p_periodo_inicio AND periodo_fim <= p_periodo_fim;
+    GET DIAGNOSTICS v_removidos = ROW_COUNT;
+
+    INSERT INTO produtos_vendidos (
+        sku, nome, categoria, operacao, montavel, quantidade, valor_unitario,
+        subtotal, descontos, valor_total, data_venda, periodo_inicio, periodo_fim,
+        semana_domingo, hash_linha
+    )
+    SELECT sku, nome, categoria, operacao, montavel, quantidade, valor_unitario,
+           subtotal, descontos, valor_total, data_venda, periodo_inicio, periodo_fim,
+           semana_domingo, hash_linha
+    FROM produtos_vendidos_staging
+    WHERE lote_id = p_lote_id;
+    GET DIAGNOSTICS v_inseridos = ROW_COUNT;
+
+    DELETE FROM produtos_vendidos_staging WHERE lote_id = p_lote_id;
+
+    RETURN jsonb_build_object('removidos', v_removidos, 'inseridos', v_inseridos);
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,61 @@
+-- Checkpoints de importação por bloco
+--
+-- No modo 'adicionar', cada bloco do CSV é gravado junto com o checkpoint da
+-- importação na mesma transação: ultimo_bloco (número do bloco, a partir de 0) e
+-- linhas_confirmadas (linhas de dados do arquivo já consumidas). Uma importação
+-- que falhou é retomada a partir de linhas_confirmadas, sem duplicar linhas.
+-- Nos modos 'substituir' e 'incremental' a gravação é atômica; retomar é reler
+-- o arquivo desde o início.
+
+ALTER TABLE importacoes_arquivos ADD COLUMN IF NOT EXISTS modo VARCHAR(20) DEFAULT 'adicionar';
+ALTER TABLE importacoes_arquivos ADD COLUMN IF NOT EXISTS ultimo_bloco INTEGER;
+ALTER TABLE importacoes_arquivos ADD COLUMN IF NOT EXISTS linhas_confirmadas INTEGER DEFAULT 0;
+
+-- Grava um bloco e avança o checkpoint (usada pelo backend Supabase/PostgREST).
+-- Idempotente: um bloco já confirmado (ex.: resposta perdida e nova tentativa)
+-- não é inserido de novo.
+CREATE OR REPLACE FUNCTION inserir_bloco_importacao(
+    p_importacao_id UUID,
+    p_bloco INTEGER,
+    p_linhas_confirmadas INTEGER,
+    p_registros_erro INTEGER,
+    p_total_registros INTEGER,
+    p_registros JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_ultimo_bloco INTEGER;
+    v_inseridos INTEGER;
+BEGIN
+    SELECT ultimo_bloco INTO v_ultimo_bloco
+    FROM importacoes_arquivos
+    WHERE id = p_importacao_id
+    FOR UPDATE;
+
+    IF COALESCE(v_ultimo_bloco, -1) >= p_bloco THEN
+        RETURN jsonb_build_object('inseridos', 0, 'ignorado', TRUE);
+    END IF;
+
+    INSERT INTO produtos_vendidos (
+        sku, nome, categoria, operacao, montavel, quantidade, valor_unitario,
+        subtotal, descontos, valor_total, data_venda, periodo_inicio, periodo_fim,
+        semana_domingo, hash_linha
+    )
+    SELECT sku, nome, categoria, operacao, montavel, quantidade, valor_unitario,
+           subtotal, descontos, valor_total, data_venda, periodo_inicio, periodo_fim,
+           semana_domingo, hash_linha
+    FROM jsonb_populate_recordset(NULL::produtos_vendidos, p_registros);
+    GET DIAGNOSTICS v_inseridos = ROW_COUNT;
+
+    UPDATE importacoes_arquivos
+    SET ultimo_bloco = p_bloco,
+        linhas_confirmadas = p_linhas_confirmadas,
+        registros_importados = COALESCE(registros_importados, 0) + v_inseridos,
+        registros_erro = p_registros_erro,
+        total_registros = p_total_registros,
+        updated_at = NOW()
+    WHERE id = p_importacao_id;
+
+    RETURN jsonb_build_object('inseridos', v_inseridos, 'ignorado', FALSE);
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,12 @@
+-- Atraso de replicação exposto ao PostgREST
+--
+-- Com SUPABASE_READ_URL configurada, o backend Supabase chama esta função na
+-- réplica (rpc 'atraso_replicacao') para decidir se as leituras podem ir para
+-- ela, como o backend PostgreSQL faz com PGURL_READ. Sem a função, a medição
+-- falha e as leituras ficam no primário.
+-- No primário (sem replay), retorna 0.
+
+CREATE OR REPLACE FUNCTION atraso_replicacao()
+RETURNS DOUBLE PRECISION AS $$
+    SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)::DOUBLE PRECISION
+$$ LANGUAGE sql STABLE;
@@ -30,4 +30,8 @@ echo "🔍 Verificando sintaxe..."
 python -m py_compile src/app.py
 python -m py_compile src/models/database.py
 
+# Partições mensais futuras (DDL uma vez por deploy, não no boot dos workers)
+echo "🗂️  Garantindo partições mensais..."
+python scripts/garantir-particoes.py || echo "⚠️  Partições não garantidas, continuando..."
+
 echo "✅ Deploy automático concluído!"
\ No newline at end of file
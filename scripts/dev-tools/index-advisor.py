@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Index advisor - índices compostos para os filtros do DataService
+
+Executa os métodos do DataService contra um PostgreSQL local, captura o formato
+de cada query emitida (filtros de igualdade, intervalo, ordenação e colunas),
+roda EXPLAIN (ANALYZE, BUFFERS) e gera uma migration com índices compostos que
+cobrem (INCLUDE) as colunas somadas, para que os totais do resumo virem
+index-only scans.
+
+Uso:
+    python scripts/dev-tools/index-advisor.py --dsn postgresql://localhost/auditoria
+    python scripts/dev-tools/index-advisor.py --saida docs/database/migrations/001_indices_compostos.sql
+    python scripts/dev-tools/index-advisor.py --aplicar   # cria os índices e compara os planos
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Colunas agregadas pelo DataService: entram como INCLUDE para evitar acesso ao heap
+COLUNAS_SOMADAS = {
+    'produtos_vendidos': ['produtos_vendidos'],
+    'estornos_cancelamento': ['valor'],
+}
+
+
+def preparar_ambiente(dsn: str):
+    """Força o backend PostgreSQL síncrono, sem réplica, antes de importar o app"""
+    os.environ['PGURL'] = dsn
+    os.environ['PGURL_READ'] = ''
+    os.environ['DATABASE_BACKEND'] = 'postgres'
+    sys.path.insert(0, str(PROJECT_ROOT / 'src'))
+
+
+class CapturaQueries:
+    """Registra o formato (e um exemplo de SQL) de cada select do DataService"""
+
+    def __init__(self):
+        self.formatos = {}
+
+    def instalar(self):
+        from models.database_pg import FakeTable
+        original = FakeTable.execute
+        captura = self
+
+        def execute(query):
+            if query.operacao == 'select':
+                formato = query.formato()
+                chave = json.dumps(formato, sort_keys=True)
+                if chave not in captura.formatos:
+                    sql, params = query.build()
+                    captura.formatos[chave] = {'formato': formato, 'sql': sql, 'params': params}
+            return original(query)
+
+        FakeTable.execute = execute
+
+
+def exercitar_data_service():
+    """Chama os métodos do DataService com combinações de filtros realistas"""
+    from models.database_async import async_db
+    from services.data_service import DataService
+
+    # Sem backend assíncrono todas as queries passam pelo FakeTable (capturado)
+    async_db.dsn = None
+    async_db.rest_url = None
+
+    service = DataService()
+    catalogo = service.get_filtros_disponiveis()
+    ano = (catalogo.get('anos') or [date.today().year])[-1]
+    unidade = (catalogo.get('unidades') or [None])[0]
+    squad = (catalogo.get('squads') or [None])[0]
+    categoria = (catalogo.get('categorias') or [None])[0]
+    fim = date.today()
+    inicio = fim - timedelta(days=90)
+
+    cenarios = [
+        {},
+        {'ano': ano},
+        {'ano': ano, 'mes': 1},
+        {'ano': ano, 'mes': 1, 'unidade': unidade},
+        {'ano': ano, 'mes': 1, 'unidade': unidade, 'squad': squad},
+        {'data_inicio': inicio, 'data_fim': fim},
+        {'data_inicio': inicio, 'data_fim': fim, 'unidade': unidade},
+    ]
+
+    for filtros in cenarios:
+        filtros = {k: v for k, v in filtros.items() if v is not None}
+        for cat in (None, categoria):
+            service.clear_cache()
+            service.get_dashboard_summary(categoria=cat, **filtros)
+        service.get_produtos_vendidos_df(use_cache=False, **filtros)
+        service.get_estornos_cancelamentos_df(use_cache=False, **filtros)
+
+
+def explicar(db, sql: str, params) -> dict:
+    """Roda EXPLAIN (ANALYZE, BUFFERS) e resume o plano"""
+    with db.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, tuple(params))
+            plano = cursor.fetchone()[0][0]
+        conn.rollback()
+
+    nos = []
+
+    def visitar(no):
+        nos.append(no)
+        for filho in no.get('Plans', []):
+            visitar(filho)
+
+    visitar(plano['Plan'])
+    raiz = plano['Plan']
+    return {
+        'nos': [f"{n['Node Type']}" + (f" ({n['Index Name']})" if 'Index Name' in n else '') for n in nos],
+        'seq_scan': any(n['Node Type'] == 'Seq Scan' for n in nos),
+        'index_only': any(n['Node Type'] == 'Index Only Scan' for n in nos),
+        'heap_fetches': sum(n.get('Heap Fetches', 0) for n in nos),
+        'tempo_ms': plano.get('Execution Time', 0.0),
+        'buffers': raiz.get('Shared Hit Blocks', 0) + raiz.get('Shared Read Blocks', 0),
+    }
+
+
+def recomendar(formatos: list) -> list:
+    """Gera os índices compostos a partir dos formatos capturados
+
+    Os formatos são agrupados por tabela, coluna de intervalo/ordenação e tipo de
+    seleção (estreita, candidata a index-only scan, ou ``*``). A chave
+    cresce, a partir da esquerda, com a coluna de igualdade presente na maioria dos
+    formatos que já usam o prefixo; as demais colunas filtradas, selecionadas e
+    somadas vão para INCLUDE, de modo que o filtro e a soma saiam do próprio índice.
+    Formatos que não usam a primeira coluna da chave geram um novo índice.
+    """
+    grupos = defaultdict(list)
+    catalogo = []
+    for item in formatos:
+        formato = item['formato']
+        final = (formato['intervalo'] + formato['ordem'])[:1]
+        if not final and not formato['igualdade']:
+            catalogo.append(item)
+        else:
+            estreita = '*' not in formato['colunas']
+            grupos[(formato['tabela'], tuple(final), estreita)].append(item)
+
+    indices = []
+    for (tabela, final, estreita), itens in sorted(grupos.items()):
+        while itens:
+            chave = []
+            candidatos = itens
+            while True:
+                frequencia = Counter(c for item in candidatos
+                                     for c in item['formato']['igualdade'] if c not in chave)
+                if not frequencia:
+                    break
+                coluna, vezes = min(frequencia.items(), key=lambda kv: (-kv[1], kv[0]))
+                if vezes * 2 <= len(candidatos):
+                    break
+                chave.append(coluna)
+                candidatos = [i for i in candidatos if coluna in i['formato']['igualdade']]
+
+            atendidos = [i for i in itens if not chave or chave[0] in i['formato']['igualdade']]
+            itens = [i for i in itens if i not in atendidos]
+            chave += [c for c in final if c not in chave]
+            novo = _montar_indice(tabela, chave, atendidos, estreita)
+            # Mesma chave de outro grupo: um único índice (com INCLUDE) atende os dois
+            existente = next((i for i in indices
+                              if i['tabela'] == tabela and i['chave'] == chave), None)
+            if existente:
+                existente['include'] += [c for c in novo['include'] if c not in existente['include']]
+                existente['formatos'] += atendidos
+            else:
+                indices.append(novo)
+
+    # Listas de filtros (select de uma coluna, sem WHERE): índice na própria coluna,
+    # a menos que ela já lidere outro índice da tabela
+    for item in catalogo:
+        formato = item['formato']
+        colunas = [c for c in formato['colunas'] if c != '*']
+        if not colunas:
+            continue
+        existente = next((i for i in indices
+                          if i['tabela'] == formato['tabela'] and i['chave'][0] == colunas[0]), None)
+        if existente:
+            existente['formatos'].append(item)
+        else:
+            indices.append(_montar_indice(formato['tabela'], colunas[:1], [item], False))
+
+    return indices
+
+
+def _montar_indice(tabela: str, chave: list, itens: list, cobrir: bool) -> dict:
+    include = []
+    if cobrir:
+        for item in itens:
+            formato = item['formato']
+            for coluna in formato['igualdade'] + formato['colunas'] + COLUNAS_SOMADAS.get(tabela, []):
+                if coluna not in chave and coluna not in include:
+                    include.append(coluna)
+    return {'tabela': tabela, 'chave': chave, 'include': include, 'formatos': itens}
+
+
+def nome_indice(indice: dict) -> str:
+    nome = f"idx_{indice['tabela']}_{'_'.join(indice['chave'])}"
+    return nome[:63]
+
+
+def sql_indice(indice: dict) -> str:
+    sql = (f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {nome_indice(indice)}\n"
+           f"    ON {indice['tabela']} ({', '.join(indice['chave'])})")
+    if indice['include']:
+        sql += f"\n    INCLUDE ({', '.join(indice['include'])})"
+    return sql + ";"
+
+
+def gerar_migration(indices: list) -> str:
+    linhas = [
+        "-- Índices compostos para os filtros do DataService",
+        f"-- Gerado por scripts/dev-tools/index-advisor.py em {datetime.now():%Y-%m-%d %H:%M}",
+        "-- CREATE INDEX CONCURRENTLY não roda dentro de transação: execute fora de BEGIN/COMMIT.",
+        "",
+    ]
+    for indice in indices:
+        linhas.append(f"-- Formatos atendidos ({len(indice['formatos'])}):")
+        for item in indice['formatos']:
+            formato = item['formato']
+            plano = item.get('plano')
+            descricao = (f"--   select {','.join(formato['colunas'])} "
+                         f"eq[{','.join(formato['igualdade'])}] "
+                         f"range[{','.join(formato['intervalo'])}] "
+                         f"order[{','.join(formato['ordem'])}]")
+            if plano:
+                descricao += f" -> {plano['nos'][-1]}, {plano['tempo_ms']:.1f} ms, {plano['buffers']} buffers"
+            linhas.append(descricao)
+        linhas.append(sql_indice(indice))
+        linhas.append("")
+
+    tabelas = sorted({i['tabela'] for i in indices})
+    if tabelas:
+        linhas.append("-- Atualiza estatísticas e o visibility map (necessário para index-only scan)")
+        linhas += [f"VACUUM (ANALYZE) {tabela};" for tabela in tabelas]
+    return '\n'.join(linhas) + '\n'
+
+
+def aplicar(db, indices: list):
+    """Cria os índices e roda VACUUM ANALYZE (autocommit, fora de transação)"""
+    conn = db.get_connection()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            for indice in indices:
+                print(f"  criando {nome_indice(indice)}...")
+                cursor.execute(sql_indice(indice))
+            for tabela in sorted({i['tabela'] for i in indices}):
+                cursor.execute(f"VACUUM (ANALYZE) {tabela}")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sugere índices compostos para o DataService')
+    parser.add_argument('--dsn', default=os.getenv('PGURL', 'postgresql://localhost/auditoria'),
+                        help='PostgreSQL local com dados representativos')
+    parser.add_argument('--saida', help='Arquivo da migration (padrão: imprime na tela)')
+    parser.add_argument('--aplicar', action='store_true',
+                        help='Cria os índices no banco informado e mostra o plano depois')
+    args = parser.parse_args()
+
+    preparar_ambiente(args.dsn)
+
+    print("📡 Capturando queries do DataService...")
+    captura = CapturaQueries()
+    captura.instalar()
+    exercitar_data_service()
+    formatos = list(captura.formatos.values())
+    print(f"   {len(formatos)} formatos distintos")
+
+    from models.database_pg import db
+
+    print("🔍 EXPLAIN (ANALYZE, BUFFERS)...")
+    for item in formatos:
+        item['plano'] = explicar(db, item['sql'], item['params'])
+        plano = item['plano']
+        marca = '⚠️ ' if plano['seq_scan'] else '✅'
+        print(f"   {marca} {item['formato']['tabela']}: {' > '.join(plano['nos'])} "
+              f"({plano['tempo_ms']:.1f} ms, {plano['buffers']} buffers)")
+
+    # Formatos já atendidos por index-only scan não precisam de índice novo
+    pendentes = [item for item in formatos if not item['plano']['index_only']]
+    indices = recomendar(pendentes)
+    migration = gerar_migration(indices)
+
+    if args.saida:
+        saida = Path(args.saida)
+        saida.parent.mkdir(parents=True, exist_ok=True)
+        saida.write_text(migration, encoding='utf-8')
+        print(f"💾 Migration gravada em {saida} ({len(indices)} índices)")
+    else:
+        print()
+        print(migration)
+
+    if args.aplicar and indices:
+        print("🛠️  Aplicando índices...")
+        aplicar(db, indices)
+        print("🔍 Planos após os índices:")
+        for item in formatos:
+            antes = item['plano']
+            depois = explicar(db, item['sql'], item['params'])
+            print(f"   {item['formato']['tabela']} [{','.join(item['formato']['colunas'])}]: "
+                  f"{antes['nos'][-1]} {antes['tempo_ms']:.1f} ms -> "
+                  f"{depois['nos'][-1]} {depois['tempo_ms']:.1f} ms "
+                  f"(heap fetches: {depois['heap_fetches']})")
+
+
+if __name__ == "__main__":
+    main()
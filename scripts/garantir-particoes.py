@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Garante as partições mensais futuras (migration 002)
+
+Cria as partições do mês atual até PARTITION_MONTHS_AHEAD meses à frente em
+produtos_vendidos, estornos_cancelamento e dados_indicadores. É DDL: roda uma vez
+por deploy e/ou agendado (cron do servidor ou pg_cron), nunca no boot de cada
+worker. É idempotente; partições que já existem são mantidas.
+
+Uso:
+    python scripts/garantir-particoes.py
+    python scripts/garantir-particoes.py --meses 6
+
+Agendamento (crontab, todo dia às 3h):
+    0 3 * * * cd /caminho/do/projeto && python scripts/garantir-particoes.py
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / 'src'))
+
+
+def main() -> int:
+    from config.settings import Config
+    from models.database import db
+
+    parser = argparse.ArgumentParser(description='Cria as partições mensais futuras')
+    parser.add_argument('--meses', type=int, default=Config.PARTITION_MONTHS_AHEAD,
+                        help='meses à frente do atual (padrão: PARTITION_MONTHS_AHEAD)')
+    args = parser.parse_args()
+
+    try:
+        criadas = db.garantir_particoes(args.meses)
+    except Exception as e:
+        # Banco ainda sem a migration de particionamento
+        print(f"ERRO - Nao foi possivel garantir particoes: {str(e)}")
+        return 1
+
+    print(f"OK - {criadas} particoes mensais criadas ({db.backend})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
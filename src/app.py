@@ -2,14 +2,22 @@ from flask import Flask, render_template, request, jsonify, redirect, url_for, s
 from flask_cors import CORS
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.security import check_password_hash, generate_password_hash
+from werkzeug.wsgi import get_input_stream
 from datetime import datetime, timedelta
 import pandas as pd
 import json
 import os
+import uuid
 
 from config.settings import Config
 from models.database import db
+from models.deadline import DeadlineExceeded, com_deadline
+from models.user_cache import user_cache
 from services.data_service import data_service
+from services.import_jobs import FilaImportacaoCheia, import_jobs
+from services.import_service import import_service
+from services.upload_spool import UploadSpoolErro, upload_spool
+from services.write_behind import write_behind
 
 # Definir caminhos para templates e static
 template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'templates'))
@@ -19,6 +27,12 @@ app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
 app.config.from_object(Config)
 CORS(app)
 
+# Resolve o backend do banco em segundo plano
+db.aquecer()
+
+# Auditoria e último acesso gravados em lote fora do request (regrava o spool pendente)
+write_behind.iniciar()
+
 # Configuração do LoginManager
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -39,11 +53,20 @@ class User:
 
 @login_manager.user_loader
 def load_user(user_id):
-    user_data = db.supabase.table('usuarios').select('*').eq('id', user_id).execute()
-    if user_data.data:
-        return User(user_data.data[0])
+    # Cache com TTL curto: evita uma query em usuarios a cada request autenticado
+    user_data = user_cache.obter(user_id, db.get_usuario_by_id)
+    if user_data:
+        return User(user_data)
     return None
 
+@app.errorhandler(DeadlineExceeded)
+def handle_deadline_exceeded(e):
+    """Responde rápido quando as consultas do request excedem o prazo"""
+    return jsonify({
+        "error": "A consulta excedeu o tempo limite. Tente filtrar um período menor.",
+        "degradado": True
+    }), 503
+
 # ========== Rotas de Autenticação ==========
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -60,7 +83,8 @@ def login():
                 if user_data.get('senha_hash') and check_password_hash(user_data['senha_hash'], senha):
                     user = User(user_data)
                     login_user(user)
-                    db.update_ultimo_acesso(user_data['id'])
+                    user_cache.set(user_data['id'], user_data)
+                    write_behind.registrar_ultimo_acesso(user_data['id'])
                     
                     if request.is_json:
                         return jsonify({"success": True, "redirect": url_for('dashboard')})
@@ -78,6 +102,7 @@ def login():
 @app.route('/logout')
 @login_required
 def logout():
+    user_cache.invalidar(current_user.id)
     logout_user()
     return redirect(url_for('login'))
 
@@ -127,6 +152,7 @@ def settings():
 # ========== API de Indicadores ==========
 @app.route('/api/indicadores', methods=['GET'])
 @login_required
+@com_deadline()
 def get_indicadores():
     categoria_id = request.args.get('categoria_id')
     indicadores = db.get_indicadores(categoria_id=categoria_id)
@@ -134,6 +160,7 @@ def get_indicadores():
 
 @app.route('/api/indicadores/<indicador_id>/dados', methods=['GET'])
 @login_required
+@com_deadline()
 def get_dados_indicador(indicador_id):
     data_inicio = request.args.get('data_inicio')
     data_fim = request.args.get('data_fim')
@@ -156,7 +183,7 @@ def create_indicador():
     indicador = db.create_indicador(data)
     
     # Log de auditoria
-    db.create_log_auditoria({
+    write_behind.registrar_log_auditoria({
         'usuario_id': current_user.id,
         'acao': 'criar_indicador',
         'tabela': 'indicadores',
@@ -171,6 +198,7 @@ def create_indicador():
 # ========== API de Dashboard ==========
 @app.route('/api/dashboard/summary', methods=['GET'])
 @login_required
+@com_deadline()
 def get_dashboard_summary():
     """Retorna o resumo do dashboard com os 4 cards principais."""
     # Parâmetros de filtro
@@ -235,13 +263,11 @@ def get_dashboard_summary():
 
 @app.route('/api/dashboard/filters', methods=['GET'])
 @login_required
+@com_deadline()
 def get_dashboard_filters():
     """Retorna as opções disponíveis para os filtros."""
     filtros = {
-        'anos': data_service.get_anos_disponiveis(),
-        'unidades': data_service.get_unidades_disponiveis(),
-        'squads': data_service.get_squads_disponiveis(),
-        'categorias': data_service.get_categorias_disponiveis(),
+        **data_service.get_filtros_disponiveis(),
         'meses': [
             {'valor': 1, 'nome': 'Janeiro'},
             {'valor': 2, 'nome': 'Fevereiro'},
@@ -262,6 +288,7 @@ def get_dashboard_filters():
 
 @app.route('/api/dashboard/semanas', methods=['GET'])
 @login_required
+@com_deadline()
 def get_semanas_mes():
     """Retorna as semanas disponíveis para um mês específico."""
     ano = request.args.get('ano', type=int)
@@ -306,69 +333,304 @@ def upload_produtos_vendidos():
     if not file.filename.lower().endswith('.csv'):
         return jsonify({"error": "Apenas arquivos CSV são aceitos"}), 400
     
-    # Criar registro de importação
+    # 'adicionar' (padrão) insere as linhas; 'substituir' troca o período inteiro;
+    # 'incremental' deixa o período igual ao arquivo gravando só a diferença
+    modo = request.form.get('modo', 'adicionar')
+    if modo not in ('adicionar', 'substituir', 'incremental'):
+        return jsonify({"error": "Modo inválido (use 'adicionar', 'substituir' ou 'incremental')"}), 400
+    
+    try:
+        periodo_inicio = datetime.fromisoformat(request.form.get('periodo_inicio', '2025-05-01')).date()
+        periodo_fim = datetime.fromisoformat(request.form.get('periodo_fim', '2025-05-31')).date()
+    except ValueError:
+        return jsonify({"error": "Período inválido (use AAAA-MM-DD)"}), 400
+    
+    importacao, anterior = _receber_csv_produtos(file, modo, periodo_inicio, periodo_fim)
+    # Reenvio idêntico de um período já importado: nada a gravar
+    if anterior:
+        return jsonify({
+            "success": True,
+            "duplicado": True,
+            "message": "Arquivo idêntico já importado para este período",
+            "importacao_id": anterior['id']
+        })
+    return _enfileirar_importacao(importacao, modo, periodo_inicio, periodo_fim)
+
+def _receber_csv_produtos(file, modo: str, periodo_inicio, periodo_fim):
+    """Salva o upload e cria o registro da importação (status 'pendente')
+    
+    Retorna (importacao, None), ou (None, importacao_anterior) quando o mesmo
+    arquivo já foi importado para o período.
+    """
+    os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+    temporario = os.path.join(Config.UPLOAD_FOLDER, f"{uuid.uuid4().hex}.tmp")
+    file.save(temporario)
+    return _registrar_csv_produtos(temporario, file.filename, modo, periodo_inicio, periodo_fim)
+
+def _registrar_csv_produtos(temporario: str, nome_arquivo: str, modo: str, periodo_inicio, periodo_fim):
+    """Cria a importação de um CSV já em disco e move o arquivo para o caminho do upload"""
+    hash_arquivo = import_service.hash_arquivo(temporario)
+    
+    anterior = db.get_importacao_por_hash(hash_arquivo, periodo_inicio.isoformat(), periodo_fim.isoformat())
+    if anterior:
+        os.remove(temporario)
+        return None, anterior
+    
     importacao = db.create_importacao({
-        'nome_arquivo': file.filename,
+        'nome_arquivo': nome_arquivo,
         'tipo_arquivo': 'csv',
-        'status': 'processando',
-        'usuario_id': current_user.id
+        'status': 'pendente',
+        'usuario_id': current_user.id,
+        'hash_arquivo': hash_arquivo,
+        'modo': modo,
+        'periodo_inicio': periodo_inicio.isoformat(),
+        'periodo_fim': periodo_fim.isoformat()
     })
+    os.replace(temporario, import_service.caminho_upload(importacao['id']))
+    return importacao, None
+
+def _enfileirar_importacao(importacao: dict, modo: str, periodo_inicio, periodo_fim):
+    """Submete a importação ao pool de jobs e monta a resposta 202 (ou 503 com a fila cheia)"""
+    caminho = import_service.caminho_upload(importacao['id'])
+    try:
+        import_jobs.submeter(
+            importacao['id'], import_service.importar_produtos_vendidos,
+            caminho, importacao['id'], periodo_inicio, periodo_fim, modo=modo
+        )
+    except FilaImportacaoCheia as e:
+        db.update_importacao(importacao['id'], {'status': 'erro', 'mensagem_erro': str(e)})
+        os.remove(caminho)
+        return jsonify({"success": False, "error": str(e)}), 503
     
+    return jsonify({
+        "success": True,
+        "message": "Arquivo recebido; importação em andamento",
+        "importacao_id": importacao['id'],
+        "modo": modo,
+        "status_url": url_for('get_importacao', importacao_id=importacao['id'])
+    }), 202
+
+# ========== Upload em partes (spool em disco) ==========
+# Arquivos maiores que MAX_CONTENT_LENGTH: o cliente abre uma sessão, envia o
+# corpo cru (inteiro ou em partes com Content-Range) e pede a importação.
+@app.route('/api/upload/spool', methods=['POST'])
+@login_required
+def criar_upload_spool():
+    if current_user.perfil not in ['admin', 'gestor']:
+        return jsonify({"error": "Sem permissão"}), 403
+    
+    dados = request.get_json(silent=True) or request.form
+    nome_arquivo = (dados.get('nome_arquivo') or '').strip()
+    if not nome_arquivo.lower().endswith('.csv'):
+        return jsonify({"error": "Apenas arquivos CSV são aceitos"}), 400
     try:
-        # Ler e processar CSV
-        df = pd.read_csv(file, sep=';', encoding='latin-1', skiprows=4)
-        
-        # Limpar e transformar dados
-        df.columns = ['sku', 'nome', 'categoria', 'operacao', 'montavel', 
-                     'quantidade', 'valor_unitario', 'subtotal', 'descontos', 'valor_total']
-        
-        # Remover linhas vazias
-        df = df.dropna(subset=['nome'])
-        
-        # Converter tipos
-        df['montavel'] = df['montavel'] == 'VERDADEIRO'
-        df['quantidade'] = pd.to_numeric(df['quantidade'], errors='coerce')
-        
-        # Limpar valores monetários
-        for col in ['valor_unitario', 'subtotal', 'descontos', 'valor_total']:
-            df[col] = df[col].str.replace('R$', '').str.replace('.', '').str.replace(',', '.').astype(float)
-        
-        # Extrair período do arquivo (exemplo: 01/05/2025 e 31/05/2025)
-        # Por enquanto vamos usar a data atual
-        df['data_venda'] = datetime.now().date()
-        df['periodo_inicio'] = datetime(2025, 5, 1).date()
-        df['periodo_fim'] = datetime(2025, 5, 31).date()
-        
-        # Inserir no banco
-        result = db.insert_produtos_vendidos(df)
-        
-        # Atualizar importação
-        db.update_importacao(importacao['id'], {
-            'status': 'concluido',
-            'total_registros': len(df),
-            'registros_importados': len(df),
-            'registros_erro': 0,
-            'periodo_inicio': df['periodo_inicio'].iloc[0],
-            'periodo_fim': df['periodo_fim'].iloc[0]
-        })
-        
+        tamanho_total = int(dados['tamanho_total']) if dados.get('tamanho_total') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "tamanho_total inválido"}), 400
+    
+    try:
+        estado = upload_spool.criar(nome_arquivo, tamanho_total, str(current_user.id))
+    except UploadSpoolErro as e:
+        return jsonify({"error": str(e), **e.detalhes}), e.status
+    return jsonify({
+        **estado,
+        "tamanho_bloco": upload_spool.tamanho_bloco,
+        "upload_url": url_for('enviar_upload_spool', upload_id=estado['upload_id'])
+    }), 201
+
+@app.route('/api/upload/spool/<upload_id>', methods=['GET', 'PUT', 'DELETE'])
+@login_required
+def enviar_upload_spool(upload_id):
+    """GET: bytes já recebidos (para retomar); PUT: acrescenta o corpo; DELETE: descarta"""
+    estado = upload_spool.estado(upload_id)
+    if not estado or estado.get('usuario_id') != str(current_user.id):
+        return jsonify({"error": "Upload não encontrado"}), 404
+    
+    if request.method == 'GET':
+        return jsonify(estado)
+    if request.method == 'DELETE':
+        upload_spool.descartar(upload_id)
+        return jsonify({"success": True})
+    
+    # "Content-Range: bytes <inicio>-<fim>/<total>": o início precisa bater com o já recebido
+    inicio = None
+    content_range = request.headers.get('Content-Range')
+    if content_range:
+        try:
+            inicio = int(content_range.split()[1].split('-')[0])
+        except (IndexError, ValueError):
+            return jsonify({"error": "Content-Range inválido"}), 400
+    
+    # Lê o corpo direto do WSGI, com limite próprio (não o MAX_CONTENT_LENGTH do app)
+    stream = get_input_stream(request.environ, max_content_length=upload_spool.max_bytes)
+    try:
+        estado = upload_spool.receber(upload_id, stream, inicio)
+    except UploadSpoolErro as e:
+        return jsonify({"error": str(e), **e.detalhes}), e.status
+    return jsonify(estado)
+
+@app.route('/api/upload/spool/<upload_id>/importar', methods=['POST'])
+@login_required
+def importar_upload_spool(upload_id):
+    """Entrega o arquivo completo ao importador (mesmos modos do upload simples)"""
+    estado = upload_spool.estado(upload_id)
+    if not estado or estado.get('usuario_id') != str(current_user.id):
+        return jsonify({"error": "Upload não encontrado"}), 404
+    
+    dados = request.get_json(silent=True) or request.form
+    modo = dados.get('modo', 'adicionar')
+    if modo not in ('adicionar', 'substituir', 'incremental'):
+        return jsonify({"error": "Modo inválido (use 'adicionar', 'substituir' ou 'incremental')"}), 400
+    try:
+        periodo_inicio = datetime.fromisoformat(dados.get('periodo_inicio', '2025-05-01')).date()
+        periodo_fim = datetime.fromisoformat(dados.get('periodo_fim', '2025-05-31')).date()
+    except ValueError:
+        return jsonify({"error": "Período inválido (use AAAA-MM-DD)"}), 400
+    
+    temporario = os.path.join(Config.UPLOAD_FOLDER, f"{uuid.uuid4().hex}.tmp")
+    try:
+        upload_spool.concluir(upload_id, temporario)
+    except UploadSpoolErro as e:
+        return jsonify({"error": str(e), **e.detalhes}), e.status
+    
+    importacao, anterior = _registrar_csv_produtos(
+        temporario, estado['nome_arquivo'], modo, periodo_inicio, periodo_fim
+    )
+    if anterior:
         return jsonify({
             "success": True,
-            "message": f"{len(df)} produtos importados com sucesso",
-            "importacao_id": importacao['id']
+            "duplicado": True,
+            "message": "Arquivo idêntico já importado para este período",
+            "importacao_id": anterior['id']
         })
-        
-    except Exception as e:
-        # Registrar erro
-        db.update_importacao(importacao['id'], {
-            'status': 'erro',
-            'mensagem_erro': str(e)
+    return _enfileirar_importacao(importacao, modo, periodo_inicio, periodo_fim)
+
+@app.route('/api/upload/produtos-vendidos/lote', methods=['POST'])
+@login_required
+def upload_produtos_vendidos_lote():
+    """Vários CSVs do mesmo período (ex.: um por unidade), importados em modo 'adicionar'"""
+    if current_user.perfil not in ['admin', 'gestor']:
+        return jsonify({"error": "Sem permissão"}), 403
+    
+    files = [f for f in request.files.getlist('files') if f.filename]
+    if not files:
+        return jsonify({"error": "Nenhum arquivo enviado"}), 400
+    invalidos = [f.filename for f in files if not f.filename.lower().endswith('.csv')]
+    if invalidos:
+        return jsonify({"error": "Apenas arquivos CSV são aceitos", "arquivos": invalidos}), 400
+    
+    try:
+        periodo_inicio = datetime.fromisoformat(request.form.get('periodo_inicio', '2025-05-01')).date()
+        periodo_fim = datetime.fromisoformat(request.form.get('periodo_fim', '2025-05-31')).date()
+    except ValueError:
+        return jsonify({"error": "Período inválido (use AAAA-MM-DD)"}), 400
+    
+    arquivos, importacoes, duplicados = [], [], []
+    for file in files:
+        importacao, anterior = _receber_csv_produtos(file, 'adicionar', periodo_inicio, periodo_fim)
+        if anterior:
+            duplicados.append({"arquivo": file.filename, "importacao_id": anterior['id']})
+            continue
+        arquivos.append((import_service.caminho_upload(importacao['id']), importacao['id']))
+        importacoes.append({
+            "arquivo": file.filename,
+            "importacao_id": importacao['id'],
+            "status_url": url_for('get_importacao', importacao_id=importacao['id'])
         })
-        
-        return jsonify({
-            "success": False,
-            "error": f"Erro ao processar arquivo: {str(e)}"
-        }), 500
+    
+    if not arquivos:
+        return jsonify({"success": True, "duplicados": duplicados, "importacoes": []})
+    
+    # Um job para o lote: leitura em processos paralelos, gravação serializada
+    lote_id = uuid.uuid4().hex
+    try:
+        import_jobs.submeter(lote_id, import_service.importar_varios, arquivos, periodo_inicio, periodo_fim)
+    except FilaImportacaoCheia as e:
+        for caminho, importacao_id in arquivos:
+            db.update_importacao(importacao_id, {'status': 'erro', 'mensagem_erro': str(e)})
+            os.remove(caminho)
+        return jsonify({"success": False, "error": str(e)}), 503
+    
+    return jsonify({
+        "success": True,
+        "message": f"{len(arquivos)} arquivo(s) recebido(s); importação em andamento",
+        "lote_id": lote_id,
+        "importacoes": importacoes,
+        "duplicados": duplicados,
+        "status_url": url_for('get_lote_importacao', lote_id=lote_id)
+    }), 202
+
+@app.route('/api/importacoes/lote/<lote_id>', methods=['GET'])
+@login_required
+def get_lote_importacao(lote_id):
+    """Progresso de um lote de importações (em memória, no processo que executa o job)"""
+    if current_user.perfil not in ['admin', 'gestor']:
+        return jsonify({"error": "Sem permissão"}), 403
+
+    progresso = import_jobs.progresso(lote_id)
+    if not progresso:
+        return jsonify({"error": "Lote não encontrado"}), 404
+    return jsonify({'lote_id': lote_id, 'progresso': progresso})
+
+@app.route('/api/importacoes/<importacao_id>', methods=['GET'])
+@login_required
+def get_importacao(importacao_id):
+    """Status da importação com o progresso do job em execução"""
+    if current_user.perfil not in ['admin', 'gestor']:
+        return jsonify({"error": "Sem permissão"}), 403
+    
+    importacao = db.get_importacao(importacao_id)
+    if not importacao:
+        return jsonify({"error": "Importação não encontrada"}), 404
+    
+    resposta = {
+        'importacao_id': importacao['id'],
+        'status': importacao.get('status'),
+        'nome_arquivo': importacao.get('nome_arquivo'),
+        'total_registros': importacao.get('total_registros'),
+        'registros_importados': importacao.get('registros_importados'),
+        'mensagem_erro': importacao.get('mensagem_erro'),
+        'modo': importacao.get('modo'),
+        'ultimo_bloco': importacao.get('ultimo_bloco'),
+        'linhas_confirmadas': importacao.get('linhas_confirmadas')
+    }
+    # Progresso em memória só existe no processo que executa o job
+    progresso = import_jobs.progresso(importacao_id)
+    if progresso:
+        resposta['progresso'] = progresso
+    return jsonify(resposta)
+
+@app.route('/api/importacoes/<importacao_id>/retomar', methods=['POST'])
+@login_required
+def retomar_importacao(importacao_id):
+    """Retoma uma importação com erro a partir do último bloco confirmado"""
+    if current_user.perfil not in ['admin', 'gestor']:
+        return jsonify({"error": "Sem permissão"}), 403
+    
+    importacao = db.get_importacao(importacao_id)
+    if not importacao:
+        return jsonify({"error": "Importação não encontrada"}), 404
+    if importacao.get('status') != 'erro':
+        return jsonify({"error": f"Só importações com erro podem ser retomadas (status: {importacao.get('status')})"}), 409
+    # O arquivo só é removido quando a importação conclui
+    if not os.path.exists(import_service.caminho_upload(importacao_id)):
+        return jsonify({"error": "Arquivo da importação não está mais disponível; envie-o novamente"}), 410
+    
+    db.update_importacao(importacao_id, {'status': 'pendente', 'mensagem_erro': None})
+    try:
+        import_jobs.submeter(importacao_id, import_service.retomar_importacao, importacao_id)
+    except FilaImportacaoCheia as e:
+        db.update_importacao(importacao_id, {'status': 'erro', 'mensagem_erro': str(e)})
+        return jsonify({"success": False, "error": str(e)}), 503
+    
+    return jsonify({
+        "success": True,
+        "message": "Importação retomada",
+        "importacao_id": importacao_id,
+        "ultimo_bloco": importacao.get('ultimo_bloco'),
+        "linhas_confirmadas": importacao.get('linhas_confirmadas'),
+        "status_url": url_for('get_importacao', importacao_id=importacao_id)
+    }), 202
 
 # ========== API de Categorias ==========
 @app.route('/api/categorias', methods=['GET'])
@@ -408,7 +670,7 @@ def update_configuracao(chave):
     
     if success:
         # Log de auditoria
-        db.create_log_auditoria({
+        write_behind.registrar_log_auditoria({
             'usuario_id': current_user.id,
             'acao': 'atualizar_configuracao',
             'tabela': 'configuracoes',
@@ -1,8 +1,12 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Arquivos gerados em tempo de execução (fora do código, independente do cwd)
+INSTANCE_DIR = Path(__file__).resolve().parents[2] / 'instance'
+
 class Config:
     # Flask
     SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -16,11 +20,56 @@ class Config:
     # Database
     DATABASE_URL = os.getenv('PGURL')
     
+    # Backend: 'supabase', 'postgres' ou 'auto' (testa o Supabase e guarda o resultado)
+    DATABASE_BACKEND = os.getenv('DATABASE_BACKEND', 'auto').lower()
+    DATABASE_BACKEND_CACHE = os.getenv('DATABASE_BACKEND_CACHE', str(INSTANCE_DIR / 'db_backend.json'))
+    DATABASE_BACKEND_CACHE_TTL = int(os.getenv('DATABASE_BACKEND_CACHE_TTL', '86400'))
+    DATABASE_PROBE_TIMEOUT = float(os.getenv('DATABASE_PROBE_TIMEOUT', '3'))
+    
+    # Read replica (leituras analíticas)
+    DATABASE_READ_URL = os.getenv('PGURL_READ')
+    SUPABASE_READ_URL = os.getenv('SUPABASE_READ_URL')
+    REPLICA_LAG_WINDOW_SECONDS = float(os.getenv('REPLICA_LAG_WINDOW_SECONDS', '30'))
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))
+    
+    # Prazo padrão (segundos) para as consultas de um request
+    QUERY_DEADLINE_SECONDS = float(os.getenv('QUERY_DEADLINE_SECONDS', '10'))
+    
+    # Async database pool
+    ASYNC_POOL_MIN_SIZE = int(os.getenv('ASYNC_POOL_MIN_SIZE', '1'))
+    ASYNC_POOL_MAX_SIZE = int(os.getenv('ASYNC_POOL_MAX_SIZE', '10'))
+    
+    # Inserção em lotes via Supabase
+    SUPABASE_INSERT_CHUNK_SIZE = int(os.getenv('SUPABASE_INSERT_CHUNK_SIZE', '1000'))
+    SUPABASE_INSERT_WORKERS = int(os.getenv('SUPABASE_INSERT_WORKERS', '4'))
+    SUPABASE_INSERT_MAX_RETRIES = int(os.getenv('SUPABASE_INSERT_MAX_RETRIES', '3'))
+    SUPABASE_INSERT_BACKOFF = float(os.getenv('SUPABASE_INSERT_BACKOFF', '0.5'))
+    
+    # Partições mensais criadas à frente no deploy (scripts/garantir-particoes.py)
+    PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', '3'))
+    
+    # Janela (anos, contando o atual) consultada quando o filtro não traz período:
+    # as consultas sempre levam predicado de data (partition pruning)
+    QUERY_DEFAULT_WINDOW_YEARS = int(os.getenv('QUERY_DEFAULT_WINDOW_YEARS', '3'))
+    
     # Authentication
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
     JWT_TOKEN_LOCATION = ['headers', 'cookies']
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
     
+    # Cache de usuários autenticados (segundos; 0 desativa)
+    USER_CACHE_TTL_SECONDS = float(os.getenv('USER_CACHE_TTL_SECONDS', '60'))
+    
+    # Fila write-behind (auditoria e último acesso)
+    WRITE_BEHIND_FLUSH_MS = int(os.getenv('WRITE_BEHIND_FLUSH_MS', '500'))
+    WRITE_BEHIND_MAX_BATCH = int(os.getenv('WRITE_BEHIND_MAX_BATCH', '100'))
+    # Caminho base: cada processo grava em <nome>.<pid>.jsonl
+    WRITE_BEHIND_SPOOL = os.getenv('WRITE_BEHIND_SPOOL') or str(INSTANCE_DIR / 'write_behind.jsonl')
+    # Tentativas por evento antes de ir para <nome>.descartados.jsonl
+    WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv('WRITE_BEHIND_MAX_ATTEMPTS', '5'))
+    # Espera máxima entre tentativas com o banco indisponível (backoff exponencial)
+    WRITE_BEHIND_MAX_BACKOFF_MS = int(os.getenv('WRITE_BEHIND_MAX_BACKOFF_MS', '60000'))
+    
     # Admin credentials
     ADMIN_USER = os.getenv('ADMIN_USER', 'admin')
     ADMIN_PASSWORD_HASH = os.getenv('ADMIN_PASSWORD_HASH')
@@ -29,6 +78,23 @@ class Config:
     UPLOAD_FOLDER = 'data/uploads'
     ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls'}
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    # Uploads grandes gravados em disco em blocos (não passam por MAX_CONTENT_LENGTH)
+    UPLOAD_SPOOL_BLOCK_SIZE = int(os.getenv('UPLOAD_SPOOL_BLOCK_KB', '1024')) * 1024
+    UPLOAD_SPOOL_MAX_SIZE = int(os.getenv('UPLOAD_SPOOL_MAX_MB', '1024')) * 1024 * 1024
+    UPLOAD_SPOOL_TTL = int(os.getenv('UPLOAD_SPOOL_TTL', '86400'))  # sessões abandonadas (s)
+    
+    # Importações em segundo plano (workers simultâneos e limite de jobs ativos)
+    IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', '2'))
+    IMPORT_MAX_PENDING = int(os.getenv('IMPORT_MAX_PENDING', '10'))
+    # Linhas lidas do CSV por bloco (memória constante em arquivos grandes)
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '10000'))
+    # Processos que leem/convertem arquivos em paralelo nas importações em lote
+    IMPORT_PROCESSES = int(os.getenv('IMPORT_PROCESSES', '4'))
+    # Erros por linha: tamanho do conteúdo guardado, lote de gravação, teto gravado e amostra
+    IMPORT_ERROR_MAX_CONTENT = int(os.getenv('IMPORT_ERROR_MAX_CONTENT', '500'))
+    IMPORT_ERROR_BATCH = int(os.getenv('IMPORT_ERROR_BATCH', '1000'))
+    IMPORT_ERROR_MAX_STORED = int(os.getenv('IMPORT_ERROR_MAX_STORED', '10000'))
+    IMPORT_ERROR_SAMPLE = int(os.getenv('IMPORT_ERROR_SAMPLE', '20'))
     
     # Cache settings
     USE_RAM_CACHE = os.getenv('USE_RAM_CACHE', '0') == '1'
@@ -1,5 +1,13 @@
 """Conversores de tipos de dados."""
 
 from .base import TypeConverter
+from .distinct import distinct_values, map_distinct
+from .dates import ParsedDates, infer_date_format, parse_date_text, parse_dates
+from .numbers import ParsedNumbers, parse_br_money, parse_br_number, parse_br_numbers
 
-__all__ = ['TypeConverter']
\ No newline at end of file
+__all__ = [
+    'TypeConverter',
+    'ParsedNumbers', 'parse_br_numbers', 'parse_br_number', 'parse_br_money',
+    'ParsedDates', 'parse_dates', 'parse_date_text', 'infer_date_format',
+    'distinct_values', 'map_distinct'
+]
\ No newline at end of file
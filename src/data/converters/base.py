@@ -9,28 +9,58 @@ import json
 import pandas as pd
 import numpy as np
 
+from .distinct import map_distinct
+from .dates import DATE_FORMATS, EXCEL_EPOCH, EXCEL_EPOCH_SERIAL, iso_dates, parse_date_text, parse_dates
+from .numbers import parse_br_money, parse_br_number, parse_br_numbers
+
+
+TRUE_VALUES = ("true", "verdadeiro", "sim", "yes", "s", "y", "1", "t", "v")
+FALSE_VALUES = ("false", "falso", "não", "nao", "no", "n", "0", "f")
+
+TIME_FORMATS = ("%H:%M:%S", "%H:%M", "%H%M%S", "%H%M")
+
 
 class TypeConverter:
     """Conversor de tipos de dados com suporte a múltiplos formatos."""
     
+    # Tipos convertidos em lote por parse_br_numbers
+    NUMERIC_TYPES = ("integer", "float", "decimal", "money")
+    
     def __init__(self):
         self.custom_converters: Dict[str, Callable] = {}
         self._init_date_formats()
         
+        # Conversões padrão: por valor e por coluna
+        self.converters: Dict[str, Callable] = {
+            "text": self.to_text,
+            "integer": self.to_integer,
+            "float": self.to_float,
+            "decimal": self.to_decimal,
+            "boolean": self.to_boolean,
+            "date": self.to_date,
+            "datetime": self.to_datetime,
+            "time": self.to_time,
+            "json": self.to_json,
+            "array": self.to_array,
+            "money": self.to_money
+        }
+        self.column_converters: Dict[str, Callable[..., pd.Series]] = {
+            "text": self._text_column,
+            "integer": self._integer_column,
+            "float": self._float_column,
+            "decimal": self._decimal_column,
+            "boolean": self._boolean_column,
+            "date": self._date_column,
+            "datetime": self._datetime_column,
+            "time": self._time_column,
+            "json": self._json_column,
+            "array": self._array_column,
+            "money": self._money_column
+        }
+        
     def _init_date_formats(self):
         """Inicializa formatos de data suportados."""
-        self.date_formats = [
-            "%Y-%m-%d",
-            "%d/%m/%Y",
-            "%d-%m-%Y",
-            "%Y/%m/%d",
-            "%d.%m.%Y",
-            "%Y-%m-%d %H:%M:%S",
-            "%d/%m/%Y %H:%M:%S",
-            "%d-%m-%Y %H:%M:%S",
-            "%Y/%m/%d %H:%M:%S",
-            "%d.%m.%Y %H:%M:%S"
-        ]
+        self.date_formats = list(DATE_FORMATS)
         
     def register_converter(self, type_name: str, converter: Callable[[Any], Any]):
         """Registra um conversor customizado."""
@@ -45,22 +75,7 @@ class TypeConverter:
         if target_type in self.custom_converters:
             return self.custom_converters[target_type](value)
             
-        # Conversões padrão
-        converters = {
-            "text": self.to_text,
-            "integer": self.to_integer,
-            "float": self.to_float,
-            "decimal": self.to_decimal,
-            "boolean": self.to_boolean,
-            "date": self.to_date,
-            "datetime": self.to_datetime,
-            "time": self.to_time,
-            "json": self.to_json,
-            "array": self.to_array,
-            "money": self.to_money
-        }
-        
-        converter = converters.get(target_type.lower())
+        converter = self.converters.get(target_type.lower())
         if converter:
             return converter(value, **kwargs)
         else:
@@ -90,59 +105,20 @@ class TypeConverter:
         if value is None or value == "":
             return None
             
-        try:
-            # Trata booleanos
-            if isinstance(value, bool):
-                return 1 if value else 0
-                
-            # Trata strings
-            if isinstance(value, str):
-                # Remove espaços e caracteres não numéricos comuns
-                cleaned = value.strip().replace(" ", "")
-                
-                # Trata valores monetários
-                if "R$" in cleaned:
-                    cleaned = cleaned.replace("R$", "").replace(".", "").replace(",", ".")
-                    
-                return int(float(cleaned))
-                
-            # Trata floats e decimais
-            if isinstance(value, (float, Decimal)):
-                return int(value)
-                
-            return int(value)
+        # Trata booleanos
+        if isinstance(value, bool):
+            return 1 if value else 0
             
-        except (ValueError, TypeError, InvalidOperation):
-            return None
+        # Strings (inclusive monetárias) usam o mesmo parser de to_float
+        number = parse_br_number(value)
+        return int(number) if number is not None else None
             
     def to_float(self, value: Any, **kwargs) -> Optional[float]:
-        """Converte para float."""
+        """Converte para float (aceita formato brasileiro e R$)."""
         if value is None or value == "":
             return None
             
-        try:
-            # Trata strings
-            if isinstance(value, str):
-                # Remove espaços
-                cleaned = value.strip().replace(" ", "")
-                
-                # Trata formato brasileiro de números
-                if "," in cleaned:
-                    # Verifica se é formato brasileiro (1.234,56)
-                    if "." in cleaned and cleaned.rindex(",") > cleaned.rindex("."):
-                        cleaned = cleaned.replace(".", "").replace(",", ".")
-                    else:
-                        cleaned = cleaned.replace(",", ".")
-                        
-                # Remove símbolos monetários
-                cleaned = cleaned.replace("R$", "").replace("$", "")
-                
-                return float(cleaned)
-                
-            return float(value)
-            
-        except (ValueError, TypeError):
-            return None
+        return parse_br_number(value)
             
     def to_decimal(self, value: Any, **kwargs) -> Optional[Decimal]:
         """Converte para Decimal."""
@@ -174,11 +150,11 @@ class TypeConverter:
             value_lower = value.lower().strip()
             
             # Valores verdadeiros
-            if value_lower in ["true", "verdadeiro", "sim", "yes", "s", "y", "1", "t", "v"]:
+            if value_lower in TRUE_VALUES:
                 return True
                 
             # Valores falsos
-            if value_lower in ["false", "falso", "não", "nao", "no", "n", "0", "f"]:
+            if value_lower in FALSE_VALUES:
                 return False
                 
         # Números
@@ -212,8 +188,8 @@ class TypeConverter:
         if isinstance(value, (int, float)):
             try:
                 # Tenta como data Excel
-                if value > 25569:  # 01/01/1970 em Excel
-                    excel_date = pd.Timestamp('1899-12-30') + pd.Timedelta(days=value)
+                if value > EXCEL_EPOCH_SERIAL:
+                    excel_date = EXCEL_EPOCH + pd.Timedelta(days=value)
                     return excel_date.date().isoformat()
                     
                 # Tenta como timestamp Unix
@@ -226,13 +202,10 @@ class TypeConverter:
         if isinstance(value, str):
             value = value.strip()
             
-            # Tenta cada formato de data
-            for fmt in self.date_formats:
-                try:
-                    dt = datetime.strptime(value, fmt)
-                    return dt.date().isoformat()
-                except ValueError:
-                    continue
+            # O formato é escolhido pela forma do texto (sem sondar por exceção)
+            dt = parse_date_text(value, self.date_formats)
+            if dt is not None:
+                return dt.date().isoformat()
                     
         return None
         
@@ -272,14 +245,9 @@ class TypeConverter:
             
         # Trata strings
         if isinstance(value, str):
-            time_formats = ["%H:%M:%S", "%H:%M", "%H%M%S", "%H%M"]
-            
-            for fmt in time_formats:
-                try:
-                    t = datetime.strptime(value.strip(), fmt).time()
-                    return t.isoformat()
-                except ValueError:
-                    continue
+            dt = parse_date_text(value.strip(), TIME_FORMATS)
+            if dt is not None:
+                return dt.time().isoformat()
                     
         return None
         
@@ -341,22 +309,48 @@ class TypeConverter:
         if value is None or value == "":
             return None
             
-        try:
-            # Usa to_decimal para conversão base
-            decimal_value = self.to_decimal(value)
-            
-            if decimal_value is not None:
-                # Arredonda para 2 casas decimais
-                return decimal_value.quantize(Decimal('0.01'))
-                
-            return None
-            
-        except (ValueError, InvalidOperation):
-            return None
+        return parse_br_money(value)
             
     def batch_convert(self, values: List[Any], target_type: str, **kwargs) -> List[Any]:
         """Converte uma lista de valores."""
+        # Tipos numéricos: parser vetorizado na lista inteira
+        if target_type not in self.custom_converters and target_type.lower() in self.NUMERIC_TYPES:
+            return self._batch_convert_numeric(values, target_type.lower())
+            
         return [self.convert(value, target_type, **kwargs) for value in values]
+    
+    def _batch_convert_numeric(self, values: List[Any], target_type: str) -> List[Any]:
+        """Converte uma lista numérica de uma vez (mesmo resultado do convert por valor)."""
+        if target_type == "money":
+            cents = parse_br_numbers(values, cents=True).values
+            return [None if pd.isna(c) else Decimal(int(c)).scaleb(-2) for c in cents]
+            
+        numbers = parse_br_numbers(values).values.to_numpy()
+        missing = np.isnan(numbers)
+        if target_type == "integer":
+            return [None if m else int(v) for v, m in zip(numbers, missing)]
+        if target_type == "decimal":
+            return [None if m else Decimal(str(v)) for v, m in zip(numbers, missing)]
+        return [None if m else float(v) for v, m in zip(numbers, missing)]
+        
+    def convert_series(self, series: pd.Series, target_type: str, **kwargs) -> pd.Series:
+        """Converte uma coluna inteira para o tipo alvo.
+        
+        Cada tipo tem um kernel de coluna (operações pandas/numpy); só as linhas
+        que o kernel não resolve passam pelo ``convert`` valor a valor. Nulos
+        (None, NaN, NaT) viram None. Floats saem como ``float64``, inteiros como
+        ``int64`` (ou objetos, se houver nulos) e os demais tipos como objetos
+        Python iguais aos do ``convert`` (textos ISO para datas, Decimal para
+        decimal/money).
+        """
+        if target_type in self.custom_converters:
+            converter = self.custom_converters[target_type]
+            return map_distinct(series, converter)
+            
+        kernel = self.column_converters.get(target_type.lower())
+        if kernel is None:
+            raise ValueError(f"Tipo de conversão não suportado: {target_type}")
+        return kernel(series, **kwargs)
         
     def convert_dataframe(self, df: pd.DataFrame, type_mapping: Dict[str, str], **kwargs) -> pd.DataFrame:
         """Converte colunas de um DataFrame para os tipos especificados."""
@@ -364,10 +358,174 @@ class TypeConverter:
         
         for column, target_type in type_mapping.items():
             if column in df_converted.columns:
-                df_converted[column] = self.batch_convert(
-                    df_converted[column].tolist(),
-                    target_type,
-                    **kwargs
-                )
+                df_converted[column] = self.convert_series(df_converted[column], target_type, **kwargs)
                 
-        return df_converted
\ No newline at end of file
+        return df_converted
+        
+    # Kernels de coluna (trabalham sobre um array de objetos do tamanho da coluna)
+    
+    def _fallback(self, series: pd.Series, result: np.ndarray, rows: np.ndarray,
+                  converter: Callable, **kwargs) -> pd.Series:
+        """Converte pelo ``convert`` por valor só as linhas ``rows`` (máscara), uma vez
+        por valor distinto, e monta a coluna."""
+        if rows.any():
+            converted = map_distinct(series[rows], lambda value: converter(value, **kwargs))
+            result[rows] = converted.to_numpy()
+        return pd.Series(result, index=series.index, dtype=object)
+        
+    def _text_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        missing = series.isna().to_numpy()
+        result = np.full(len(series), None, dtype=object)
+        
+        if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+            result[~missing] = series[~missing].astype(str).to_numpy(dtype=object)
+            return pd.Series(result, index=series.index, dtype=object)
+        if _is_naive_datetime(series) and not _has_subseconds(series):
+            result[~missing] = series[~missing].dt.strftime("%Y-%m-%dT%H:%M:%S").to_numpy(dtype=object)
+            return pd.Series(result, index=series.index, dtype=object)
+            
+        strings = _string_mask(series)
+        result[strings] = series[strings].to_numpy(dtype=object)
+        return self._fallback(series, result, ~strings & ~missing, self.to_text)
+        
+    def _numbers(self, series: pd.Series) -> pd.Series:
+        # bool vira 0/1 como no to_integer/to_float
+        if pd.api.types.is_bool_dtype(series.dtype):
+            return series.astype('float64')
+        return parse_br_numbers(series).values
+        
+    def _integer_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        # int() trunca em direção a zero
+        numbers = np.trunc(self._numbers(series).to_numpy(dtype='float64'))
+        missing = np.isnan(numbers)
+        if not missing.any():
+            return pd.Series(numbers.astype(np.int64), index=series.index)
+        result = np.full(len(numbers), None, dtype=object)
+        result[~missing] = numbers[~missing].astype(np.int64).tolist()
+        return pd.Series(result, index=series.index, dtype=object)
+        
+    def _float_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        return self._numbers(series).astype('float64')
+        
+    def _decimal_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        return map_distinct(self._numbers(series), lambda v: Decimal(str(v)))
+        
+    def _money_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        if pd.api.types.is_bool_dtype(series.dtype):
+            series = series.astype('float64')
+        cents = parse_br_numbers(series, cents=True).values
+        return map_distinct(cents, lambda c: Decimal(int(c)).scaleb(-2))
+        
+    def _boolean_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        missing = series.isna().to_numpy()
+        result = np.full(len(series), None, dtype=object)
+        
+        if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+            result[~missing] = series[~missing].astype(bool).to_numpy(dtype=object)
+            return pd.Series(result, index=series.index, dtype=object)
+            
+        strings = _string_mask(series)
+        if strings.any():
+            words = {**{w: True for w in TRUE_VALUES}, **{w: False for w in FALSE_VALUES}}
+            mapped = map_distinct(series[strings], lambda text: words.get(text.lower().strip()))
+            result[strings] = mapped.to_numpy()
+        return self._fallback(series, result, ~strings & ~missing, self.to_boolean)
+        
+    def _date_strings(self, series: pd.Series, suffix: str = "") -> tuple:
+        """Kernel comum de data/datetime: (resultado, linhas que ficam para o fallback).
+        
+        O formato da coluna é inferido por amostra e a coluna é lida de uma vez
+        (ver ``parse_dates``); só os valores que não viraram data seguem para o
+        ``convert`` por valor.
+        """
+        missing = series.isna().to_numpy()
+        parsed = parse_dates(series, self.date_formats)
+        dates = parsed.values.to_numpy()
+        ok = ~np.isnat(dates)
+        result = np.full(len(series), None, dtype=object)
+        result[ok] = iso_dates(dates[ok], suffix)
+        return result, parsed.errors.to_numpy() & ~missing
+        
+    def _date_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            missing = series.isna().to_numpy()
+            result = np.full(len(series), None, dtype=object)
+            result[~missing] = series[~missing].dt.strftime("%Y-%m-%d").to_numpy(dtype=object)
+            return pd.Series(result, index=series.index, dtype=object)
+            
+        result, rows = self._date_strings(series)
+        return self._fallback(series, result, rows, self.to_date)
+        
+    def _datetime_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        missing = series.isna().to_numpy()
+        if _is_naive_datetime(series) and not _has_subseconds(series):
+            result = np.full(len(series), None, dtype=object)
+            result[~missing] = series[~missing].dt.strftime("%Y-%m-%dT%H:%M:%S").to_numpy(dtype=object)
+            return pd.Series(result, index=series.index, dtype=object)
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return self._fallback(series, np.full(len(series), None, dtype=object), ~missing, self.to_datetime)
+            
+        # Textos e números viram a data à meia-noite, como no to_datetime;
+        # objetos date/datetime mantêm o horário e vão pelo convert por valor
+        result, rows = self._date_strings(series, "T00:00:00")
+        if not pd.api.types.is_numeric_dtype(series.dtype):
+            rows |= ~_string_mask(series) & ~missing
+        return self._fallback(series, result, rows, self.to_datetime)
+        
+    def _time_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        missing = series.isna().to_numpy()
+        result = np.full(len(series), None, dtype=object)
+        
+        if _is_naive_datetime(series) and not _has_subseconds(series):
+            result[~missing] = series[~missing].dt.strftime("%H:%M:%S").to_numpy(dtype=object)
+            return pd.Series(result, index=series.index, dtype=object)
+            
+        strings = _string_mask(series)
+        parsed = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[us]')
+        if strings.any():
+            parsed[strings] = parse_dates(series[strings], TIME_FORMATS).values.to_numpy()
+        ok = ~np.isnat(parsed)
+        result[ok] = np.char.partition(np.datetime_as_string(parsed[ok], unit='s'), 'T')[:, 2].astype(object)
+        return self._fallback(series, result, ~strings & ~missing, self.to_time)
+        
+    def _json_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        # Validar/serializar JSON é por valor; o kernel só evita repetir textos iguais
+        missing = series.isna().to_numpy()
+        result = np.full(len(series), None, dtype=object)
+        strings = _string_mask(series)
+        if strings.any():
+            result[strings] = map_distinct(series[strings], self.to_json).to_numpy()
+        return self._fallback(series, result, ~strings & ~missing, self.to_json)
+        
+    def _array_column(self, series: pd.Series, **kwargs) -> pd.Series:
+        missing = series.isna().to_numpy()
+        result = np.full(len(series), None, dtype=object)
+        strings = _string_mask(series)
+        json_rows = np.zeros(len(series), dtype=bool)
+        if strings.any():
+            delimiter = kwargs.get("delimiter", ",")
+            texts = series[strings].str.strip()
+            json_rows[strings] = (texts.str.startswith("[") & texts.str.endswith("]")).to_numpy()
+            # Texto simples: split vetorizado pelo delimitador
+            for position, parts in zip(np.flatnonzero(strings),
+                                       texts.str.split(delimiter, regex=False).to_numpy()):
+                result[position] = [item for item in (part.strip() for part in parts) if item]
+        return self._fallback(series, result, (~strings & ~missing) | json_rows, self.to_array, **kwargs)
+        
+        
+def _string_mask(series: pd.Series) -> np.ndarray:
+    """Linhas cujo valor é texto."""
+    values = series.to_numpy(dtype=object, na_value=None) if series.dtype != object else series.to_numpy()
+    if pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+        return pd.notna(values)
+    return np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+    
+    
+def _is_naive_datetime(series: pd.Series) -> bool:
+    return pd.api.types.is_datetime64_dtype(series.dtype) and getattr(series.dtype, 'tz', None) is None
+    
+    
+def _has_subseconds(series: pd.Series) -> bool:
+    """isoformat inclui microssegundos quando há; strftime não."""
+    valid = series.dropna()
+    return bool(((valid.dt.microsecond != 0) | (valid.dt.nanosecond != 0)).any())
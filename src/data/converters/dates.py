@@ -0,0 +1,258 @@
+"""
+Inferência de formato e parse vetorizado de datas.
+
+Em vez de tentar cada formato em cada valor (``strptime`` dentro de
+``try/except``), uma amostra de valores distintos da coluna escolhe o formato
+(ou o modo serial do Excel / timestamp Unix para números) e a coluna inteira é
+lida com uma única chamada de ``pd.to_datetime(format=...)``. Só os valores que
+o formato escolhido não lê (outliers) passam pelos demais formatos.
+
+Para valores avulsos, cada formato tem uma expressão regular equivalente: o
+``strptime`` só roda no formato cujo padrão casa com o texto.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+import re
+
+import numpy as np
+import pandas as pd
+
+
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+    "%d.%m.%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d-%m-%Y %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S"
+)
+
+# Modos inferidos para colunas numéricas
+EXCEL_SERIAL = "excel"
+UNIX_TIMESTAMP = "unix"
+
+# Números acima disso são datas seriais do Excel (01/01/1970 = 25569), até 31/12/9999
+EXCEL_EPOCH_SERIAL = 25569
+EXCEL_MAX_SERIAL = 2958465
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+
+# Valores distintos usados para escolher o formato
+SAMPLE_SIZE = 200
+
+_DIRECTIVES = {
+    "%Y": r"\d{4}",
+    "%m": r"\d{1,2}",
+    "%d": r"\d{1,2}",
+    "%H": r"\d{1,2}",
+    "%M": r"\d{1,2}",
+    "%S": r"\d{1,2}",
+}
+
+_PATTERNS = {}
+
+
+@dataclass
+class ParsedDates:
+    """Resultado do parse de uma coluna."""
+    values: pd.Series       # datetime64[us] (NaT em nulos, brancos e erros)
+    errors: pd.Series       # True onde havia valor que não é data
+    format: Optional[str]   # formato (ou modo) inferido; None sem amostra
+
+    @property
+    def has_errors(self) -> bool:
+        return bool(self.errors.any())
+
+
+def format_pattern(fmt: str) -> "re.Pattern":
+    """Expressão regular com a mesma forma do formato (``%d/%m/%Y`` -> ``\\d{1,2}/...``)."""
+    pattern = _PATTERNS.get(fmt)
+    if pattern is None:
+        parts = re.split(r'(%[a-zA-Z])', fmt)
+        pattern = re.compile(''.join(_DIRECTIVES.get(p, re.escape(p)) for p in parts))
+        _PATTERNS[fmt] = pattern
+    return pattern
+
+
+def parse_date_text(text: str, formats: Sequence[str] = DATE_FORMATS) -> Optional[datetime]:
+    """Lê um texto com o primeiro formato que casa, sem sondar por exceção."""
+    for fmt in formats:
+        if format_pattern(fmt).fullmatch(text):
+            try:
+                return datetime.strptime(text, fmt)
+            except ValueError:
+                # Forma certa, valor impossível (ex.: 31/02); outro formato pode servir
+                continue
+    return None
+
+
+def infer_date_format(values: Union[pd.Series, Iterable[Any]],
+                      formats: Sequence[str] = DATE_FORMATS,
+                      sample_size: int = SAMPLE_SIZE) -> Optional[str]:
+    """Escolhe o formato da coluna a partir de uma amostra de valores distintos.
+
+    Colunas numéricas retornam ``EXCEL_SERIAL`` (valores típicos no intervalo
+    de seriais do Excel) ou ``UNIX_TIMESTAMP``; colunas de texto, o formato que
+    lê mais valores da amostra (None se nenhum lê).
+    """
+    serie = _as_series(values)
+    numbers = _numeric_values(serie)
+    if numbers is not None:
+        sample = numbers[np.isfinite(numbers)][:sample_size]
+        if not len(sample):
+            return None
+        typical = np.median(sample)
+        return EXCEL_SERIAL if EXCEL_EPOCH_SERIAL < typical <= EXCEL_MAX_SERIAL else UNIX_TIMESTAMP
+
+    return _infer_text_format(_texts(serie)[0], formats, sample_size)
+
+
+def _infer_text_format(texts: np.ndarray, formats: Sequence[str], sample_size: int) -> Optional[str]:
+    sample = pd.Series(pd.unique(texts[texts != ""])[:sample_size], dtype=object)
+    if sample.empty:
+        return None
+    best, best_count = None, 0
+    for fmt in formats:
+        count = int(pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum())
+        if count > best_count:
+            best, best_count = fmt, count
+            if count == len(sample):
+                break
+    return best
+
+
+def parse_dates(values: Union[pd.Series, Iterable[Any]],
+                formats: Sequence[str] = DATE_FORMATS,
+                date_format: Optional[str] = None,
+                sample_size: int = SAMPLE_SIZE) -> ParsedDates:
+    """Converte uma coluna de datas de uma vez.
+
+    ``date_format`` força o formato (ou modo); sem ele o formato é inferido.
+    Textos que o formato principal não lê tentam os demais formatos, só sobre
+    as linhas pendentes. Objetos ``date``/``datetime`` em colunas mistas são
+    aceitos como estão.
+    """
+    serie = _as_series(values)
+    n = len(serie)
+    parsed = np.full(n, np.datetime64('NaT'), dtype='datetime64[us]')
+
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        if getattr(serie.dtype, 'tz', None) is not None:
+            serie = serie.dt.tz_localize(None)
+        parsed = serie.to_numpy(dtype='datetime64[us]')
+        return ParsedDates(pd.Series(parsed, index=serie.index), pd.Series(False, index=serie.index), date_format)
+
+    numbers = _numeric_values(serie)
+    if numbers is not None:
+        fmt = date_format or infer_date_format(serie, formats, sample_size)
+        finite = np.isfinite(numbers)
+        if fmt == EXCEL_SERIAL:
+            # Como no to_date: até 25569 o número é tratado como timestamp Unix
+            excel = finite & (numbers > EXCEL_EPOCH_SERIAL) & (numbers <= EXCEL_MAX_SERIAL)
+            deltas = pd.to_timedelta(pd.Series(numbers[excel]), unit='D')
+            parsed[excel] = (EXCEL_EPOCH + deltas).to_numpy(dtype='datetime64[us]')
+            unix = finite & (numbers <= EXCEL_EPOCH_SERIAL)
+        else:
+            unix = finite
+        if unix.any():
+            parsed[unix] = _from_timestamps(numbers[unix])
+        errors = np.isnat(parsed) & finite
+        return ParsedDates(pd.Series(parsed, index=serie.index), pd.Series(errors, index=serie.index), fmt)
+
+    objects = serie.to_numpy(dtype=object, na_value=None)
+    texts, strings = _texts(serie)
+    fmt = date_format or _infer_text_format(texts, formats, sample_size)
+    # Cada texto distinto é lido uma vez e o resultado espalhado pelos códigos
+    codes, distinct = pd.factorize(texts)
+    distinct_parsed, distinct_pending = _parse_texts(np.asarray(distinct, dtype=object), formats, fmt)
+    parsed, pending = distinct_parsed[codes], distinct_pending[codes]
+
+    for position in np.flatnonzero(~strings & pd.notna(objects)):
+        value = objects[position]
+        if isinstance(value, (date, datetime, np.datetime64)):
+            parsed[position] = np.datetime64(pd.Timestamp(value).to_pydatetime(), 'us')
+        else:
+            pending[position] = True
+
+    return ParsedDates(pd.Series(parsed, index=serie.index), pd.Series(pending, index=serie.index), fmt)
+
+
+def _parse_texts(texts: np.ndarray, formats: Sequence[str],
+                 fmt: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Lê textos com o formato principal e depois os demais, só sobre os pendentes."""
+    parsed = np.full(len(texts), np.datetime64('NaT'), dtype='datetime64[us]')
+    pending = texts != ""
+    ordered = ([fmt] if fmt in formats else []) + [f for f in formats if f != fmt]
+    for current in ordered:
+        if not pending.any():
+            break
+        rows = np.flatnonzero(pending)
+        attempt = pd.to_datetime(pd.Series(texts[rows]), format=current, errors='coerce')
+        matched = attempt.notna().to_numpy()
+        parsed[rows[matched]] = attempt[matched].to_numpy(dtype='datetime64[us]')
+        pending[rows[matched]] = False
+
+    # Fora do intervalo do pandas (ex.: ano 1)
+    for position in np.flatnonzero(pending):
+        value = parse_date_text(texts[position], formats)
+        if value is not None:
+            parsed[position] = np.datetime64(value, 'us')
+            pending[position] = False
+    return parsed, pending
+
+
+def iso_dates(values: np.ndarray, suffix: str = "") -> np.ndarray:
+    """``datetime64`` (sem NaT) como textos ``AAAA-MM-DD`` (+ ``suffix``)."""
+    # Datas se repetem muito: formata cada dia distinto uma vez
+    codes, days = pd.factorize(values.astype('datetime64[D]'))
+    texts = np.datetime_as_string(np.asarray(days, dtype='datetime64[D]'), unit='D')
+    if suffix:
+        texts = np.char.add(texts, suffix)
+    return texts.astype(object)[codes]
+
+
+def _as_series(values) -> pd.Series:
+    return values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+
+
+def _numeric_values(serie: pd.Series) -> Optional[np.ndarray]:
+    """Valores float da coluna, se ela for numérica (bool não conta)."""
+    if pd.api.types.is_bool_dtype(serie.dtype) or not pd.api.types.is_numeric_dtype(serie.dtype):
+        return None
+    return serie.to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _texts(serie: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Textos (sem espaços nas pontas) da coluna, "" onde o valor não é texto,
+    e a máscara das linhas em texto."""
+    objects = serie.to_numpy(dtype=object, na_value=None)
+    if pd.api.types.infer_dtype(objects, skipna=True) in ('string', 'empty'):
+        strings = pd.notna(objects)
+    else:
+        strings = np.fromiter((isinstance(v, str) for v in objects), dtype=bool, count=len(objects))
+    texts = np.full(len(objects), "", dtype=object)
+    if strings.any():
+        # strip uma vez por texto distinto
+        codes, uniques = pd.factorize(objects[strings])
+        texts[strings] = np.array([u.strip() for u in uniques], dtype=object)[codes]
+    return texts, strings
+
+
+def _from_timestamps(seconds: np.ndarray) -> np.ndarray:
+    """Timestamps Unix no horário local (como ``datetime.fromtimestamp``)."""
+    result = np.full(len(seconds), np.datetime64('NaT'), dtype='datetime64[us]')
+    codes, uniques = pd.factorize(seconds)
+    converted: List[Any] = []
+    for value in uniques:
+        try:
+            converted.append(np.datetime64(datetime.fromtimestamp(value), 'us'))
+        except (OverflowError, OSError, ValueError):
+            converted.append(np.datetime64('NaT'))
+    if len(uniques):
+        result[:] = np.asarray(converted, dtype='datetime64[us]')[codes]
+    return result
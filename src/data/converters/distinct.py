@@ -0,0 +1,58 @@
+"""
+Processamento por valor distinto.
+
+Colunas categóricas (unidade, squad, operação, situação, categoria...) têm
+poucas dezenas de valores distintos em centenas de milhares de linhas. Aqui a
+coluna é fatorada (``pd.factorize``), a função roda uma vez por valor distinto
+e o resultado é espalhado de volta pelos códigos: o custo acompanha a
+cardinalidade, não o número de linhas.
+"""
+
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def distinct_values(values: pd.Series) -> Tuple[np.ndarray, List[Any]]:
+    """Códigos por linha e lista de valores distintos da coluna.
+
+    O último valor distinto é sempre None, e os nulos (None, NaN, NaT) apontam
+    para ele. Colunas com valores não hasheáveis (listas, dicts) não são
+    fatoradas: cada linha é o seu próprio valor.
+    """
+    try:
+        codes, uniques = pd.factorize(values)
+    except TypeError:
+        objects = values.to_numpy(dtype=object)
+        return np.arange(len(objects)), [None if _is_missing(v) else v for v in objects]
+    uniques = list(uniques)
+    codes = np.where(codes < 0, len(uniques), codes)
+    return codes, uniques + [None]
+
+
+def map_distinct(values: pd.Series,
+                 func: Callable[[Any], Any],
+                 include_missing: bool = False,
+                 missing_value: Any = None) -> pd.Series:
+    """Aplica ``func`` uma vez por valor distinto e espalha o resultado.
+
+    Nulos (None, NaN, NaT) viram ``missing_value``; com ``include_missing``, o
+    resultado de ``func(None)``.
+    """
+    codes, uniques = distinct_values(values)
+    mapped = np.empty(len(uniques), dtype=object)
+    for i, value in enumerate(uniques):
+        if value is None and not include_missing:
+            mapped[i] = missing_value
+        else:
+            mapped[i] = func(value)
+    return pd.Series(mapped[codes], index=values.index, dtype=object)
+
+
+def _is_missing(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, (list, dict, tuple, set, np.ndarray)):
+        return False
+    return bool(pd.isna(value))
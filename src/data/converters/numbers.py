@@ -0,0 +1,295 @@
+"""
+Parser vetorizado de números e valores monetários no formato brasileiro.
+
+Aceita ``1.234,56``, ``R$ 1.234,56``, ``-R$ 10,00``, ``(10,00)``, ``1234.56`` e
+``1,234.56``. O sinal (``-`` ou parênteses) só vale antes ou depois do número
+e o símbolo de moeda só como prefixo: ``1-2``, ``1$2`` e ``12$`` são erros.
+O separador decimal é o último entre vírgula e ponto; só pontos
+(``1.234.567``) são separadores de milhar, e um ponto único seguido de
+exatamente 3 dígitos também (``R$ 1.234`` = 1234, como no formato brasileiro;
+``1.5`` e ``1234.56`` continuam decimais). Brancos viram nulo sem erro; texto
+que não é número vira nulo e é marcado na máscara de erros.
+
+A coluna inteira é processada de uma vez: os textos viram uma matriz de códigos
+(numpy ``U``) e dígitos, separadores e sinal são resolvidos com operações de
+array, sem laço Python por valor.
+"""
+
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Iterable, Optional, Union
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# Textos maiores que isso não são números (e inflariam a matriz de códigos)
+MAX_NUMBER_LENGTH = 64
+
+# Inteiro e fração com até 15 dígitos cabem exatos em int64 (inclusive em centavos)
+MAX_DIGITS = 15
+
+_POWERS = 10 ** np.arange(MAX_DIGITS + 1, dtype=np.int64)
+
+_SYMBOLS = re.compile(r'R\$|[$\s ]')
+
+# Corpo do número: do primeiro ao último dígito ou separador
+_BODY = re.compile(r'[0-9.,](?:.*[0-9.,])?', re.S)
+_INVALID_IN_BODY = re.compile(r'[^0-9.,\s]')
+
+# Ponto único como milhar (sem vírgula): 1 a 3 dígitos sem zero à esquerda e 3 depois
+_THOUSANDS = re.compile(r'[1-9]\d{0,2}\.\d{3}')
+
+
+@dataclass
+class ParsedNumbers:
+    """Resultado do parse de uma coluna."""
+    values: pd.Series   # float64, ou Int64 em centavos (nulo em brancos e erros)
+    errors: pd.Series   # True onde havia texto que não é número
+
+    @property
+    def has_errors(self) -> bool:
+        return bool(self.errors.any())
+
+
+def parse_br_numbers(values: Union[pd.Series, Iterable[Any]], cents: bool = False) -> ParsedNumbers:
+    """Converte uma coluna de números em texto (formato brasileiro) de uma vez.
+
+    Com ``cents=True`` retorna inteiros em centavos (arredondamento meio para cima),
+    exatos mesmo para valores grandes.
+    """
+    serie = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+
+    if pd.api.types.is_bool_dtype(serie.dtype) or pd.api.types.is_numeric_dtype(serie.dtype):
+        numeros = serie.astype('float64')
+        erros = pd.Series(False, index=serie.index)
+        if cents:
+            return ParsedNumbers(_float_to_cents(numeros), erros)
+        return ParsedNumbers(numeros, erros)
+
+    n = len(serie)
+    objetos = serie.to_numpy(dtype=object, na_value=None)
+    if pd.api.types.infer_dtype(objetos, skipna=True) in ('string', 'empty'):
+        textual = pd.notna(objetos)
+    else:
+        textual = np.fromiter((isinstance(v, str) for v in objetos), dtype=bool, count=n)
+
+    inteiros = np.zeros(n, dtype=np.int64)
+    fracoes = np.zeros(n, dtype=np.int64)
+    casas = np.zeros(n, dtype=np.int64)
+    negativos = np.zeros(n, dtype=bool)
+    erros = np.zeros(n, dtype=bool)
+    nulos = np.ones(n, dtype=bool)
+
+    if textual.any():
+        # Colunas de valores repetem muito (preços, descontos zerados): o kernel
+        # roda só sobre os textos distintos e o resultado é espalhado pelos códigos
+        posicoes, textos = pd.factorize(objetos[textual])
+        textos = np.asarray(textos, dtype=object)
+        longos = np.fromiter(map(len, textos), dtype=np.int64, count=len(textos)) > MAX_NUMBER_LENGTH
+        if longos.any():
+            textos = np.where(longos, '', textos)
+        i, f, c, neg, vazio, erro = _parse_text_matrix(np.asarray(textos, dtype='U'))
+        erro |= longos
+        inteiros[textual], fracoes[textual], casas[textual] = i[posicoes], f[posicoes], c[posicoes]
+        negativos[textual], erros[textual] = neg[posicoes], erro[posicoes]
+        nulos[textual] = (vazio | erro)[posicoes]
+
+    # Valores já numéricos misturados na coluna (ex.: células numéricas do Excel)
+    outros = ~textual & pd.notna(objetos)
+    valores_outros = None
+    if outros.any():
+        valores_outros = pd.to_numeric(pd.Series(objetos[outros]), errors='coerce').to_numpy(dtype='float64')
+        erros[outros] = np.isnan(valores_outros)
+
+    if cents:
+        resultado = _to_cents(inteiros, fracoes, casas, negativos)
+        mascara = nulos.copy()
+        if valores_outros is not None:
+            centavos_outros = _float_to_cents(pd.Series(valores_outros))
+            resultado[outros] = centavos_outros.fillna(0).to_numpy(dtype=np.int64)
+            mascara[outros] = centavos_outros.isna().to_numpy()
+        valores = pd.Series(pd.arrays.IntegerArray(resultado, mascara), index=serie.index)
+    else:
+        resultado = inteiros + fracoes / _POWERS[casas]
+        resultado = np.where(negativos, -resultado, resultado)
+        resultado[nulos] = np.nan
+        if valores_outros is not None:
+            resultado[outros] = valores_outros
+        valores = pd.Series(resultado, index=serie.index, dtype='float64')
+
+    return ParsedNumbers(valores, pd.Series(erros, index=serie.index))
+
+
+def _parse_text_matrix(textos: np.ndarray):
+    """Kernel do parse sobre a matriz de códigos dos textos.
+
+    A matriz é transposta (uma linha por posição de caractere, uma coluna por
+    texto) para que as reduções por texto somem linhas contíguas.
+    """
+    n = len(textos)
+    largura = textos.dtype.itemsize // 4
+    # Códigos fora do latin-1 viram 255, que não é caractere aceito
+    codigos = np.minimum(textos.view(np.uint32).reshape(n, largura).T, 255).astype(np.uint8)
+    posicoes = np.arange(largura, dtype=np.int16)[:, None]
+
+    digito = (codigos - np.uint8(48)) < 10
+    virgula = codigos == 44
+    ponto = codigos == 46
+    menos = codigos == 45
+    abre = codigos == 40
+    fecha = codigos == 41
+    cifrao = codigos == 36
+    espaco = (codigos == 0) | (codigos == 32) | (codigos == 9) | (codigos == 0xA0)
+    real = np.zeros_like(cifrao)
+    real[:-1] = (codigos[:-1] == 82) & cifrao[1:]   # 'R' só como parte de 'R$'
+
+    aceito = digito | virgula | ponto | menos | abre | fecha | cifrao | real | espaco
+    invalido = ~aceito.all(axis=0)
+
+    # Corpo (do primeiro ao último dígito ou separador): só dígitos, separadores e
+    # espaços; sinal e parênteses ficam fora dele e a moeda só antes
+    numerico = digito | virgula | ponto
+    inicio_corpo = numerico.argmax(axis=0).astype(np.int16)
+    fim_corpo = (largura - 1 - numerico[::-1].argmax(axis=0)).astype(np.int16)
+    antes_do_corpo = posicoes < inicio_corpo
+    depois_do_corpo = posicoes > fim_corpo
+    no_corpo = ~antes_do_corpo & ~depois_do_corpo
+    fora_de_lugar = (
+        (no_corpo & ~(numerico | espaco)).any(axis=0)
+        | ((cifrao | abre) & ~antes_do_corpo).any(axis=0)
+        | (fecha & ~depois_do_corpo).any(axis=0)
+        | (cifrao.sum(axis=0) > 1)
+    ) & numerico.any(axis=0)
+    vazio = espaco.all(axis=0)
+
+    # Separador decimal: o último entre vírgula e ponto; só pontos = milhar
+    ultima_virgula = np.full(n, -1, dtype=np.int16)
+    ultimo_ponto = np.full(n, -1, dtype=np.int16)
+    for j in range(largura):
+        np.copyto(ultima_virgula, j, where=virgula[j])
+        np.copyto(ultimo_ponto, j, where=ponto[j])
+    n_virgulas = virgula.sum(axis=0, dtype=np.int16)
+    n_pontos = ponto.sum(axis=0, dtype=np.int16)
+    decimal_virgula = ultima_virgula > ultimo_ponto
+    # Ponto único sem vírgula é milhar quando tem a forma 1.234 (ver _THOUSANDS)
+    antes_do_ponto = (digito & (posicoes < ultimo_ponto)).sum(axis=0, dtype=np.int16)
+    depois_do_ponto = (digito & (posicoes > ultimo_ponto)).sum(axis=0, dtype=np.int16)
+    primeiro_digito = codigos[digito.argmax(axis=0), np.arange(n)]
+    milhar = ((n_virgulas == 0) & (n_pontos == 1) & (antes_do_ponto >= 1) & (antes_do_ponto <= 3)
+              & (depois_do_ponto == 3) & (primeiro_digito != 48))
+    decimal_ponto = (ultimo_ponto > ultima_virgula) & ((n_virgulas > 0) | ((n_pontos == 1) & ~milhar))
+    posicao_decimal = np.where(decimal_virgula, ultima_virgula,
+                               np.where(decimal_ponto, ultimo_ponto, largura)).astype(np.int16)
+
+    # Inteiro e fração acumulados posição a posição (Horner), até MAX_DIGITS dígitos
+    antes = posicoes < posicao_decimal
+    no_inteiro = digito & antes
+    na_fracao = digito & ~antes
+    n_inteiros = no_inteiro.sum(axis=0, dtype=np.int16)
+    n_casas = na_fracao.sum(axis=0, dtype=np.int16)
+    inteiros = np.zeros(n, dtype=np.int64)
+    fracoes = np.zeros(n, dtype=np.int64)
+    for j in range(largura):
+        if no_inteiro[j].any():
+            np.copyto(inteiros, inteiros * 10 + (codigos[j] - 48), where=no_inteiro[j])
+        if na_fracao[j].any():
+            np.copyto(fracoes, fracoes * 10 + (codigos[j] - 48), where=na_fracao[j])
+
+    n_menos = menos.sum(axis=0, dtype=np.int16)
+    n_abre = abre.sum(axis=0, dtype=np.int16)
+    negativo = (n_menos == 1) | (n_abre == 1)
+
+    erro = (
+        invalido | fora_de_lugar
+        | (decimal_virgula & (n_virgulas > 1))
+        | (decimal_ponto & (n_pontos > 1))
+        | ((n_menos + n_abre) > 1) | (n_abre != fecha.sum(axis=0, dtype=np.int16))
+        | (n_inteiros > MAX_DIGITS) | (n_casas > MAX_DIGITS)
+        | (n_inteiros + n_casas == 0)
+    ) & ~vazio
+    # Textos com erro podem ter mais casas que _POWERS cobre: zerados, viram nulo depois
+    casas = np.where(erro, 0, n_casas).astype(np.int64)
+    return np.where(erro, 0, inteiros), np.where(erro, 0, fracoes), casas, negativo, vazio, erro
+
+
+def _to_cents(inteiros: np.ndarray, fracoes: np.ndarray, casas: np.ndarray,
+              negativos: np.ndarray) -> np.ndarray:
+    """Combina inteiro e fração em centavos, arredondando meio para cima."""
+    excesso = np.maximum(casas - 2, 0)
+    divisor = _POWERS[excesso]
+    centavos_fracao = fracoes // divisor
+    resto = fracoes % divisor
+    centavos_fracao = centavos_fracao + (2 * resto >= divisor) * (excesso > 0)
+    centavos_fracao = centavos_fracao * _POWERS[np.maximum(2 - casas, 0)]
+    centavos = inteiros * 100 + centavos_fracao
+    return np.where(negativos, -centavos, centavos)
+
+
+def _float_to_cents(numeros: pd.Series) -> pd.Series:
+    centavos = np.round(numeros.to_numpy(dtype='float64') * 100)
+    mascara = np.isnan(centavos)
+    return pd.Series(
+        pd.arrays.IntegerArray(np.where(mascara, 0, centavos).astype(np.int64), mascara),
+        index=numeros.index
+    )
+
+
+def parse_br_number(value: Any) -> Optional[float]:
+    """Versão escalar de parse_br_numbers (mesmas regras) para valores avulsos."""
+    if value is None or isinstance(value, bool):
+        return None if value is None else float(value)
+    if isinstance(value, (int, float, Decimal, np.number)):
+        numero = float(value)
+        return None if np.isnan(numero) else numero
+    if not isinstance(value, str):
+        return None
+
+    if value.count('$') > 1:
+        return None
+    corpo = _BODY.search(value)
+    if corpo:
+        # Sinal e parênteses só antes ou depois do número; moeda só antes
+        prefixo = _SYMBOLS.sub('', value[:corpo.start()])
+        sufixo = value[corpo.end():]
+        if (_INVALID_IN_BODY.search(corpo.group()) or prefixo.strip('(-')
+                or '$' in sufixo or ''.join(sufixo.split()).strip(')-')):
+            return None
+
+    texto = _SYMBOLS.sub('', value)
+    if not texto or len(texto) > MAX_NUMBER_LENGTH:
+        return None
+
+    negativo = False
+    if texto.startswith('(') and texto.endswith(')'):
+        negativo, texto = True, texto[1:-1]
+    if texto.count('-') == 1 and not negativo:
+        negativo, texto = True, texto.replace('-', '')
+
+    ultima_virgula, ultimo_ponto = texto.rfind(','), texto.rfind('.')
+    if ultima_virgula > ultimo_ponto:
+        if texto.count(',') > 1:
+            return None
+        texto = texto.replace('.', '').replace(',', '.')
+    elif ultimo_ponto > ultima_virgula and (
+            ultima_virgula >= 0 or texto.count('.') == 1 and not _THOUSANDS.fullmatch(texto)):
+        texto = texto.replace(',', '')
+    else:
+        texto = texto.replace('.', '')
+
+    if not texto or not all(c.isdigit() and c.isascii() or c == '.' for c in texto):
+        return None
+    inteiro, _, fracao = texto.partition('.')
+    if not (inteiro or fracao) or len(inteiro) > MAX_DIGITS or len(fracao) > MAX_DIGITS:
+        return None
+    numero = float(texto)
+    return -numero if negativo else numero
+
+
+def parse_br_money(value: Any) -> Optional[Decimal]:
+    """Valor monetário avulso como Decimal com 2 casas."""
+    numero = parse_br_number(value)
+    if numero is None:
+        return None
+    return Decimal(str(numero)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
@@ -7,6 +7,14 @@ from dataclasses import dataclass, field
 from enum import Enum
 import re
 
+import pandas as pd
+
+from ..converters.distinct import map_distinct
+
+
+# Marca valores descartados por skip_if_empty
+_SKIP = object()
+
 
 class DataType(Enum):
     """Tipos de dados suportados."""
@@ -158,25 +166,53 @@ class ColumnMapper:
         for source_col, value in source_data.items():
             if source_col in schema.mappings:
                 mapping = schema.mappings[source_col]
-                
-                # Pular se vazio e configurado para isso
-                if mapping.skip_if_empty and not value:
+                value = self._map_value(mapping, value)
+                if value is _SKIP:
                     continue
                     
-                # Aplicar valor padrão se necessário
-                if value is None or value == "":
-                    value = mapping.default_value
-                    
-                # Aplicar transformações
-                for transform in mapping.transformations:
-                    value = self._apply_transformation(value, transform)
-                    
                 # Mapear para o nome de destino
-                target_name = mapping.clean_name()
-                mapped_data[target_name] = value
+                mapped_data[mapping.clean_name()] = value
                 
         return mapped_data
         
+    def map_dataframe(self, table_name: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Mapeia um DataFrame inteiro, coluna a coluna.
+        
+        Valor padrão e transformações rodam uma vez por valor distinto de cada
+        coluna. Valores descartados por ``skip_if_empty`` ficam nulos.
+        """
+        if table_name not in self.schemas:
+            raise ValueError(f"Schema não encontrado para tabela: {table_name}")
+            
+        schema = self.schemas[table_name]
+        mapped = {}
+        
+        for source_col in df.columns:
+            if source_col in schema.mappings:
+                mapping = schema.mappings[source_col]
+                mapped[mapping.clean_name()] = map_distinct(
+                    df[source_col], lambda v, m=mapping: self._map_value(m, v, skipped=None),
+                    include_missing=True
+                )
+                
+        return pd.DataFrame(mapped, index=df.index)
+        
+    def _map_value(self, mapping: ColumnMapping, value: Any, skipped: Any = _SKIP) -> Any:
+        """Valor de destino de uma célula (``skipped`` se deve ser descartado)."""
+        # Pular se vazio e configurado para isso
+        if mapping.skip_if_empty and not value:
+            return skipped
+            
+        # Aplicar valor padrão se necessário
+        if value is None or value == "":
+            value = mapping.default_value
+            
+        # Aplicar transformações
+        for transform in mapping.transformations:
+            value = self._apply_transformation(value, transform)
+            
+        return value
+        
     def _apply_transformation(self, value: Any, transformation: Dict[str, Any]) -> Any:
         """Aplica uma transformação ao valor."""
         transform_type = transformation.get("type")
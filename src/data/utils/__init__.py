@@ -4,5 +4,7 @@ Utilitários para importação e exportação de dados.
 
 from .importer import DataImporter
 from .exporter import DataExporter
+from .excel_reader import ExcelReader
+from .batch_writer import BatchWriter
 
-__all__ = ['DataImporter', 'DataExporter']
\ No newline at end of file
+__all__ = ['DataImporter', 'DataExporter', 'ExcelReader', 'BatchWriter']
\ No newline at end of file
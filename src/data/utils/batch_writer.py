@@ -0,0 +1,54 @@
+"""
+Gravação em lotes de DataFrames produzidos por várias fontes.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+
+class BatchWriter:
+    """Acumula DataFrames por tabela e grava em lotes, sempre em sequência.
+
+    ``write(table_name, df)`` é chamada com até ``batch_size`` linhas por vez e
+    nunca em paralelo, então pode usar uma única conexão com o banco.
+    """
+
+    def __init__(self, write: Callable[[str, pd.DataFrame], Any], batch_size: int = 5000):
+        self.write = write
+        self.batch_size = batch_size
+        self.written: Dict[str, int] = {}
+        self._pending: Dict[str, List[pd.DataFrame]] = {}
+        self._pending_rows: Dict[str, int] = {}
+
+    def add(self, table_name: str, df: pd.DataFrame):
+        """Enfileira as linhas e grava os lotes completos."""
+        if df is None or df.empty:
+            return
+        self._pending.setdefault(table_name, []).append(df)
+        self._pending_rows[table_name] = self._pending_rows.get(table_name, 0) + len(df)
+        if self._pending_rows[table_name] >= self.batch_size:
+            self._write_batches(table_name, keep_remainder=True)
+
+    def flush(self, table_name: Optional[str] = None):
+        """Grava tudo o que está pendente (de uma tabela ou de todas)."""
+        for name in [table_name] if table_name else list(self._pending):
+            self._write_batches(name, keep_remainder=False)
+
+    def _write_batches(self, table_name: str, keep_remainder: bool):
+        frames = self._pending.pop(table_name, [])
+        self._pending_rows.pop(table_name, None)
+        if not frames:
+            return
+        data = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+        start = 0
+        while len(data) - start >= self.batch_size or (not keep_remainder and start < len(data)):
+            batch = data.iloc[start:start + self.batch_size]
+            self.write(table_name, batch)
+            self.written[table_name] = self.written.get(table_name, 0) + len(batch)
+            start += len(batch)
+
+        if start < len(data):
+            self._pending[table_name] = [data.iloc[start:]]
+            self._pending_rows[table_name] = len(data) - start
@@ -0,0 +1,151 @@
+"""
+Leitura de planilhas Excel em blocos, sem carregar a pasta de trabalho inteira.
+
+Arquivos .xlsx são lidos com openpyxl em modo ``read_only``: as linhas saem do
+XML uma a uma (``iter_rows(values_only=True)``) e viram DataFrames de até
+``chunk_size`` linhas. Nomes de abas e dimensões vêm só dos metadados, sem ler
+as células. Arquivos .xls (formato antigo) não têm leitura em stream e caem no
+``pd.read_excel``, fatiado nos mesmos blocos.
+"""
+
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+from openpyxl import load_workbook
+
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Extensões que o openpyxl lê em modo read_only
+STREAMING_EXTENSIONS = {'.xlsx', '.xlsm', '.xltx', '.xltm'}
+
+
+class ExcelReader:
+    """Leitor de planilhas Excel em blocos de linhas."""
+
+    def __init__(self, filepath: Union[str, Path]):
+        self.filepath = str(filepath)
+        self.streaming = Path(self.filepath).suffix.lower() in STREAMING_EXTENSIONS
+
+    def sheet_names(self) -> List[str]:
+        """Nomes das abas, lidos só dos metadados da pasta de trabalho."""
+        if not self.streaming:
+            return pd.ExcelFile(self.filepath).sheet_names
+        workbook = self._open()
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+
+    def dimensions(self) -> Dict[str, Dict[str, Optional[int]]]:
+        """Linhas e colunas declaradas por aba (podem ser None em arquivos sem dimensão)."""
+        if not self.streaming:
+            return {name: {'rows': None, 'columns': None} for name in self.sheet_names()}
+        workbook = self._open()
+        try:
+            return {
+                sheet.title: {'rows': sheet.max_row, 'columns': sheet.max_column}
+                for sheet in workbook.worksheets
+            }
+        finally:
+            workbook.close()
+
+    def iter_chunks(self,
+                    sheet_name: Union[str, int] = 0,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    header: Optional[int] = 0,
+                    skiprows: int = 0,
+                    nrows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Gera DataFrames de até ``chunk_size`` linhas da aba.
+
+        ``header`` é a linha (após ``skiprows``) com os nomes das colunas; com
+        ``None`` as colunas são numeradas. Linhas totalmente vazias são
+        descartadas na leitura. O índice segue contínuo entre os blocos.
+        """
+        if not self.streaming:
+            yield from self._iter_fallback(sheet_name, chunk_size, header, skiprows, nrows)
+            return
+
+        workbook = self._open()
+        try:
+            sheet = self._sheet(workbook, sheet_name)
+            rows = sheet.iter_rows(values_only=True)
+            if skiprows:
+                rows = islice(rows, skiprows, None)
+
+            columns = None
+            if header is not None:
+                header_row = next(islice(rows, header, None), None)
+                if header_row is None:
+                    return
+                columns = self._column_names(header_row)
+
+            rows = (row for row in rows if any(value is not None for value in row))
+            if nrows is not None:
+                rows = islice(rows, nrows)
+
+            start = 0
+            while True:
+                block = list(islice(rows, chunk_size))
+                if not block:
+                    break
+                yield self._to_frame(block, columns, start)
+                start += len(block)
+        finally:
+            workbook.close()
+
+    def read(self, sheet_name: Union[str, int] = 0, **kwargs) -> pd.DataFrame:
+        """Lê a aba inteira (em blocos) num único DataFrame."""
+        chunks = list(self.iter_chunks(sheet_name, **kwargs))
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks)
+
+    def preview(self, sheet_name: Union[str, int] = 0, rows: int = 10) -> pd.DataFrame:
+        """Primeiras ``rows`` linhas, lendo do arquivo só o necessário."""
+        return next(self.iter_chunks(sheet_name, chunk_size=rows, nrows=rows), pd.DataFrame())
+
+    def _open(self):
+        return load_workbook(self.filepath, read_only=True, data_only=True, keep_links=False)
+
+    @staticmethod
+    def _sheet(workbook, sheet_name: Union[str, int]):
+        if isinstance(sheet_name, int):
+            return workbook.worksheets[sheet_name]
+        return workbook[sheet_name]
+
+    @staticmethod
+    def _column_names(header_row: Tuple[Any, ...]) -> List[str]:
+        """Nomes das colunas no mesmo padrão do pandas (``Unnamed: i``, ``x.1``)."""
+        names = []
+        seen: Dict[str, int] = {}
+        for i, value in enumerate(header_row):
+            name = f"Unnamed: {i}" if value is None or str(value).strip() == "" else str(value)
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            names.append(name)
+        return names
+
+    @staticmethod
+    def _to_frame(block: List[Tuple[Any, ...]], columns: Optional[List[str]], start: int) -> pd.DataFrame:
+        frame = pd.DataFrame(block, index=pd.RangeIndex(start, start + len(block)))
+        if columns is None:
+            return frame
+        # Linhas com mais células que o cabeçalho ganham colunas sem nome
+        extra = [f"Unnamed: {i}" for i in range(len(columns), frame.shape[1])]
+        frame = frame.reindex(columns=range(max(len(columns), frame.shape[1])))
+        frame.columns = columns + extra
+        return frame
+
+    def _iter_fallback(self, sheet_name, chunk_size, header, skiprows, nrows) -> Iterator[pd.DataFrame]:
+        """.xls: lê com pandas e entrega nos mesmos blocos."""
+        df = pd.read_excel(self.filepath, sheet_name=sheet_name, header=header,
+                           skiprows=skiprows or None, nrows=nrows)
+        df = df.dropna(axis=0, how='all').reset_index(drop=True)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
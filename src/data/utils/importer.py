@@ -3,8 +3,10 @@ Utilitários para importação de dados de diferentes fontes.
 """
 
 import pandas as pd
-from typing import Dict, List, Optional, Any, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import json
 import csv
@@ -13,7 +15,13 @@ from datetime import datetime
 from ..mappers.base import ColumnMapper, TableSchema
 from ..validators.base import DataValidator
 from ..converters.base import TypeConverter
-from ..processors.base import DataProcessor, ProcessingResult
+from ..processors.base import DataProcessor, ProcessingError, ProcessingResult, ProcessingStatus
+from .batch_writer import BatchWriter
+from .excel_reader import DEFAULT_CHUNK_SIZE, ExcelReader
+
+
+# Opções do pd.read_excel que o leitor em blocos também entende
+STREAMING_EXCEL_OPTIONS = {'header', 'skiprows', 'nrows'}
 
 
 class DataImporter:
@@ -33,19 +41,28 @@ class DataImporter:
                     filepath: str, 
                     sheet_name: Optional[Union[str, int]] = 0,
                     table_name: Optional[str] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    on_chunk: Optional[Callable[[pd.DataFrame], Any]] = None,
                     **kwargs) -> ProcessingResult:
-        """Importa dados de arquivo Excel."""
+        """Importa dados de arquivo Excel.
+
+        A planilha é lida em blocos de ``chunk_size`` linhas e cada bloco passa
+        pelo pipeline. Com ``on_chunk``, cada bloco processado é entregue à função
+        e não fica acumulado (``output_data`` volta None).
+        """
         self.processor.logger.info(f"Importando Excel: {filepath}")
         
         try:
-            # Lê o arquivo Excel
-            df = pd.read_excel(filepath, sheet_name=sheet_name, **kwargs)
-            
             # Define nome da tabela se não fornecido
             if not table_name:
                 table_name = Path(filepath).stem.lower().replace(" ", "_")
                 
-            # Processa os dados
+            # Opções que só o pandas entende (ou todas as abas) usam a leitura completa
+            if isinstance(sheet_name, (str, int)) and set(kwargs) <= STREAMING_EXCEL_OPTIONS:
+                chunks = ExcelReader(filepath).iter_chunks(sheet_name, chunk_size=chunk_size, **kwargs)
+                return self._process_chunks(chunks, table_name, on_chunk)
+                
+            df = pd.read_excel(filepath, sheet_name=sheet_name, **kwargs)
             return self._process_dataframe(df, table_name)
             
         except Exception as e:
@@ -117,6 +134,89 @@ class DataImporter:
             self.processor.logger.error(f"Erro ao importar JSON: {str(e)}")
             raise
             
+    def import_file(self,
+                    filepath: str,
+                    table_name: Optional[str] = None,
+                    **kwargs) -> ProcessingResult:
+        """Importa um arquivo escolhendo o leitor pela extensão."""
+        ext = Path(filepath).suffix.lower()
+        if ext in ['.xlsx', '.xls']:
+            return self.import_excel(filepath, table_name=table_name, **kwargs)
+        elif ext == '.csv':
+            return self.import_csv(filepath, table_name=table_name, **kwargs)
+        elif ext == '.json':
+            return self.import_json(filepath, table_name=table_name, **kwargs)
+        else:
+            raise ValueError(f"Tipo de arquivo não suportado: {ext}")
+            
+    def import_many(self,
+                    filepaths: Sequence[str],
+                    table_names: Optional[Union[str, Dict[str, str]]] = None,
+                    writer: Optional[Callable[[str, pd.DataFrame], Any]] = None,
+                    batch_size: int = 5000,
+                    max_workers: Optional[int] = None,
+                    **kwargs) -> Dict[str, ProcessingResult]:
+        """Importa vários arquivos em paralelo, um processo por arquivo.
+        
+        Leitura, validação e conversão rodam em um ProcessPoolExecutor. Os resultados
+        voltam ao processo atual e, com ``writer``, seguem para um único BatchWriter:
+        ``writer(tabela, df)`` é chamado em sequência, em lotes de ``batch_size``
+        linhas, e ``output_data`` dos resultados volta None.
+        
+        ``table_names`` é um nome para todos os arquivos ou um dict por arquivo. Os
+        processos usam o mapper deste importador com validador e conversor padrão
+        (regras customizadas com lambdas não atravessam processos).
+        """
+        if isinstance(table_names, dict) or table_names is None:
+            names = table_names or {}
+        else:
+            names = {filepath: table_names for filepath in filepaths}
+            
+        batch_writer = BatchWriter(writer, batch_size) if writer else None
+        results: Dict[str, ProcessingResult] = {}
+        
+        # spawn: evita fork de um processo com threads (servidor web, pools de conexão)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            futures = {
+                executor.submit(_import_file_worker, self.mapper, filepath,
+                                names.get(filepath), kwargs): filepath
+                for filepath in filepaths
+            }
+            for future in as_completed(futures):
+                filepath = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.processor.logger.error(f"Erro ao importar {filepath}: {str(e)}")
+                    result = ProcessingResult(
+                        status=ProcessingStatus.FAILED,
+                        total_rows=0,
+                        processed_rows=0,
+                        failed_rows=0,
+                        errors=[ProcessingError(
+                            row_index=None,
+                            column=None,
+                            error_type="ImportError",
+                            error_message=str(e),
+                            raw_value=filepath
+                        )],
+                        warnings=[],
+                        processing_time=0.0,
+                        metadata={"critical_error": str(e)}
+                    )
+                    
+                if batch_writer and isinstance(result.output_data, pd.DataFrame):
+                    table_name = names.get(filepath) or Path(filepath).stem.lower().replace(" ", "_")
+                    batch_writer.add(table_name, result.output_data)
+                    result.output_data = None
+                results[filepath] = result
+                
+        if batch_writer:
+            batch_writer.flush()
+            
+        return results
+        
     def import_from_dataframe(self,
                             df: pd.DataFrame,
                             table_name: str) -> ProcessingResult:
@@ -125,6 +225,72 @@ class DataImporter:
         
     def _process_dataframe(self, df: pd.DataFrame, table_name: str) -> ProcessingResult:
         """Processa um DataFrame através do pipeline configurado."""
+        self._configure_pipeline(table_name)
+        
+        # Processa os dados
+        return self.processor.process(df)
+        
+    def _process_chunks(self,
+                        chunks: Iterable[pd.DataFrame],
+                        table_name: str,
+                        on_chunk: Optional[Callable[[pd.DataFrame], Any]] = None) -> ProcessingResult:
+        """Processa blocos de linhas no mesmo pipeline e junta os resultados."""
+        self._configure_pipeline(table_name)
+        start_time = datetime.now()
+        
+        total_rows = processed_rows = failed_rows = 0
+        errors, warnings, outputs, statuses = [], [], [], []
+        critical_error = None
+        
+        for chunk in chunks:
+            result = self.processor.process(chunk)
+            total_rows += result.total_rows
+            processed_rows += result.processed_rows
+            failed_rows += result.failed_rows
+            errors.extend(result.errors)
+            warnings.extend(result.warnings)
+            statuses.append(result.status)
+            critical_error = critical_error or result.metadata.get("critical_error")
+            
+            if result.output_data is not None:
+                if on_chunk:
+                    on_chunk(result.output_data)
+                else:
+                    outputs.append(result.output_data)
+                    
+        if not statuses or all(s == ProcessingStatus.COMPLETED for s in statuses):
+            status = ProcessingStatus.COMPLETED
+        elif all(s == ProcessingStatus.FAILED for s in statuses):
+            status = ProcessingStatus.FAILED
+        else:
+            status = ProcessingStatus.PARTIAL
+            
+        metadata = {
+            "start_time": start_time.isoformat(),
+            "end_time": datetime.now().isoformat(),
+            "chunks": len(statuses)
+        }
+        if critical_error:
+            metadata["critical_error"] = critical_error
+            
+        output_data = None
+        if on_chunk is None:
+            output_data = pd.concat(outputs, ignore_index=True) if outputs else pd.DataFrame()
+            
+        return ProcessingResult(
+            status=status,
+            total_rows=total_rows,
+            processed_rows=processed_rows,
+            failed_rows=failed_rows,
+            errors=errors,
+            warnings=warnings,
+            processing_time=(datetime.now() - start_time).total_seconds(),
+            output_data=output_data,
+            metadata=metadata
+        )
+        
+    def _configure_pipeline(self, table_name: str):
+        """Monta as etapas do pipeline para a tabela."""
         # Adiciona etapas de processamento
         self.processor.processing_steps = []
         
@@ -153,9 +319,6 @@ class DataImporter:
             "Conversão de tipos"
         )
         
-        # Processa os dados
-        return self.processor.process(df)
-        
     def _clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """Limpa o DataFrame removendo linhas/colunas vazias."""
         # Remove colunas completamente vazias
@@ -179,24 +342,15 @@ class DataImporter:
         if table_name not in self.mapper.schemas:
             return df
             
-        mapped_data = []
-        
-        for _, row in df.iterrows():
-            mapped_row = self.mapper.map_data(table_name, row.to_dict())
-            mapped_data.append(mapped_row)
-            
-        return pd.DataFrame(mapped_data)
+        return self.mapper.map_dataframe(table_name, df)
         
     def _validate_data(self, df: pd.DataFrame, table_name: str) -> pd.DataFrame:
         """Valida dados usando o DataValidator."""
-        # Cria schema de validação baseado nos tipos
-        schema = {}
-        
+        # Schema de validação: o da tabela (plano compilado fica em cache) ou inferido
         if table_name in self.mapper.schemas:
-            table_schema = self.mapper.schemas[table_name]
-            for col_name, col_def in table_schema.columns.items():
-                schema[col_name] = col_def.data_type.value
+            schema = self.mapper.schemas[table_name]
         else:
+            schema = {}
             # Infere tipos das colunas
             for col in df.columns:
                 if df[col].dtype == 'int64':
@@ -208,28 +362,16 @@ class DataImporter:
                 else:
                     schema[col] = 'text'
                     
-        # Valida cada linha
-        validated_rows = []
+        # Valida coluna a coluna (plano compilado, regras vetorizadas)
+        validation = self.validator.validate_dataframe(df, schema)
         
-        for idx, row in df.iterrows():
-            validation_results = self.validator.validate_row(row.to_dict(), schema)
-            
-            # Coleta valores sanitizados
-            sanitized_row = {}
-            for col, result in validation_results.items():
-                if result.is_valid:
-                    sanitized_row[col] = result.sanitized_value
-                else:
-                    # Log erros mas mantém valor original
-                    for error in result.errors:
-                        self.processor.logger.warning(
-                            f"Linha {idx}, coluna {col}: {error}"
-                        )
-                    sanitized_row[col] = row[col]
-                    
-            validated_rows.append(sanitized_row)
+        # Log erros; células inválidas mantêm o valor original
+        for row, col, rule in validation.errors[["row", "column", "rule"]].itertuples(index=False):
+            self.processor.logger.warning(
+                f"Linha {row}, coluna {col}: {validation.message(col, rule)}"
+            )
             
-        return pd.DataFrame(validated_rows)
+        return validation.sanitized
         
     def _convert_types(self, df: pd.DataFrame, table_name: str) -> pd.DataFrame:
         """Converte tipos de dados usando o TypeConverter."""
@@ -273,7 +415,7 @@ class DataImporter:
             file_type = ext[1:]  # Remove o ponto
             
         if file_type in ['xlsx', 'xls']:
-            return pd.read_excel(filepath, nrows=rows)
+            return ExcelReader(filepath).preview(rows=rows)
         elif file_type == 'csv':
             encoding = 'utf-8'
             delimiter = self._detect_delimiter(filepath, encoding)
@@ -303,8 +445,18 @@ class DataImporter:
         
         # Adiciona informações específicas do tipo
         if info["extension"] in ['.xlsx', '.xls']:
-            xl_file = pd.ExcelFile(filepath)
-            info["sheets"] = xl_file.sheet_names
-            info["total_sheets"] = len(xl_file.sheet_names)
+            # Só metadados: as células não são lidas
+            dimensions = ExcelReader(filepath).dimensions()
+            info["sheets"] = list(dimensions)
+            info["total_sheets"] = len(dimensions)
+            info["sheet_dimensions"] = dimensions
             
-        return info
\ No newline at end of file
+        return info
+
+
+def _import_file_worker(mapper: ColumnMapper,
+                        filepath: str,
+                        table_name: Optional[str],
+                        kwargs: Dict[str, Any]) -> ProcessingResult:
+    """Importa um arquivo num processo do pool de DataImporter.import_many."""
+    return DataImporter(mapper=mapper).import_file(filepath, table_name=table_name, **kwargs)
@@ -1,5 +1,7 @@
 """Validadores de dados."""
 
-from .base import DataValidator, ValidationRule, ValidationResult
+from .base import DataValidator, ValidationRule, ValidationResult, ColumnValidation, DataFrameValidation
+from .plan import ValidationPlan
 
-__all__ = ['DataValidator', 'ValidationRule', 'ValidationResult']
\ No newline at end of file
+__all__ = ['DataValidator', 'ValidationRule', 'ValidationResult', 'ColumnValidation', 'DataFrameValidation',
+           'ValidationPlan']
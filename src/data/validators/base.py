@@ -2,20 +2,54 @@
 Classes para validação e sanitização de dados.
 """
 
-from typing import Any, Dict, List, Optional, Callable, Union
+from typing import Any, Dict, List, Optional, Callable, Tuple, Union
+import numpy as np
+import pandas as pd
 from dataclasses import dataclass
 from datetime import datetime, date
 import re
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal
+
+from ..converters.distinct import distinct_values, map_distinct
+from ..converters.dates import DATE_FORMATS, iso_dates, parse_date_text, parse_dates
+from ..converters.numbers import parse_br_money, parse_br_number, parse_br_numbers
+from ..mappers.base import TableSchema
+from .plan import ColumnPlan, DataFrameValidation, ValidationPlan
+
+
+# Formatos aceitos pelas regras de data (só datas, sem horário)
+VALID_DATE_FORMATS = DATE_FORMATS[:5]
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+_NON_DIGITS = re.compile(r'\D')
+
+MAX_TEXT_LENGTH = 255
+
+_INTEGER_TEXT = r'[+-]?\d+'
+
+# Pesos dos dígitos verificadores
+_CPF_WEIGHTS = (np.arange(10, 1, -1), np.arange(11, 1, -1))
+_CNPJ_WEIGHTS = (np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]),
+                 np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]))
 
 
 @dataclass
 class ValidationRule:
-    """Define uma regra de validação."""
+    """Define uma regra de validação.
+    
+    ``vectorized_validator`` (máscara de válidos) e ``vectorized_sanitizer``
+    recebem a coluna inteira e são usados por ``validate_dataframe``; sem eles a
+    regra roda valor a valor, uma vez por valor distinto. ``pattern`` é uma
+    regex equivalente ao ``validator``, compilada uma vez pelo plano de validação.
+    """
     name: str
     validator: Callable[[Any], bool]
     error_message: str
     sanitizer: Optional[Callable[[Any], Any]] = None
+    vectorized_validator: Optional[Callable[[pd.Series], pd.Series]] = None
+    vectorized_sanitizer: Optional[Callable[[pd.Series], pd.Series]] = None
+    pattern: Optional[str] = None
 
 
 @dataclass
@@ -26,12 +60,22 @@ class ValidationResult:
     warnings: List[str]
     sanitized_value: Any
     
-
+    
+@dataclass
+class ColumnValidation:
+    """Resultado da validação de uma coluna inteira."""
+    sanitized: pd.Series    # valor sanitizado se válido, original se não
+    valid: pd.Series        # bool por linha
+    errors: pd.Series       # lista de mensagens por linha ([] se válido)
+    
+    
 class DataValidator:
     """Validador de dados com regras customizáveis."""
     
     def __init__(self):
         self.rules: Dict[str, List[ValidationRule]] = {}
+        self._plans: Dict[tuple, Tuple[Any, Any, ValidationPlan]] = {}
+        self._rules_version = 0
         self._init_default_rules()
         
     def _init_default_rules(self):
@@ -41,13 +85,16 @@ class DataValidator:
             name="not_empty",
             validator=lambda x: x is not None and str(x).strip() != "",
             error_message="Valor não pode estar vazio",
-            sanitizer=lambda x: str(x).strip() if x is not None else ""
+            sanitizer=lambda x: str(x).strip() if x is not None else "",
+            vectorized_validator=lambda s: s != "",
+            vectorized_sanitizer=_strip_text
         ))
         
         self.add_rule("text", ValidationRule(
             name="max_length",
-            validator=lambda x, max_len=255: len(str(x)) <= max_len if x else True,
-            error_message="Texto excede o tamanho máximo permitido"
+            validator=lambda x, max_len=MAX_TEXT_LENGTH: len(str(x)) <= max_len if x else True,
+            error_message="Texto excede o tamanho máximo permitido",
+            vectorized_validator=lambda s: _text(s).str.len().fillna(0) <= MAX_TEXT_LENGTH
         ))
         
         # Regras para números
@@ -55,14 +102,18 @@ class DataValidator:
             name="is_integer",
             validator=lambda x: isinstance(x, int) or (isinstance(x, str) and x.isdigit()),
             error_message="Valor deve ser um número inteiro",
-            sanitizer=lambda x: int(x) if x else None
+            sanitizer=lambda x: int(x) if x is not None and x != "" else None,
+            vectorized_validator=_not_null,
+            vectorized_sanitizer=_to_integers
         ))
         
         self.add_rule("float", ValidationRule(
             name="is_float",
             validator=lambda x: isinstance(x, (int, float)) or self._is_valid_float(x),
             error_message="Valor deve ser um número decimal",
-            sanitizer=lambda x: self._sanitize_float(x)
+            sanitizer=lambda x: self._sanitize_float(x),
+            vectorized_validator=_not_null,
+            vectorized_sanitizer=_to_floats
         ))
         
         # Regras para datas
@@ -70,7 +121,9 @@ class DataValidator:
             name="is_date",
             validator=lambda x: self._is_valid_date(x),
             error_message="Data inválida",
-            sanitizer=lambda x: self._sanitize_date(x)
+            sanitizer=lambda x: self._sanitize_date(x),
+            vectorized_validator=_not_null,
+            vectorized_sanitizer=_to_iso_dates
         ))
         
         # Regras para email
@@ -78,7 +131,10 @@ class DataValidator:
             name="is_email",
             validator=lambda x: self._is_valid_email(x),
             error_message="Email inválido",
-            sanitizer=lambda x: str(x).lower().strip() if x else None
+            sanitizer=lambda x: str(x).lower().strip() if x else None,
+            pattern=EMAIL_PATTERN,
+            vectorized_validator=lambda s: _text(s).str.match(EMAIL_PATTERN).fillna(False).astype(bool),
+            vectorized_sanitizer=lambda s: _text(s).str.lower().str.strip().replace("", None)
         ))
         
         # Regras para CPF/CNPJ
@@ -86,14 +142,18 @@ class DataValidator:
             name="is_cpf",
             validator=lambda x: self._is_valid_cpf(x),
             error_message="CPF inválido",
-            sanitizer=lambda x: re.sub(r'\D', '', str(x)) if x else None
+            sanitizer=lambda x: _NON_DIGITS.sub('', str(x)) if x else None,
+            vectorized_validator=lambda s: _check_digits(s, 11, _CPF_WEIGHTS, _cpf_digit),
+            vectorized_sanitizer=_only_digits
         ))
         
         self.add_rule("cnpj", ValidationRule(
             name="is_cnpj",
             validator=lambda x: self._is_valid_cnpj(x),
             error_message="CNPJ inválido",
-            sanitizer=lambda x: re.sub(r'\D', '', str(x)) if x else None
+            sanitizer=lambda x: _NON_DIGITS.sub('', str(x)) if x else None,
+            vectorized_validator=lambda s: _check_digits(s, 14, _CNPJ_WEIGHTS, _cnpj_digit),
+            vectorized_sanitizer=_only_digits
         ))
         
         # Regras para valores monetários
@@ -101,7 +161,9 @@ class DataValidator:
             name="is_money",
             validator=lambda x: self._is_valid_money(x),
             error_message="Valor monetário inválido",
-            sanitizer=lambda x: self._sanitize_money(x)
+            sanitizer=lambda x: self._sanitize_money(x),
+            vectorized_validator=_not_null,
+            vectorized_sanitizer=_to_money
         ))
         
     def add_rule(self, data_type: str, rule: ValidationRule):
@@ -109,6 +171,8 @@ class DataValidator:
         if data_type not in self.rules:
             self.rules[data_type] = []
         self.rules[data_type].append(rule)
+        # Planos compilados com as regras antigas deixam de valer
+        self._rules_version += 1
         
     def validate(self, value: Any, data_type: str, additional_rules: Optional[List[ValidationRule]] = None) -> ValidationResult:
         """Valida um valor de acordo com seu tipo e regras adicionais."""
@@ -149,14 +213,56 @@ class DataValidator:
             sanitized_value=sanitized_value
         )
         
-    def validate_row(self, row: Dict[str, Any], schema: Dict[str, str]) -> Dict[str, ValidationResult]:
-        """Valida uma linha completa de dados."""
+    def validate_series(self, values: pd.Series, data_type: str,
+                        additional_rules: Optional[List[ValidationRule]] = None) -> ColumnValidation:
+        """Valida uma coluna, rodando as regras uma vez por valor distinto.
+        
+        O resultado de cada valor distinto é espalhado pelas linhas; nulos são
+        validados como None.
+        """
+        codes, uniques = distinct_values(values)
+        sanitized = np.empty(len(uniques), dtype=object)
+        valid = np.empty(len(uniques), dtype=bool)
+        errors = np.empty(len(uniques), dtype=object)
+        for i, value in enumerate(uniques):
+            result = self.validate(value, data_type, additional_rules)
+            sanitized[i] = result.sanitized_value if result.is_valid else value
+            valid[i] = result.is_valid
+            errors[i] = result.errors
+            
+        index = values.index
+        return ColumnValidation(
+            sanitized=pd.Series(sanitized[codes], index=index, dtype=object),
+            valid=pd.Series(valid[codes], index=index),
+            errors=pd.Series(errors[codes], index=index, dtype=object)
+        )
+        
+    def validate_row(self, row: Dict[str, Any],
+                     schema: Union[TableSchema, Dict[str, str]],
+                     first_error: bool = False) -> Dict[str, ValidationResult]:
+        """Valida uma linha completa de dados.
+        
+        Cada coluna traz todos os erros (como ``validate``). Com ``first_error``,
+        usa o plano compilado do schema e para na primeira regra que falha.
+        """
+        if first_error:
+            plan = self.compile_plan(schema)
+        else:
+            types = self._schema_types(schema)
         results = {}
         
         for column, value in row.items():
-            if column in schema:
-                data_type = schema[column]
-                results[column] = self.validate(value, data_type)
+            if first_error and column in plan.columns:
+                column_plan = plan.columns[column]
+                sanitized_value, failed = column_plan.check(value)
+                results[column] = ValidationResult(
+                    is_valid=failed is None,
+                    errors=[] if failed is None else [column_plan.message(failed)],
+                    warnings=[],
+                    sanitized_value=sanitized_value
+                )
+            elif not first_error and column in types:
+                results[column] = self.validate(value, types[column])
             else:
                 # Coluna não mapeada
                 results[column] = ValidationResult(
@@ -168,25 +274,63 @@ class DataValidator:
                 
         return results
         
+    def validate_dataframe(self, df: pd.DataFrame, schema: Union[TableSchema, Dict[str, str]],
+                           additional_rules: Optional[Dict[str, List[ValidationRule]]] = None) -> DataFrameValidation:
+        """Valida um DataFrame coluna a coluna com o plano compilado do schema.
+        
+        As regras rodam sobre os valores distintos de cada coluna (implementação
+        vetorizada da regra, ou a escalar valor a valor). Cada célula inválida
+        gera uma linha na tabela de erros, com a primeira regra que falhou.
+        Colunas fora do schema passam sem alteração.
+        """
+        return self.compile_plan(schema, additional_rules).validate_dataframe(df)
+        
+    def compile_plan(self, schema: Union[TableSchema, Dict[str, str]],
+                     additional_rules: Optional[Dict[str, List[ValidationRule]]] = None) -> ValidationPlan:
+        """Plano de validação do schema (compilado uma vez e reaproveitado).
+        
+        O plano é refeito se as colunas do schema mudarem ou se regras forem
+        adicionadas com ``add_rule``.
+        """
+        if isinstance(schema, TableSchema):
+            columns = tuple(map(id, schema.columns.values()))
+            key = (id(schema), columns)
+        else:
+            key = tuple(schema.items())
+        if additional_rules:
+            key += tuple((column, tuple(map(id, rules))) for column, rules in additional_rules.items())
+        key = (self._rules_version, key)
+        
+        cached = self._plans.get(key)
+        if cached is None:
+            types = self._schema_types(schema)
+            additional_rules = additional_rules or {}
+            plan = ValidationPlan({
+                column: ColumnPlan(column, self.rules.get(data_type, []) + additional_rules.get(column, []))
+                for column, data_type in types.items()
+            })
+            # Guarda o schema e as regras junto para que os ids da chave não sejam reutilizados
+            cached = (schema, additional_rules, plan)
+            self._plans[key] = cached
+        return cached[-1]
+        
+    @staticmethod
+    def _schema_types(schema: Union[TableSchema, Dict[str, str]]) -> Dict[str, str]:
+        """Tipo de dados de cada coluna do schema."""
+        if isinstance(schema, TableSchema):
+            return {name: col.data_type.value for name, col in schema.columns.items()}
+        return schema
+        
     # Métodos auxiliares de validação
     def _is_valid_float(self, value: Any) -> bool:
         """Verifica se é um float válido."""
-        try:
-            float(str(value).replace(',', '.'))
-            return True
-        except (ValueError, TypeError):
-            return False
+        return parse_br_number(value) is not None
             
     def _sanitize_float(self, value: Any) -> Optional[float]:
-        """Sanitiza valor para float."""
+        """Sanitiza valor para float (formato brasileiro, mesmo parser do TypeConverter)."""
         if value is None or value == "":
             return None
-        try:
-            # Trata formato brasileiro de números
-            clean_value = str(value).replace('.', '').replace(',', '.')
-            return float(clean_value)
-        except (ValueError, TypeError):
-            return None
+        return parse_br_number(value)
             
     def _is_valid_date(self, value: Any) -> bool:
         """Verifica se é uma data válida."""
@@ -196,20 +340,7 @@ class DataValidator:
         if not value:
             return False
             
-        # Tenta diferentes formatos de data
-        date_formats = [
-            "%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y",
-            "%Y/%m/%d", "%d.%m.%Y"
-        ]
-        
-        for fmt in date_formats:
-            try:
-                datetime.strptime(str(value), fmt)
-                return True
-            except ValueError:
-                continue
-                
-        return False
+        return parse_date_text(str(value), VALID_DATE_FORMATS) is not None
         
     def _sanitize_date(self, value: Any) -> Optional[str]:
         """Sanitiza valor para data no formato ISO."""
@@ -221,28 +352,15 @@ class DataValidator:
         elif isinstance(value, date):
             return value.isoformat()
             
-        # Tenta diferentes formatos
-        date_formats = [
-            "%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y",
-            "%Y/%m/%d", "%d.%m.%Y"
-        ]
-        
-        for fmt in date_formats:
-            try:
-                dt = datetime.strptime(str(value), fmt)
-                return dt.date().isoformat()
-            except ValueError:
-                continue
-                
-        return None
+        dt = parse_date_text(str(value), VALID_DATE_FORMATS)
+        return dt.date().isoformat() if dt is not None else None
         
     def _is_valid_email(self, value: Any) -> bool:
         """Valida formato de email."""
         if not value:
             return False
             
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, str(value)))
+        return bool(_EMAIL_RE.match(str(value)))
         
     def _is_valid_cpf(self, value: Any) -> bool:
         """Valida CPF."""
@@ -250,7 +368,7 @@ class DataValidator:
             return False
             
         # Remove caracteres não numéricos
-        cpf = re.sub(r'\D', '', str(value))
+        cpf = _NON_DIGITS.sub('', str(value))
         
         # Verifica se tem 11 dígitos
         if len(cpf) != 11:
@@ -275,7 +393,7 @@ class DataValidator:
             return False
             
         # Remove caracteres não numéricos
-        cnpj = re.sub(r'\D', '', str(value))
+        cnpj = _NON_DIGITS.sub('', str(value))
         
         # Verifica se tem 14 dígitos
         if len(cnpj) != 14:
@@ -322,27 +440,98 @@ class DataValidator:
         """Valida valor monetário."""
         if value is None:
             return False
-            
-        try:
-            # Remove símbolos monetários e espaços
-            clean_value = re.sub(r'[R$\s]', '', str(value))
-            # Trata formato brasileiro
-            clean_value = clean_value.replace('.', '').replace(',', '.')
-            Decimal(clean_value)
-            return True
-        except (InvalidOperation, ValueError):
-            return False
+        return parse_br_number(value) is not None
             
     def _sanitize_money(self, value: Any) -> Optional[Decimal]:
         """Sanitiza valor monetário."""
         if value is None or value == "":
             return None
-            
-        try:
-            # Remove símbolos monetários e espaços
-            clean_value = re.sub(r'[R$\s]', '', str(value))
-            # Trata formato brasileiro
-            clean_value = clean_value.replace('.', '').replace(',', '.')
-            return Decimal(clean_value)
-        except (InvalidOperation, ValueError):
-            return None
\ No newline at end of file
+        return parse_br_money(value)
+
+
+# Implementações vetorizadas das regras padrão (recebem a coluna, nulos como None)
+
+def _text(values: pd.Series) -> pd.Series:
+    """Coluna como texto (nulos continuam nulos)."""
+    if pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+        return values
+    return map_distinct(values, str)
+
+
+def _strip_text(values: pd.Series) -> pd.Series:
+    return _text(values).str.strip().fillna("")
+
+
+def _not_null(values: pd.Series) -> pd.Series:
+    return values.notna()
+
+
+def _to_integers(values: pd.Series) -> pd.Series:
+    """Como ``int(x)``: textos de inteiro (com sinal e espaços) e números truncados."""
+    objects = values.to_numpy(dtype=object)
+    texts = _text(values)
+    integer_text = texts.str.strip().str.fullmatch(_INTEGER_TEXT).fillna(False).to_numpy(dtype=bool)
+    strings = np.fromiter((isinstance(v, str) for v in objects), dtype=bool, count=len(objects))
+    numbers = pd.to_numeric(pd.Series(np.where(strings, None, objects), dtype=object),
+                            errors='coerce').to_numpy(dtype='float64', copy=True)
+    numbers[~strings & ~np.isfinite(numbers)] = np.nan
+    numbers[strings & ~integer_text] = np.nan
+    if integer_text.any():
+        numbers[integer_text] = texts[integer_text].str.strip().astype('int64').to_numpy()
+    result = np.full(len(objects), None, dtype=object)
+    ok = ~np.isnan(numbers)
+    result[ok] = np.trunc(numbers[ok]).astype(np.int64).tolist()
+    return pd.Series(result, index=values.index, dtype=object)
+
+
+def _to_floats(values: pd.Series) -> pd.Series:
+    numbers = parse_br_numbers(values).values
+    return numbers.astype(object).where(numbers.notna(), None)
+
+
+def _to_money(values: pd.Series) -> pd.Series:
+    cents = parse_br_numbers(values, cents=True).values
+    return map_distinct(cents, lambda c: Decimal(int(c)).scaleb(-2))
+
+
+def _to_iso_dates(values: pd.Series) -> pd.Series:
+    """Datas ISO como no ``_sanitize_date``: objetos de data e textos nos formatos aceitos."""
+    result = np.full(len(values), None, dtype=object)
+    objects = values.to_numpy(dtype=object)
+    dates = np.fromiter((isinstance(v, (date, datetime)) for v in objects), dtype=bool, count=len(objects))
+    texts = np.fromiter((isinstance(v, str) and v != "" for v in objects), dtype=bool, count=len(objects))
+    parseable = dates | texts
+    if parseable.any():
+        parsed = parse_dates(values[parseable], VALID_DATE_FORMATS).values.to_numpy()
+        ok = ~np.isnat(parsed)
+        positions = np.flatnonzero(parseable)[ok]
+        result[positions] = iso_dates(parsed[ok])
+    return pd.Series(result, index=values.index, dtype=object)
+
+
+def _only_digits(values: pd.Series) -> pd.Series:
+    return _text(values).str.replace(r'\D', '', regex=True).replace("", None)
+
+
+def _cpf_digit(total: np.ndarray) -> np.ndarray:
+    return ((total * 10) % 11) % 10
+
+
+def _cnpj_digit(total: np.ndarray) -> np.ndarray:
+    remainder = total % 11
+    return np.where(remainder < 2, 0, 11 - remainder)
+
+
+def _check_digits(values: pd.Series, length: int, weights, digit) -> np.ndarray:
+    """Dígitos verificadores (CPF/CNPJ) de toda a coluna com aritmética de matriz."""
+    texts = _text(values).fillna("")
+    valid = (texts.str.len() == length).to_numpy(dtype=bool, copy=True)
+    if not valid.any():
+        return valid
+    matrix = np.asarray(texts[valid].tolist(), dtype=f'U{length}').view(np.uint32).reshape(-1, length) - 48
+    matrix = matrix.astype(np.int64)
+    ok = ~(matrix == matrix[:, :1]).all(axis=1)   # sequências de números iguais
+    for position, weight in zip((length - 2, length - 1), weights):
+        ok &= digit(matrix[:, :position] @ weight) == matrix[:, position]
+    valid[valid] = ok
+    return valid
@@ -0,0 +1,220 @@
+"""
+Plano de validação compilado por schema.
+
+``DataValidator.validate`` percorre as regras do tipo a cada valor, roda todos os
+sanitizadores e validadores em sequência e formata as mensagens de erro na hora.
+O plano faz esse trabalho uma vez por schema:
+
+- os sanitizadores de cada coluna (regras do tipo + regras extras) viram uma
+  única cadeia, aplicada antes das verificações; as verificações olham o valor
+  já sanitizado, que é o que vai para o banco;
+- regras com ``pattern`` são verificadas com a regex compilada uma vez;
+- as verificações ficam em ordem de custo (regex, vetorizada, função) e param
+  na primeira que falha;
+- a falha guarda só o nome da regra; a mensagem é montada quando pedida.
+
+``DataValidator.compile_plan`` guarda os planos por schema, então importações
+repetidas com o mesmo schema reaproveitam o plano.
+"""
+
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+import re
+
+import numpy as np
+import pandas as pd
+
+from ..converters.distinct import distinct_values
+
+if TYPE_CHECKING:
+    from .base import ValidationRule
+
+
+@dataclass
+class DataFrameValidation:
+    """Resultado da validação de um DataFrame."""
+    sanitized: pd.DataFrame     # valores sanitizados; células inválidas mantêm o original
+    errors: pd.DataFrame        # uma linha por célula inválida: row (índice), column, rule
+    plan: Optional["ValidationPlan"] = None
+
+    @property
+    def is_valid(self) -> bool:
+        return self.errors.empty
+
+    def message(self, column: str, rule: str) -> str:
+        """Mensagem de erro de uma falha (montada só quando pedida)."""
+        return self.plan.message(column, rule) if self.plan else rule
+
+
+class ColumnPlan:
+    """Regras de uma coluna, compiladas em sanitização + verificações."""
+
+    def __init__(self, column: str, rules: List["ValidationRule"]):
+        self.column = column
+        self.rules = {rule.name: rule for rule in rules}
+        # Cadeia de sanitizadores, na ordem das regras
+        self.sanitizers: Tuple["ValidationRule", ...] = tuple(
+            rule for rule in rules if rule.sanitizer or rule.vectorized_sanitizer
+        )
+        self._scalar_sanitizers: Tuple[Tuple[str, Callable[[Any], Any]], ...] = tuple(
+            (rule.name, rule.sanitizer or partial(_scalar, rule.vectorized_sanitizer))
+            for rule in self.sanitizers
+        )
+        # Verificações da mais barata para a mais cara (ordem estável)
+        self.checks: Tuple[Tuple[str, Callable[[Any], bool], Optional[Callable]], ...] = tuple(
+            (rule.name, _compile_check(rule), rule.vectorized_validator)
+            for rule in sorted(rules, key=_check_cost)
+        )
+
+    def check(self, value: Any) -> Tuple[Any, Optional[str]]:
+        """Valor sanitizado e a regra que falhou (None se válido)."""
+        for name, sanitizer in self._scalar_sanitizers:
+            try:
+                value = sanitizer(value)
+            except Exception:
+                return value, name
+        for name, check, _ in self.checks:
+            try:
+                ok = check(value)
+            except Exception:
+                ok = False
+            if not ok:
+                return value, name
+        return value, None
+
+    def check_column(self, values: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+        """Versão de coluna de ``check``: roda sobre os valores distintos.
+
+        Retorna os valores sanitizados e, por linha, o nome da regra que falhou
+        (None se válida).
+        """
+        codes, uniques = distinct_values(values)
+        current = pd.Series(uniques, dtype=object)
+        failed = np.full(len(current), None, dtype=object)
+        alive = np.ones(len(current), dtype=bool)
+
+        for rule in self.sanitizers:
+            sanitized, broken = _sanitize(rule, current[alive])
+            positions = np.flatnonzero(alive)
+            current.iloc[positions[~broken]] = sanitized[~broken].to_numpy(dtype=object)
+            failed[positions[broken]] = rule.name
+            alive[positions[broken]] = False
+
+        for name, check, vectorized in self.checks:
+            if not alive.any():
+                break
+            positions = np.flatnonzero(alive)
+            ok = _check(check, vectorized, current.iloc[positions])
+            failed[positions[~ok]] = name
+            alive[positions[~ok]] = False
+
+        return (pd.Series(current.to_numpy(dtype=object)[codes], index=values.index, dtype=object),
+                failed[codes])
+
+    def message(self, rule: str) -> str:
+        found = self.rules.get(rule)
+        return f"{rule}: {found.error_message}" if found else rule
+
+
+class ValidationPlan:
+    """Planos de coluna de um schema (nome da coluna -> tipo)."""
+
+    def __init__(self, columns: Dict[str, ColumnPlan]):
+        self.columns = columns
+
+    def check(self, column: str, value: Any) -> Tuple[Any, Optional[str]]:
+        plan = self.columns.get(column)
+        return plan.check(value) if plan else (value, None)
+
+    def message(self, column: str, rule: str) -> str:
+        plan = self.columns.get(column)
+        return plan.message(rule) if plan else rule
+
+    def validate_dataframe(self, df: pd.DataFrame) -> DataFrameValidation:
+        """Valida as colunas do plano; as demais passam sem alteração."""
+        sanitized = {}
+        failures = []
+
+        for column in df.columns:
+            plan = self.columns.get(column)
+            if plan is None:
+                sanitized[column] = df[column]
+                continue
+
+            values, failed = plan.check_column(df[column])
+            invalid = pd.notna(failed)
+            if invalid.any():
+                # Mantém o valor original onde a coluna falhou
+                values = values.where(~invalid, df[column])
+                failures.append(pd.DataFrame({
+                    "row": df.index[invalid],
+                    "column": column,
+                    "rule": failed[invalid]
+                }))
+            sanitized[column] = values
+
+        errors = (pd.concat(failures, ignore_index=True) if failures
+                  else pd.DataFrame({"row": [], "column": [], "rule": []}))
+        return DataFrameValidation(
+            sanitized=pd.DataFrame(sanitized, index=df.index),
+            errors=errors,
+            plan=self
+        )
+
+
+def _check_cost(rule: "ValidationRule") -> int:
+    if rule.pattern:
+        return 0
+    if rule.vectorized_validator:
+        return 1
+    return 2
+
+
+def _compile_check(rule: "ValidationRule") -> Callable[[Any], bool]:
+    """Verificação escalar da regra (regex compilada quando a regra tem ``pattern``)."""
+    if rule.pattern:
+        match = re.compile(rule.pattern).match
+        return lambda value: value is not None and match(str(value)) is not None
+    return rule.validator
+
+
+def _scalar(vectorized: Callable[[pd.Series], pd.Series], value: Any) -> Any:
+    return vectorized(pd.Series([value], dtype=object)).iloc[0]
+
+
+def _sanitize(rule: "ValidationRule", values: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    """Sanitiza valores (vetorizado quando possível); marca os que falharam."""
+    if rule.vectorized_sanitizer:
+        try:
+            result = pd.Series(rule.vectorized_sanitizer(values), index=values.index).astype(object)
+            return result, np.zeros(len(values), dtype=bool)
+        except Exception:
+            if not rule.sanitizer:
+                return values, np.ones(len(values), dtype=bool)
+
+    sanitized = np.empty(len(values), dtype=object)
+    broken = np.zeros(len(values), dtype=bool)
+    for i, value in enumerate(values.to_numpy(dtype=object)):
+        try:
+            sanitized[i] = rule.sanitizer(value)
+        except Exception:
+            sanitized[i], broken[i] = value, True
+    return pd.Series(sanitized, index=values.index, dtype=object), broken
+
+
+def _check(check: Callable[[Any], bool], vectorized: Optional[Callable], values: pd.Series) -> np.ndarray:
+    """Máscara de valores válidos (vetorizada quando possível)."""
+    if vectorized:
+        try:
+            return np.asarray(vectorized(values), dtype=bool)
+        except Exception:
+            pass
+
+    valid = np.zeros(len(values), dtype=bool)
+    for i, value in enumerate(values.to_numpy(dtype=object)):
+        try:
+            valid[i] = check(value)
+        except Exception:
+            pass
+    return valid
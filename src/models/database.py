@@ -1,15 +1,123 @@
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
 from config.settings import Config
 import pandas as pd
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterable, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from postgrest.types import ReturnMethod
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from models.replica import ReplicaRoutingClient, replica_router
+from models.deadline import DeadlineExceeded, deadline, tempo_restante
+from models.user_cache import user_cache
+import httpx
+
+# Linhas por página em leituras paginadas (limite padrão do PostgREST)
+TAMANHO_PAGINA = 1000
+
+# Colunas de produtos_vendidos enviadas à função inserir_bloco_importacao
+COLUNAS_BLOCO_IMPORTACAO = ['sku', 'nome', 'categoria', 'operacao', 'montavel', 'quantidade',
+                            'valor_unitario', 'subtotal', 'descontos', 'valor_total',
+                            'data_venda', 'periodo_inicio', 'periodo_fim', 'semana_domingo', 'hash_linha']
+
+def _limitar_ao_prazo(request: httpx.Request):
+    """Hook de request do httpx: timeout da chamada = mínimo entre o do cliente e o prazo restante"""
+    restante = tempo_restante()
+    if restante is None:
+        return
+    atual = request.extensions.get('timeout') or {}
+    request.extensions['timeout'] = {
+        chave: restante if atual.get(chave) is None else min(atual[chave], restante)
+        for chave in ('connect', 'read', 'write', 'pool')
+    }
+
+class _ConsultaComPrazo:
+    """Builder do PostgREST que respeita o prazo do request ao executar
+    
+    Cada chamada HTTP leva como timeout o menor entre postgrest_client_timeout e
+    o prazo restante (_limitar_ao_prazo); com o prazo já esgotado, nem é enviada.
+    Um timeout HTTP dentro de um prazo vira DeadlineExceeded.
+    """
+    def __init__(self, builder):
+        self._builder = builder
+    
+    def execute(self):
+        prazo = tempo_restante()
+        try:
+            return self._builder.execute()
+        except httpx.TimeoutException as e:
+            if prazo is None:
+                raise
+            raise DeadlineExceeded(f"Requisição ao PostgREST excedeu o prazo: {e}") from e
+    
+    def __getattr__(self, name):
+        atributo = getattr(self._builder, name)
+        if hasattr(atributo, 'execute'):
+            # Propriedades que devolvem builder (ex.: not_)
+            return _ConsultaComPrazo(atributo)
+        if not callable(atributo):
+            return atributo
+        
+        def encadear(*args, **kwargs):
+            resultado = atributo(*args, **kwargs)
+            return _ConsultaComPrazo(resultado) if hasattr(resultado, 'execute') else resultado
+        return encadear
+
+class _ClienteComPrazo:
+    """Cliente Supabase cujas queries (table/rpc) respeitam o prazo do request"""
+    def __init__(self, client: Client):
+        self.client = client
+    
+    def table(self, table_name: str) -> _ConsultaComPrazo:
+        self._instalar_hook()
+        return _ConsultaComPrazo(self.client.table(table_name))
+    
+    from_ = table
+    
+    def rpc(self, fn: str, params: Optional[Dict] = None) -> _ConsultaComPrazo:
+        self._instalar_hook()
+        return _ConsultaComPrazo(self.client.rpc(fn, params or {}))
+    
+    def _instalar_hook(self):
+        """Garante o hook de prazo na sessão httpx atual do PostgREST
+        
+        Verificado a cada query: o supabase recria o cliente PostgREST (e a
+        sessão) quando a sessão de autenticação muda.
+        """
+        sessao = self.client.postgrest.session
+        hooks = sessao.event_hooks
+        if _limitar_ao_prazo not in hooks.get('request', []):
+            sessao.event_hooks = {**hooks, 'request': [*hooks.get('request', []), _limitar_ao_prazo]}
+    
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+def _opcoes_cliente(timeout: Optional[float] = None) -> ClientOptions:
+    """Timeout máximo das chamadas ao PostgREST, pela opção pública do cliente
+    
+    Vale também quando o supabase recria o cliente PostgREST (ex.: troca de sessão);
+    dentro de um prazo, cada chamada é limitada ainda ao tempo restante.
+    """
+    timeout = Config.QUERY_DEADLINE_SECONDS if timeout is None else timeout
+    return ClientOptions(postgrest_client_timeout=timeout)
+
+def _criar_cliente(url: str, timeout: Optional[float] = None) -> _ClienteComPrazo:
+    return _ClienteComPrazo(create_client(url, Config.SUPABASE_KEY, options=_opcoes_cliente(timeout)))
 
 class Database:
-    def __init__(self):
-        self.supabase: Client = create_client(
-            Config.SUPABASE_URL,
-            Config.SUPABASE_KEY
-        )
+    def __init__(self, read_url: Optional[str] = None):
+        self.supabase = _criar_cliente(Config.SUPABASE_URL)
+        
+        # Réplica de leitura: selects vão para ela, escritas para o primário
+        self.read_url = read_url or Config.SUPABASE_READ_URL
+        if self.read_url:
+            replica = _criar_cliente(self.read_url)
+            self.supabase = ReplicaRoutingClient(self.supabase, replica, replica_router)
     
     # ========== Produtos Vendidos ==========
     def get_produtos_vendidos(self, 
@@ -29,11 +137,200 @@ class Database:
         response = query.execute()
         return pd.DataFrame(response.data)
     
-    def insert_produtos_vendidos(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Insere dados de produtos vendidos"""
-        records = df.to_dict('records')
-        response = self.supabase.table('produtos_vendidos').insert(records).execute()
-        return {"success": True, "count": len(response.data)}
+    def substituir_periodo_produtos_vendidos(self,
+                                             dados: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                                             periodo_inicio,
+                                             periodo_fim,
+                                             chunk_size: Optional[int] = None,
+                                             progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, Any]:
+        """Substitui atomicamente os dados de um período (reimportação idempotente)
+        
+        Os dados vão em lotes para produtos_vendidos_staging, identificados por um
+        lote_id; a função substituir_periodo_produtos_vendidos (migration 003) troca o
+        período em uma única transação. Se algum lote falhar, o período não é tocado.
+        """
+        lote_id = str(uuid.uuid4())
+        partes = [dados] if isinstance(dados, pd.DataFrame) else dados
+        total = len(dados) if isinstance(dados, pd.DataFrame) else None
+        
+        carregados = 0
+        falhas = []
+        try:
+            for parte in partes:
+                resultado = self._insert_em_lotes(
+                    'produtos_vendidos_staging', parte.assign(lote_id=lote_id), chunk_size
+                )
+                carregados += resultado['count']
+                falhas += resultado['failed_chunks']
+                if falhas:
+                    break
+                if progress_callback:
+                    progress_callback(carregados, total)
+            
+            if falhas:
+                self._limpar_staging(lote_id)
+                return {"success": False, "count": 0, "inseridos": 0, "removidos": 0,
+                        "failed_chunks": falhas}
+            
+            response = self.supabase.rpc('substituir_periodo_produtos_vendidos', {
+                'p_lote_id': lote_id,
+                'p_periodo_inicio': str(periodo_inicio),
+                'p_periodo_fim': str(periodo_fim)
+            }).execute()
+        except Exception:
+            self._limpar_staging(lote_id)
+            raise
+        
+        resultado = response.data or {}
+        inseridos = int(resultado.get('inseridos', 0))
+        return {"success": True, "count": inseridos, "inseridos": inseridos,
+                "removidos": int(resultado.get('removidos', 0))}
+    
+    def get_hashes_produtos_vendidos(self, periodo_inicio, periodo_fim) -> pd.DataFrame:
+        """id e hash_linha das linhas do período (base da importação incremental)"""
+        # Sempre no primário: o diff precisa do estado mais recente do período
+        primario = getattr(self.supabase, 'primario', self.supabase)
+        paginas = []
+        inicio = 0
+        while True:
+            query = primario.table('produtos_vendidos').select('id,hash_linha')
+            query = query.gte('periodo_inicio', str(periodo_inicio)).lte('periodo_fim', str(periodo_fim))
+            response = query.order('id').range(inicio, inicio + TAMANHO_PAGINA - 1).execute()
+            paginas.extend(response.data)
+            if len(response.data) < TAMANHO_PAGINA:
+                break
+            inicio += TAMANHO_PAGINA
+        return pd.DataFrame(paginas, columns=['id', 'hash_linha'])
+    
+    def aplicar_diff_produtos_vendidos(self,
+                                       remover_ids: List[Any],
+                                       novos: Iterable[pd.DataFrame],
+                                       chunk_size: Optional[int] = None,
+                                       progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, Any]:
+        """Remove as linhas de remover_ids e insere as novas
+        
+        Pelo PostgREST não há transação entre as chamadas; como o diff é recalculado
+        a cada importação, repetir a importação após uma falha converge para o arquivo.
+        """
+        chunk_size = chunk_size or Config.SUPABASE_INSERT_CHUNK_SIZE
+        removidos = 0
+        for inicio in range(0, len(remover_ids), chunk_size):
+            lote = [str(i) for i in remover_ids[inicio:inicio + chunk_size]]
+            query = self.supabase.table('produtos_vendidos').delete(returning=ReturnMethod.minimal)
+            query.in_('id', lote).execute()
+            removidos += len(lote)
+        
+        inseridos = 0
+        falhas = []
+        for parte in novos:
+            resultado = self._insert_em_lotes('produtos_vendidos', parte, chunk_size)
+            inseridos += resultado['count']
+            falhas += resultado['failed_chunks']
+            if progress_callback:
+                progress_callback(inseridos, None)
+        
+        return {"success": not falhas, "count": inseridos, "inseridos": inseridos,
+                "removidos": removidos, "failed_chunks": falhas}
+    
+    def inserir_bloco_importacao(self,
+                                 importacao_id: str,
+                                 bloco: int,
+                                 df: pd.DataFrame,
+                                 checkpoint: Dict[str, int],
+                                 chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """Insere um bloco da importação e avança o checkpoint na mesma transação
+        
+        Usa a função inserir_bloco_importacao (migration 005), que ignora blocos já
+        confirmados; por isso a chamada pode ser repetida com segurança após uma falha.
+        """
+        colunas = df.columns.intersection(COLUNAS_BLOCO_IMPORTACAO)
+        registros = json.loads(df[colunas].to_json(orient='records', date_format='iso'))
+        params = {
+            'p_importacao_id': importacao_id,
+            'p_bloco': bloco,
+            'p_linhas_confirmadas': checkpoint['linhas_confirmadas'],
+            'p_registros_erro': checkpoint['registros_erro'],
+            'p_total_registros': checkpoint['total_registros'],
+            'p_registros': registros
+        }
+        
+        max_retries = Config.SUPABASE_INSERT_MAX_RETRIES
+        for tentativa in range(max_retries + 1):
+            try:
+                response = self.supabase.rpc('inserir_bloco_importacao', params).execute()
+                break
+            except Exception as e:
+                if tentativa == max_retries:
+                    raise
+                espera = Config.SUPABASE_INSERT_BACKOFF * (2 ** tentativa)
+                espera += random.uniform(0, Config.SUPABASE_INSERT_BACKOFF)
+                print(f"AVISO - Falha ao gravar bloco {bloco} da importação {importacao_id} ({e}); "
+                      f"nova tentativa em {espera:.1f}s")
+                time.sleep(espera)
+        
+        resultado = response.data or {}
+        return {"success": True, "count": int(resultado.get('inseridos', 0)),
+                "ignorado": bool(resultado.get('ignorado', False))}
+    
+    def _limpar_staging(self, lote_id: str):
+        """Remove da staging as linhas de um lote não aplicado"""
+        try:
+            self.supabase.table('produtos_vendidos_staging').delete().eq('lote_id', lote_id).execute()
+        except Exception as e:
+            print(f"AVISO - Falha ao limpar staging do lote {lote_id}: {e}")
+    
+    def _insert_em_lotes(self, tabela: str, df: pd.DataFrame,
+                         chunk_size: Optional[int] = None,
+                         max_workers: Optional[int] = None,
+                         progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """Divide o DataFrame em lotes e envia em paralelo com pool limitado de threads"""
+        chunk_size = chunk_size or Config.SUPABASE_INSERT_CHUNK_SIZE
+        max_workers = max_workers or Config.SUPABASE_INSERT_WORKERS
+        
+        # to_json converte NaN em null e datas em ISO (payload serializável)
+        records = json.loads(df.to_json(orient='records', date_format='iso'))
+        chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+        
+        inseridos = 0
+        falhas = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._insert_lote_com_retry, tabela, chunk): numero
+                for numero, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                try:
+                    inseridos += future.result()
+                except Exception as e:
+                    falhas.append({"lote": futures[future], "erro": str(e)})
+                    continue
+                if progress_callback:
+                    progress_callback(inseridos, len(records))
+        
+        return {
+            "success": not falhas,
+            "count": inseridos,
+            "chunks": len(chunks),
+            "failed_chunks": sorted(falhas, key=lambda f: f["lote"])
+        }
+    
+    def _insert_lote_com_retry(self, tabela: str, registros: List[Dict]) -> int:
+        """Insere um lote, repetindo com backoff exponencial em caso de falha"""
+        max_retries = Config.SUPABASE_INSERT_MAX_RETRIES
+        for tentativa in range(max_retries + 1):
+            try:
+                # returning=minimal evita trafegar de volta o lote inteiro
+                self.supabase.table(tabela).insert(
+                    registros, returning=ReturnMethod.minimal
+                ).execute()
+                return len(registros)
+            except Exception as e:
+                if tentativa == max_retries:
+                    raise
+                espera = Config.SUPABASE_INSERT_BACKOFF * (2 ** tentativa)
+                espera += random.uniform(0, Config.SUPABASE_INSERT_BACKOFF)
+                print(f"AVISO - Falha ao inserir lote em {tabela} ({e}); nova tentativa em {espera:.1f}s")
+                time.sleep(espera)
     
     # ========== Categorias ==========
     def get_categorias(self, ativo: bool = True) -> List[Dict]:
@@ -94,6 +391,11 @@ class Database:
         response = self.supabase.table('usuarios').select('*').eq('email', email).execute()
         return response.data[0] if response.data else None
     
+    def get_usuario_by_id(self, usuario_id: str) -> Optional[Dict]:
+        """Busca usuário por id"""
+        response = self.supabase.table('usuarios').select('*').eq('id', usuario_id).execute()
+        return response.data[0] if response.data else None
+    
     def create_usuario(self, data: Dict) -> Dict:
         """Cria um novo usuário"""
         response = self.supabase.table('usuarios').insert(data).execute()
@@ -105,6 +407,20 @@ class Database:
             'ultimo_acesso': datetime.utcnow().isoformat()
         }).eq('id', usuario_id).execute()
     
+    def update_usuario(self, usuario_id: str, data: Dict):
+        """Atualiza dados/perfil de um usuário e invalida o cache de sessão"""
+        self.supabase.table('usuarios').update(data).eq('id', usuario_id).execute()
+        user_cache.invalidar(usuario_id)
+    
+    def update_ultimos_acessos(self, acessos: Dict[str, str]):
+        """Atualiza o último acesso de vários usuários (id -> horário ISO)
+        
+        O PostgREST não faz UPDATE multi-linha com valores diferentes; como a fila
+        write-behind já deduplica por usuário, é uma requisição por usuário do lote.
+        """
+        for usuario_id, em in acessos.items():
+            self.supabase.table('usuarios').update({'ultimo_acesso': em}).eq('id', usuario_id).execute()
+    
     # ========== Configurações ==========
     def get_configuracao(self, chave: str) -> Optional[str]:
         """Busca uma configuração específica"""
@@ -123,6 +439,18 @@ class Database:
         """Cria um log de auditoria"""
         self.supabase.table('logs_auditoria').insert(data).execute()
     
+    def create_logs_auditoria(self, logs: List[Dict]):
+        """Cria vários logs de auditoria, uma requisição por conjunto de colunas
+        
+        O PostgREST exige as mesmas chaves em todas as linhas de um insert
+        multi-linha (ex.: registro_id só existe em parte dos logs).
+        """
+        grupos: Dict[tuple, List[Dict]] = {}
+        for log in logs:
+            grupos.setdefault(tuple(sorted(log)), []).append(log)
+        for grupo in grupos.values():
+            self.supabase.table('logs_auditoria').insert(grupo, returning=ReturnMethod.minimal).execute()
+    
     # ========== Dashboards ==========
     def get_dashboards_usuario(self, usuario_id: str) -> List[Dict]:
         """Busca dashboards de um usuário"""
@@ -142,6 +470,18 @@ class Database:
         response = self.supabase.table('importacoes_arquivos').insert(data).execute()
         return response.data[0] if response.data else None
     
+    def get_importacao(self, importacao_id: str) -> Optional[Dict]:
+        """Busca uma importação por id"""
+        response = self.supabase.table('importacoes_arquivos').select('*').eq('id', importacao_id).execute()
+        return response.data[0] if response.data else None
+    
+    def get_importacao_por_hash(self, hash_arquivo: str, periodo_inicio, periodo_fim) -> Optional[Dict]:
+        """Importação concluída do mesmo arquivo para o mesmo período, se houver"""
+        query = self.supabase.table('importacoes_arquivos').select('*').eq('hash_arquivo', hash_arquivo)
+        query = query.eq('periodo_inicio', str(periodo_inicio)).eq('periodo_fim', str(periodo_fim))
+        response = query.eq('status', 'concluido').order('created_at', desc=True).limit(1).execute()
+        return response.data[0] if response.data else None
+    
     def update_importacao(self, importacao_id: str, data: Dict):
         """Atualiza status de uma importação"""
         self.supabase.table('importacoes_arquivos').update(data).eq('id', importacao_id).execute()
@@ -149,14 +489,116 @@ class Database:
     def create_erro_importacao(self, data: Dict):
         """Registra erro de importação"""
         self.supabase.table('importacoes_erros').insert(data).execute()
+    
+    def create_erros_importacao(self, erros: List[Dict]):
+        """Registra vários erros de importação em inserts multi-linha"""
+        tamanho = Config.SUPABASE_INSERT_CHUNK_SIZE
+        for inicio in range(0, len(erros), tamanho):
+            self.supabase.table('importacoes_erros').insert(
+                erros[inicio:inicio + tamanho], returning=ReturnMethod.minimal
+            ).execute()
+    
+    def delete_erros_importacao(self, importacao_id: str, linha_inicial: int = 0):
+        """Remove os erros registrados a partir de uma linha (retomada de importação)"""
+        query = self.supabase.table('importacoes_erros').delete(returning=ReturnMethod.minimal)
+        query.eq('importacao_id', importacao_id).gte('linha_numero', linha_inicial).execute()
+    
+    # ========== Manutenção ==========
+    def garantir_particoes(self, meses: Optional[int] = None) -> int:
+        """Cria as partições mensais dos próximos meses (função da migration 002)"""
+        meses = Config.PARTITION_MONTHS_AHEAD if meses is None else meses
+        response = self.supabase.rpc('garantir_particoes_futuras', {'meses': meses}).execute()
+        return int(response.data or 0)
+
+class LazyDatabase:
+    """Resolve o backend (Supabase ou PostgreSQL direto) no primeiro uso
+    
+    A escolha vem de Config.DATABASE_BACKEND ('supabase' ou 'postgres'); em 'auto',
+    usa o resultado em cache do último teste de conexão e o revalida em segundo
+    plano. Só quando não há cache o teste roda (uma vez) no primeiro acesso.
+    """
+    
+    def __init__(self):
+        self._db = None
+        self._lock = threading.Lock()
+    
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+    
+    @property
+    def backend(self) -> str:
+        return 'supabase' if isinstance(self._get(), Database) else 'postgres'
+    
+    def aquecer(self):
+        """Resolve o backend em segundo plano (não bloqueia o boot do worker)
+        
+        Não cria partições: isso é DDL e roda no deploy ou agendado
+        (scripts/garantir-particoes.py), não em cada worker.
+        """
+        threading.Thread(target=self._get, name='db-backend-init', daemon=True).start()
+    
+    def _get(self):
+        if self._db is None:
+            with self._lock:
+                if self._db is None:
+                    self._db = self._resolver()
+        return self._db
+    
+    def _resolver(self):
+        backend = Config.DATABASE_BACKEND
+        
+        if backend not in ('supabase', 'postgres'):
+            backend = self._ler_cache()
+            if backend:
+                # Revalida para o próximo boot sem bloquear este
+                threading.Thread(target=self._testar_supabase, name='db-backend-probe', daemon=True).start()
+            else:
+                backend = 'supabase' if self._testar_supabase() else 'postgres'
+        
+        if backend == 'supabase':
+            try:
+                instancia = Database()
+                print("OK - Usando cliente Supabase")
+                return instancia
+            except Exception as e:
+                print(f"AVISO - Erro com cliente Supabase: {str(e)}")
+        
+        print("OK - Usando conexao PostgreSQL direta")
+        from models.database_pg import db as pg_db
+        return pg_db
+    
+    def _testar_supabase(self) -> bool:
+        """Testa o cliente Supabase com uma query simples e grava o resultado em cache"""
+        try:
+            with deadline(Config.DATABASE_PROBE_TIMEOUT):
+                cliente = _criar_cliente(Config.SUPABASE_URL, Config.DATABASE_PROBE_TIMEOUT)
+                cliente.table('categorias').select('*').limit(1).execute()
+            ok = True
+        except Exception as e:
+            print(f"AVISO - Erro com cliente Supabase: {str(e)}")
+            ok = False
+        self._gravar_cache('supabase' if ok else 'postgres')
+        return ok
+    
+    @staticmethod
+    def _ler_cache() -> Optional[str]:
+        try:
+            with open(Config.DATABASE_BACKEND_CACHE, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if time.time() - cache['testado_em'] <= Config.DATABASE_BACKEND_CACHE_TTL:
+                return cache['backend']
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+    
+    @staticmethod
+    def _gravar_cache(backend: str):
+        try:
+            os.makedirs(os.path.dirname(Config.DATABASE_BACKEND_CACHE) or '.', exist_ok=True)
+            with open(Config.DATABASE_BACKEND_CACHE, 'w', encoding='utf-8') as f:
+                json.dump({'backend': backend, 'testado_em': time.time()}, f)
+        except OSError as e:
+            print(f"AVISO - Não foi possível gravar cache do backend: {e}")
 
-# Tenta criar instância com Supabase, se falhar usa PostgreSQL direto
-try:
-    db = Database()
-    # Testa se funciona
-    test = db.supabase.table('categorias').select('*').limit(1).execute()
-    print("OK - Usando cliente Supabase")
-except Exception as e:
-    print(f"AVISO - Erro com cliente Supabase: {str(e)}")
-    print("OK - Usando conexao PostgreSQL direta")
-    from models.database_pg import db
\ No newline at end of file
+# Instância global (backend resolvido no primeiro uso)
+db = LazyDatabase()
@@ -0,0 +1,286 @@
+"""
+Camada assíncrona de acesso a dados.
+
+Usa asyncpg (PostgreSQL direto) ou httpx assíncrono (PostgREST do Supabase), sempre
+com pool de conexões, para que um mesmo request possa disparar consultas independentes
+em paralelo. O event loop roda em uma thread dedicada, de modo que handlers Flask
+síncronos possam usar ``async_db.run(...)`` sem depender de um servidor ASGI.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from config.settings import Config
+from models.query_builder import QueryBuilder
+from models.replica import replica_router
+from models.deadline import (
+    Deadline, DeadlineExceeded, deadline_atual, definir_deadline, restaurar_deadline, tempo_restante
+)
+
+
+# Folga (segundos) entre o timeout de cada query e o cancelamento do conjunto
+_MARGEM_CANCELAMENTO = 0.5
+
+_NAO_RESOLVIDO = object()
+
+
+class AsyncQueryResult:
+    """Resultado de uma query no formato do cliente Supabase"""
+    def __init__(self, data: List[Dict]):
+        self.data = data
+        self.count = len(data)
+
+
+class AsyncQuery(QueryBuilder):
+    """Query encadeável estilo Supabase com ``execute`` assíncrono."""
+
+    def __init__(self, db: 'AsyncDatabase', table_name: str):
+        super().__init__(table_name, placeholder='$')
+        self.db = db
+
+    async def execute(self) -> AsyncQueryResult:
+        return AsyncQueryResult(await self.db.fetch(self))
+
+
+class AsyncDatabase:
+    """Acesso assíncrono ao banco com pool (asyncpg ou PostgREST via httpx)."""
+
+    def __init__(self,
+                 dsn: Optional[str] = None,
+                 rest_url: Optional[str] = None,
+                 rest_key: Optional[str] = None,
+                 read_dsn: Optional[str] = None,
+                 read_rest_url: Optional[str] = None,
+                 min_size: Optional[int] = None,
+                 max_size: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.dsn = dsn or Config.DATABASE_URL
+        self.rest_url = rest_url or Config.SUPABASE_URL
+        self.rest_key = rest_key or Config.SUPABASE_KEY
+        self.read_dsn = read_dsn or Config.DATABASE_READ_URL
+        self.read_rest_url = read_rest_url or Config.SUPABASE_READ_URL
+        self.router = replica_router
+        self.min_size = min_size or Config.ASYNC_POOL_MIN_SIZE
+        self.max_size = max_size or Config.ASYNC_POOL_MAX_SIZE
+        self._pools: Dict[str, Any] = {}
+        self._pool_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_lock = threading.Lock()
+        # Resolvido no primeiro uso, junto com o backend do db síncrono
+        self._backend: Any = _NAO_RESOLVIDO
+
+    # ========== Backend ==========
+    @property
+    def backend(self) -> Optional[str]:
+        """Backend assíncrono: 'pg', 'rest' ou None.
+        
+        Segue o backend do ``db`` síncrono (Config.DATABASE_BACKEND e o teste de
+        conexão em cache), para que leituras sync e async usem o mesmo banco:
+        PostgreSQL direto -> asyncpg, Supabase -> PostgREST via httpx. Sem o driver
+        ou a configuração correspondente, é None e o serviço usa o caminho síncrono.
+        """
+        if self._backend is _NAO_RESOLVIDO:
+            self._backend = self._resolver_backend()
+        return self._backend
+
+    def _resolver_backend(self) -> Optional[str]:
+        from models.database import db
+        if db.backend == 'supabase':
+            if self.rest_url and self.rest_key and self._modulo_disponivel('httpx'):
+                return 'rest'
+        elif self.dsn and self._modulo_disponivel('asyncpg'):
+            return 'pg'
+        return None
+
+    @property
+    def disponivel(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def _modulo_disponivel(nome: str) -> bool:
+        try:
+            __import__(nome)
+            return True
+        except ImportError:
+            return False
+
+    # ========== Event loop ==========
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Retorna o event loop dedicado, iniciando a thread na primeira chamada."""
+        with self._thread_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name='async-db-loop', daemon=True
+                )
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Executa uma corrotina no loop dedicado e aguarda o resultado.
+
+        O prazo do request (se houver) é propagado para o loop; ao esgotar, as
+        consultas em andamento são canceladas e DeadlineExceeded é levantada.
+        """
+        prazo = deadline_atual()
+        if prazo is not None:
+            coro = self._com_deadline(coro, prazo)
+            limite = prazo.restante() + 2 * _MARGEM_CANCELAMENTO
+            timeout = limite if timeout is None else min(timeout, limite)
+
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise DeadlineExceeded("Prazo esgotado aguardando consultas assíncronas")
+
+    @staticmethod
+    async def _com_deadline(coro, prazo: Deadline):
+        """Roda a corrotina com o prazo ativo no contexto da task do loop."""
+        token = definir_deadline(prazo)
+        try:
+            # A margem deixa cada query expirar primeiro (e cair no fallback do serviço)
+            return await asyncio.wait_for(coro, prazo.restante() + _MARGEM_CANCELAMENTO)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Prazo de {prazo.segundos:.1f}s esgotado")
+        finally:
+            restaurar_deadline(token)
+
+    async def gather(self, *coros) -> List[Any]:
+        """Executa corrotinas independentes em paralelo."""
+        return list(await asyncio.gather(*coros))
+
+    # ========== Pool ==========
+    async def _get_pool(self, replica: bool = False):
+        """Retorna o pool do primário ou da réplica, criando-o no primeiro uso."""
+        if self._pool_lock is None:
+            self._pool_lock = asyncio.Lock()
+
+        if self.backend == 'pg':
+            destino = self.read_dsn if replica else self.dsn
+        else:
+            destino = self.read_rest_url if replica else self.rest_url
+
+        async with self._pool_lock:
+            if destino not in self._pools:
+                if self.backend == 'pg':
+                    import asyncpg
+                    # statement_cache_size=0 mantém compatibilidade com o pooler (pgbouncer)
+                    self._pools[destino] = await asyncpg.create_pool(
+                        destino,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        statement_cache_size=0
+                    )
+                else:
+                    import httpx
+                    self._pools[destino] = httpx.AsyncClient(
+                        base_url=f"{destino.rstrip('/')}/rest/v1",
+                        headers={
+                            'apikey': self.rest_key,
+                            'Authorization': f"Bearer {self.rest_key}"
+                        },
+                        limits=httpx.Limits(max_connections=self.max_size)
+                    )
+        return self._pools[destino]
+
+    def _usar_replica(self, query: QueryBuilder) -> bool:
+        """Leituras vão para a réplica configurada, respeitando a janela pós-escrita."""
+        if query.operacao != 'select':
+            self.router.registrar_escrita(query.table_name)
+            return False
+        replica = self.read_dsn if self.backend == 'pg' else self.read_rest_url
+        # A medição de atraso é síncrona; aqui usa apenas o último valor medido
+        return bool(replica) and self.router.usar_replica([query.table_name], medir=False)
+
+    async def close(self):
+        """Fecha os pools de conexões."""
+        for pool in self._pools.values():
+            if self.backend == 'pg':
+                await pool.close()
+            else:
+                await pool.aclose()
+        self._pools.clear()
+
+    # ========== Consultas ==========
+    def table(self, table_name: str) -> AsyncQuery:
+        return AsyncQuery(self, table_name)
+
+    async def fetch(self, query: QueryBuilder) -> List[Dict]:
+        """Executa uma query do construtor e retorna as linhas como dicionários."""
+        backend = self.backend
+        if backend is None:
+            raise RuntimeError("Nenhum backend assíncrono disponível para o backend do db "
+                               "(asyncpg para PostgreSQL, httpx para Supabase)")
+
+        pool = await self._get_pool(replica=self._usar_replica(query))
+        # Prazo restante do request vira timeout da query (None = sem limite)
+        restante = tempo_restante()
+
+        if backend == 'pg':
+            sql, params = query.build()
+            try:
+                async with pool.acquire(timeout=restante) as conn:
+                    rows = await conn.fetch(sql, *params, timeout=restante)
+            except asyncio.TimeoutError as e:
+                raise DeadlineExceeded(f"Query em {query.table_name} excedeu o prazo") from e
+            return [dict(row) for row in rows]
+
+        if query.operacao != 'select':
+            raise ValueError("Backend PostgREST assíncrono suporta apenas leituras")
+
+        import httpx
+        kwargs = {'timeout': restante} if restante is not None else {}
+        try:
+            response = await pool.get(
+                f"/{query.table_name}", params=self._rest_params(query), **kwargs
+            )
+        except httpx.TimeoutException as e:
+            raise DeadlineExceeded(f"Query em {query.table_name} excedeu o prazo") from e
+
+        response.raise_for_status()
+        return response.json()
+
+    @classmethod
+    def _rest_params(cls, query: QueryBuilder) -> List[tuple]:
+        """Converte os filtros do construtor para parâmetros do PostgREST."""
+        params = [('select', ','.join(query.colunas))]
+
+        for coluna, operador, valor in query.filtros:
+            if operador == 'in':
+                params.append((coluna, f"in.({','.join(cls._rest_valor(v) for v in valor)})"))
+            elif operador == 'is':
+                params.append((coluna, f"is.{cls._rest_valor(valor)}"))
+            else:
+                params.append((coluna, f"{operador}.{cls._rest_valor(valor)}"))
+
+        if query.ordem:
+            params.append(('order', ','.join(
+                f"{coluna}.{'desc' if desc else 'asc'}" for coluna, desc in query.ordem
+            )))
+        if query.limite is not None:
+            params.append(('limit', str(query.limite)))
+        if query.deslocamento is not None:
+            params.append(('offset', str(query.deslocamento)))
+
+        return params
+
+    @staticmethod
+    def _rest_valor(valor: Any) -> str:
+        if valor is None:
+            return 'null'
+        if isinstance(valor, bool):
+            return 'true' if valor else 'false'
+        if isinstance(valor, (date, datetime)):
+            return valor.isoformat()
+        return str(valor)
+
+
+# Instância global
+async_db = AsyncDatabase()
@@ -1,24 +1,84 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 import pandas as pd
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterable, Union
 from config.settings import Config
+from models.query_builder import QueryBuilder
+from models.replica import replica_router
+from models.deadline import DeadlineExceeded, tempo_restante
+from models.user_cache import user_cache
+import csv
+import io
 import json
+import re
+
+# Colunas gravadas pela importação de produtos vendidos
+COLUNAS_PRODUTOS_VENDIDOS = ['sku', 'nome', 'categoria', 'operacao', 'montavel', 'quantidade',
+                             'valor_unitario', 'subtotal', 'descontos', 'valor_total',
+                             'data_venda', 'periodo_inicio', 'periodo_fim', 'semana_domingo', 'hash_linha']
+
+_TABELAS_QUERY = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+"?(\w+)"?', re.IGNORECASE)
 
 class Database:
-    def __init__(self):
+    def __init__(self, read_connection_string: Optional[str] = None):
         self.connection_string = Config.DATABASE_URL
+        self.read_connection_string = read_connection_string or Config.DATABASE_READ_URL
+        self.router = replica_router
+        if self.read_connection_string:
+            self.router.medir_lag = self._medir_lag_replica
+        
+    def get_connection(self, readonly: bool = False, tabelas: List[str] = ()):
+        """Cria uma nova conexão com o banco (réplica quando readonly e disponível)"""
+        kwargs = {}
+        restante = tempo_restante()
+        if restante is not None:
+            kwargs['connect_timeout'] = max(1, int(restante))
         
-    def get_connection(self):
-        """Cria uma nova conexão com o banco"""
-        return psycopg2.connect(self.connection_string)
+        if readonly and self.read_connection_string and self.router.usar_replica(tabelas):
+            return psycopg2.connect(self.read_connection_string, **kwargs)
+        return psycopg2.connect(self.connection_string, **kwargs)
+    
+    def _executar(self, cursor, query: str, params: tuple = None):
+        """Executa no cursor limitando a query ao prazo restante do request"""
+        restante = tempo_restante()
+        if restante is not None:
+            # SET LOCAL vale só para a transação atual
+            cursor.execute("SET LOCAL statement_timeout = %s", (max(1, int(restante * 1000)),))
+        try:
+            cursor.execute(query, params)
+        except psycopg2.errors.QueryCanceled as e:
+            raise DeadlineExceeded(f"Query cancelada por prazo esgotado: {e}") from e
+    
+    def _medir_lag_replica(self) -> float:
+        """Retorna o atraso de replicação da réplica em segundos"""
+        conn = psycopg2.connect(self.read_connection_string)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+                )
+                return float(cursor.fetchone()[0])
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _tabelas_da_query(query: str) -> List[str]:
+        """Extrai as tabelas lidas ou escritas por uma query"""
+        return [t.lower() for t in _TABELAS_QUERY.findall(query)]
     
     def execute_query(self, query: str, params: tuple = None) -> List[Dict]:
         """Executa uma query e retorna os resultados"""
-        with self.get_connection() as conn:
+        # SELECTs vão para a réplica; demais comandos abrem a janela de fallback
+        readonly = query.lstrip().upper().startswith('SELECT')
+        tabelas = self._tabelas_da_query(query)
+        if not readonly:
+            for tabela in tabelas or [None]:
+                self.router.registrar_escrita(tabela)
+        
+        with self.get_connection(readonly=readonly, tabelas=tabelas) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query, params)
+                self._executar(cursor, query, params)
                 if cursor.description:
                     return cursor.fetchall()
                 conn.commit()
@@ -26,9 +86,11 @@ class Database:
     
     def execute_insert(self, query: str, params: tuple = None) -> Dict:
         """Executa um INSERT e retorna o registro criado"""
+        for tabela in self._tabelas_da_query(query) or [None]:
+            self.router.registrar_escrita(tabela)
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query + " RETURNING *", params)
+                self._executar(cursor, query + " RETURNING *", params)
                 result = cursor.fetchone()
                 conn.commit()
                 return dict(result) if result else None
@@ -56,30 +118,156 @@ class Database:
         results = self.execute_query(query, tuple(params))
         return pd.DataFrame(results)
     
-    def insert_produtos_vendidos(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Insere dados de produtos vendidos"""
-        records_inserted = 0
+    def substituir_periodo_produtos_vendidos(self,
+                                             dados: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                                             periodo_inicio,
+                                             periodo_fim,
+                                             chunk_size: Optional[int] = None,
+                                             progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, Any]:
+        """Substitui atomicamente os dados de um período (reimportação idempotente)
+        
+        Carrega os dados em uma tabela temporária de staging e, na mesma transação,
+        remove as linhas do período e copia a staging com um único INSERT ... SELECT.
+        Aceita um DataFrame ou um iterável de DataFrames (leitura em chunks).
+        """
+        chunk_size = chunk_size or Config.SUPABASE_INSERT_CHUNK_SIZE
+        colunas = ', '.join(COLUNAS_PRODUTOS_VENDIDOS)
+        partes = [dados] if isinstance(dados, pd.DataFrame) else dados
+        total = len(dados) if isinstance(dados, pd.DataFrame) else None
+        
+        carregados = 0
+        self.router.registrar_escrita('produtos_vendidos')
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
-                for _, row in df.iterrows():
-                    query = """
-                        INSERT INTO produtos_vendidos 
-                        (sku, nome, categoria, operacao, montavel, quantidade, 
-                         valor_unitario, subtotal, descontos, valor_total, 
-                         data_venda, periodo_inicio, periodo_fim)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-                    params = (
-                        row['sku'], row['nome'], row['categoria'], row['operacao'],
-                        row['montavel'], row['quantidade'], row['valor_unitario'],
-                        row['subtotal'], row['descontos'], row['valor_total'],
-                        row['data_venda'], row['periodo_inicio'], row['periodo_fim']
+                cursor.execute(
+                    "CREATE TEMP TABLE produtos_vendidos_staging "
+                    "(LIKE produtos_vendidos INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                query = f"INSERT INTO produtos_vendidos_staging ({colunas}) VALUES %s"
+                for parte in partes:
+                    valores = parte[COLUNAS_PRODUTOS_VENDIDOS].astype(object).where(
+                        parte[COLUNAS_PRODUTOS_VENDIDOS].notna(), None
+                    ).values.tolist()
+                    for inicio in range(0, len(valores), chunk_size):
+                        lote = valores[inicio:inicio + chunk_size]
+                        execute_values(cursor, query, lote, page_size=len(lote))
+                        carregados += len(lote)
+                        if progress_callback:
+                            progress_callback(carregados, total)
+                
+                # Serializa reimportações concorrentes (mesma trava da função do Supabase)
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('produtos_vendidos'))")
+                cursor.execute(
+                    "DELETE FROM produtos_vendidos WHERE periodo_inicio >= %s AND periodo_fim <= %s",
+                    (periodo_inicio, periodo_fim)
+                )
+                removidos = cursor.rowcount
+                cursor.execute(
+                    f"INSERT INTO produtos_vendidos ({colunas}) "
+                    f"SELECT {colunas} FROM produtos_vendidos_staging"
+                )
+                inseridos = cursor.rowcount
+                conn.commit()
+        
+        return {"success": True, "count": inseridos, "inseridos": inseridos, "removidos": removidos}
+    
+    def get_hashes_produtos_vendidos(self, periodo_inicio, periodo_fim) -> pd.DataFrame:
+        """id e hash_linha das linhas do período (base da importação incremental)"""
+        # Sempre no primário: o diff precisa do estado mais recente do período
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                self._executar(
+                    cursor,
+                    "SELECT id, hash_linha FROM produtos_vendidos "
+                    "WHERE periodo_inicio >= %s AND periodo_fim <= %s",
+                    (periodo_inicio, periodo_fim)
+                )
+                return pd.DataFrame(cursor.fetchall(), columns=['id', 'hash_linha'])
+    
+    def aplicar_diff_produtos_vendidos(self,
+                                       remover_ids: List[Any],
+                                       novos: Iterable[pd.DataFrame],
+                                       chunk_size: Optional[int] = None,
+                                       progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, Any]:
+        """Remove as linhas de remover_ids e insere as novas em uma única transação"""
+        chunk_size = chunk_size or Config.SUPABASE_INSERT_CHUNK_SIZE
+        colunas = ', '.join(COLUNAS_PRODUTOS_VENDIDOS)
+        query = f"INSERT INTO produtos_vendidos ({colunas}) VALUES %s"
+        
+        removidos = 0
+        inseridos = 0
+        self.router.registrar_escrita('produtos_vendidos')
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('produtos_vendidos'))")
+                for inicio in range(0, len(remover_ids), chunk_size):
+                    cursor.execute(
+                        "DELETE FROM produtos_vendidos WHERE id = ANY(%s::uuid[])",
+                        ([str(i) for i in remover_ids[inicio:inicio + chunk_size]],)
                     )
-                    cursor.execute(query, params)
-                    records_inserted += 1
+                    removidos += cursor.rowcount
+                
+                for parte in novos:
+                    valores = parte[COLUNAS_PRODUTOS_VENDIDOS].astype(object).where(
+                        parte[COLUNAS_PRODUTOS_VENDIDOS].notna(), None
+                    ).values.tolist()
+                    for inicio in range(0, len(valores), chunk_size):
+                        lote = valores[inicio:inicio + chunk_size]
+                        execute_values(cursor, query, lote, page_size=len(lote))
+                        inseridos += len(lote)
+                    if progress_callback:
+                        progress_callback(inseridos, None)
                 conn.commit()
         
-        return {"success": True, "count": records_inserted}
+        return {"success": True, "count": inseridos, "inseridos": inseridos, "removidos": removidos}
+    
+    def inserir_bloco_importacao(self,
+                                 importacao_id: str,
+                                 bloco: int,
+                                 df: pd.DataFrame,
+                                 checkpoint: Dict[str, int],
+                                 chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """Insere um bloco da importação e avança o checkpoint na mesma transação
+        
+        checkpoint traz linhas_confirmadas, registros_erro e total_registros. Um
+        bloco já confirmado (ultimo_bloco >= bloco) é ignorado, então repetir a
+        chamada após uma falha não duplica linhas.
+        """
+        chunk_size = chunk_size or Config.SUPABASE_INSERT_CHUNK_SIZE
+        colunas = COLUNAS_PRODUTOS_VENDIDOS
+        query = f"INSERT INTO produtos_vendidos ({', '.join(colunas)}) VALUES %s"
+        valores = df[colunas].astype(object).where(df[colunas].notna(), None).values.tolist()
+        
+        self.router.registrar_escrita('produtos_vendidos')
+        self.router.registrar_escrita('importacoes_arquivos')
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT ultimo_bloco FROM importacoes_arquivos WHERE id = %s FOR UPDATE",
+                    (importacao_id,)
+                )
+                atual = cursor.fetchone()
+                if atual and atual[0] is not None and atual[0] >= bloco:
+                    conn.rollback()
+                    return {"success": True, "count": 0, "ignorado": True}
+                
+                for inicio in range(0, len(valores), chunk_size):
+                    lote = valores[inicio:inicio + chunk_size]
+                    execute_values(cursor, query, lote, page_size=len(lote))
+                cursor.execute(
+                    """
+                    UPDATE importacoes_arquivos
+                    SET ultimo_bloco = %s, linhas_confirmadas = %s,
+                        registros_importados = COALESCE(registros_importados, 0) + %s,
+                        registros_erro = %s, total_registros = %s, updated_at = NOW()
+                    WHERE id = %s
+                    """,
+                    (bloco, checkpoint['linhas_confirmadas'], len(valores),
+                     checkpoint['registros_erro'], checkpoint['total_registros'], importacao_id)
+                )
+                conn.commit()
+        
+        return {"success": True, "count": len(valores), "ignorado": False}
     
     # ========== Categorias ==========
     def get_categorias(self, ativo: bool = True) -> List[Dict]:
@@ -144,6 +332,7 @@ class Database:
     def insert_dados_indicador(self, indicador_id: str, data: List[Dict]) -> Dict:
         """Insere dados de um indicador"""
         records_inserted = 0
+        self.router.registrar_escrita('dados_indicadores')
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
                 for record in data:
@@ -173,6 +362,12 @@ class Database:
         results = self.execute_query(query, (email,))
         return results[0] if results else None
     
+    def get_usuario_by_id(self, usuario_id: str) -> Optional[Dict]:
+        """Busca usuário por id"""
+        query = "SELECT * FROM usuarios WHERE id = %s"
+        results = self.execute_query(query, (usuario_id,))
+        return results[0] if results else None
+    
     def create_usuario(self, data: Dict) -> Dict:
         """Cria um novo usuário"""
         columns = ', '.join(data.keys())
@@ -185,6 +380,27 @@ class Database:
         query = "UPDATE usuarios SET ultimo_acesso = NOW() WHERE id = %s"
         self.execute_query(query, (usuario_id,))
     
+    def update_usuario(self, usuario_id: str, data: Dict):
+        """Atualiza dados/perfil de um usuário e invalida o cache de sessão"""
+        set_clause = ', '.join([f"{k} = %s" for k in data.keys()])
+        query = f"UPDATE usuarios SET {set_clause}, updated_at = NOW() WHERE id = %s"
+        self.execute_query(query, tuple(list(data.values()) + [usuario_id]))
+        user_cache.invalidar(usuario_id)
+    
+    def update_ultimos_acessos(self, acessos: Dict[str, str]):
+        """Atualiza o último acesso de vários usuários em um único UPDATE"""
+        query = """
+            UPDATE usuarios AS u SET ultimo_acesso = v.em
+            FROM (VALUES %s) AS v(id, em)
+            WHERE u.id = v.id
+        """
+        self.router.registrar_escrita('usuarios')
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(cursor, query, list(acessos.items()),
+                               template="(%s::uuid, %s::timestamptz)")
+                conn.commit()
+    
     # ========== Configurações ==========
     def get_configuracao(self, chave: str) -> Optional[str]:
         """Busca uma configuração específica"""
@@ -195,6 +411,7 @@ class Database:
     def update_configuracao(self, chave: str, valor: str) -> bool:
         """Atualiza uma configuração"""
         query = "UPDATE configuracoes SET valor = %s, updated_at = NOW() WHERE chave = %s"
+        self.router.registrar_escrita('configuracoes')
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(query, (valor, chave))
@@ -216,6 +433,26 @@ class Database:
         query = f"INSERT INTO logs_auditoria ({columns}) VALUES ({placeholders})"
         self.execute_query(query, tuple(data.values()))
     
+    def create_logs_auditoria(self, logs: List[Dict]):
+        """Cria vários logs de auditoria com um único INSERT multi-linha"""
+        colunas = []
+        for log in logs:
+            colunas += [c for c in log.keys() if c not in colunas]
+        
+        valores = []
+        for log in logs:
+            valores.append(tuple(
+                json.dumps(log[c]) if isinstance(log.get(c), dict) else log.get(c)
+                for c in colunas
+            ))
+        
+        query = f"INSERT INTO logs_auditoria ({', '.join(colunas)}) VALUES %s"
+        self.router.registrar_escrita('logs_auditoria')
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(cursor, query, valores, page_size=len(valores))
+                conn.commit()
+    
     # ========== Dashboards ==========
     def get_dashboards_usuario(self, usuario_id: str) -> List[Dict]:
         """Busca dashboards de um usuário"""
@@ -244,6 +481,23 @@ class Database:
         query = f"INSERT INTO importacoes_arquivos ({columns}) VALUES ({placeholders})"
         return self.execute_insert(query, tuple(data.values()))
     
+    def get_importacao(self, importacao_id: str) -> Optional[Dict]:
+        """Busca uma importação por id"""
+        query = "SELECT * FROM importacoes_arquivos WHERE id = %s"
+        results = self.execute_query(query, (importacao_id,))
+        return results[0] if results else None
+    
+    def get_importacao_por_hash(self, hash_arquivo: str, periodo_inicio, periodo_fim) -> Optional[Dict]:
+        """Importação concluída do mesmo arquivo para o mesmo período, se houver"""
+        query = """
+            SELECT * FROM importacoes_arquivos
+            WHERE hash_arquivo = %s AND periodo_inicio = %s AND periodo_fim = %s
+              AND status = 'concluido'
+            ORDER BY created_at DESC LIMIT 1
+        """
+        results = self.execute_query(query, (hash_arquivo, periodo_inicio, periodo_fim))
+        return results[0] if results else None
+    
     def update_importacao(self, importacao_id: str, data: Dict):
         """Atualiza status de uma importação"""
         set_clause = ', '.join([f"{k} = %s" for k in data.keys()])
@@ -258,6 +512,44 @@ class Database:
         query = f"INSERT INTO importacoes_erros ({columns}) VALUES ({placeholders})"
         self.execute_query(query, tuple(data.values()))
     
+    def create_erros_importacao(self, erros: List[Dict]):
+        """Registra vários erros de importação com um único COPY"""
+        if not erros:
+            return
+        colunas = ['importacao_id', 'linha_numero', 'linha_conteudo', 'erro_mensagem']
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for erro in erros:
+            # Célula vazia sem aspas = NULL no COPY em CSV
+            escritor.writerow(['' if erro.get(c) is None else erro[c] for c in colunas])
+        buffer.seek(0)
+        
+        self.router.registrar_escrita('importacoes_erros')
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY importacoes_erros ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+                conn.commit()
+    
+    def delete_erros_importacao(self, importacao_id: str, linha_inicial: int = 0):
+        """Remove os erros registrados a partir de uma linha (retomada de importação)"""
+        query = "DELETE FROM importacoes_erros WHERE importacao_id = %s AND linha_numero >= %s"
+        self.execute_query(query, (importacao_id, linha_inicial))
+    
+    # ========== Manutenção ==========
+    def garantir_particoes(self, meses: Optional[int] = None) -> int:
+        """Cria as partições mensais dos próximos meses (função da migration 002)"""
+        meses = Config.PARTITION_MONTHS_AHEAD if meses is None else meses
+        # Sempre no primário: apesar do SELECT, a função cria tabelas
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT garantir_particoes_futuras(%s)", (meses,))
+                criadas = cursor.fetchone()[0]
+                conn.commit()
+                return int(criadas or 0)
+    
     # Compatibilidade com código existente
     @property
     def supabase(self):
@@ -271,34 +563,22 @@ class Database:
         
         return FakeSupabase(self)
 
-class FakeTable:
-    """Classe para simular a interface do Supabase"""
+class QueryResult:
+    """Resultado de uma query no formato do cliente Supabase"""
+    def __init__(self, data):
+        self.data = data
+        self.count = len(data)
+
+class FakeTable(QueryBuilder):
+    """Classe para simular a interface do Supabase com queries parametrizadas"""
     def __init__(self, db, table_name):
+        super().__init__(table_name)
         self.db = db
-        self.table_name = table_name
-        self.query_parts = []
-        
-    def select(self, columns='*'):
-        self.columns = columns
-        self.query_parts.append(f"SELECT {columns} FROM {self.table_name}")
-        return self
-    
-    def eq(self, column, value):
-        self.query_parts.append(f"WHERE {column} = '{value}'")
-        return self
         
     def execute(self):
-        # Simplified - in real implementation would build proper query
-        if self.table_name == 'usuarios':
-            results = self.db.execute_query(f"SELECT * FROM {self.table_name}", ())
-        else:
-            results = self.db.execute_query(' '.join(self.query_parts), ())
-        
-        class Result:
-            def __init__(self, data):
-                self.data = data
-        
-        return Result(results)
+        query, params = self.build()
+        results = self.db.execute_query(query, tuple(params))
+        return QueryResult([dict(r) for r in results])
 
 # Instância global
 db = Database()
\ No newline at end of file
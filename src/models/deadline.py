@@ -0,0 +1,97 @@
+"""
+Prazo (deadline) por request para consultas ao banco.
+
+O orçamento de tempo é guardado em uma ContextVar e consultado pela camada de dados:
+no PostgreSQL vira ``statement_timeout``; no PostgREST vira o timeout de cada
+requisição HTTP (o menor entre o restante e o do cliente);
+na camada assíncrona, cancela as consultas em andamento quando o prazo acaba.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+from config.settings import Config
+
+
+class DeadlineExceeded(Exception):
+    """O orçamento de tempo do request se esgotou."""
+
+
+class Deadline:
+    """Orçamento de tempo com instante de expiração absoluto."""
+
+    def __init__(self, segundos: float):
+        self.segundos = segundos
+        self.expira_em = time.monotonic() + segundos
+
+    def restante(self) -> float:
+        """Segundos restantes (nunca negativo)."""
+        return max(0.0, self.expira_em - time.monotonic())
+
+    def expirado(self) -> bool:
+        return self.restante() <= 0
+
+    def verificar(self):
+        """Levanta DeadlineExceeded se o prazo já acabou (cancelamento cooperativo)."""
+        if self.expirado():
+            raise DeadlineExceeded(f"Prazo de {self.segundos:.1f}s esgotado")
+
+
+_deadline_atual: ContextVar[Optional[Deadline]] = ContextVar('deadline_atual', default=None)
+
+
+def deadline_atual() -> Optional[Deadline]:
+    """Retorna o prazo ativo no contexto atual, se houver."""
+    return _deadline_atual.get()
+
+
+def definir_deadline(prazo: Optional[Deadline]):
+    """Define o prazo ativo e retorna o token para restaurar o anterior."""
+    return _deadline_atual.set(prazo)
+
+
+def restaurar_deadline(token):
+    _deadline_atual.reset(token)
+
+
+def tempo_restante() -> Optional[float]:
+    """Segundos restantes do prazo ativo, ou None quando não há prazo."""
+    prazo = deadline_atual()
+    if prazo is None:
+        return None
+    prazo.verificar()
+    return prazo.restante()
+
+
+@contextmanager
+def deadline(segundos: Optional[float] = None):
+    """Executa o bloco com um orçamento de tempo.
+
+    Um prazo já ativo mais curto (ex.: do request externo) prevalece.
+    """
+    segundos = Config.QUERY_DEADLINE_SECONDS if segundos is None else segundos
+    externo = deadline_atual()
+    if externo is not None and externo.restante() < segundos:
+        prazo = externo
+    else:
+        prazo = Deadline(segundos)
+
+    token = definir_deadline(prazo)
+    try:
+        yield prazo
+    finally:
+        restaurar_deadline(token)
+
+
+def com_deadline(segundos: Optional[float] = None):
+    """Decorador que executa a função (ex.: um endpoint) dentro de um prazo."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with deadline(segundos):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
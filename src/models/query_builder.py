@@ -0,0 +1,250 @@
+"""
+Construtor de queries SQL parametrizadas com interface compatível com o cliente Supabase.
+
+Permite encadear ``select/eq/gte/lte/order/limit`` (e operações de escrita) e gera
+SQL com bind parameters, sem nunca interpolar valores na string da query.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+_IDENTIFICADOR = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# Operadores de filtro suportados (nome do método -> operador SQL)
+OPERADORES = {
+    'eq': '=',
+    'neq': '<>',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+    'like': 'LIKE',
+    'ilike': 'ILIKE',
+}
+
+
+def quote_identifier(nome: str) -> str:
+    """Valida e coloca um identificador SQL entre aspas duplas."""
+    if not isinstance(nome, str) or not _IDENTIFICADOR.match(nome):
+        raise ValueError(f"Identificador SQL inválido: {nome!r}")
+    return f'"{nome}"'
+
+
+class QueryBuilder:
+    """Monta queries parametrizadas a partir de chamadas encadeadas estilo Supabase."""
+
+    def __init__(self, table_name: str, placeholder: str = '%s'):
+        quote_identifier(table_name)
+        self.table_name = table_name
+        self.placeholder = placeholder
+        self.operacao = 'select'
+        self.colunas: List[str] = ['*']
+        self.filtros: List[Tuple[str, str, Any]] = []
+        self.ordem: List[Tuple[str, bool]] = []
+        self.limite: Optional[int] = None
+        self.deslocamento: Optional[int] = None
+        self.dados: Optional[List[Dict[str, Any]]] = None
+        self.on_conflict: Optional[List[str]] = None
+
+    # ========== Operações ==========
+    def select(self, columns: str = '*') -> 'QueryBuilder':
+        self.operacao = 'select'
+        self.colunas = self._parse_colunas(columns)
+        return self
+
+    def insert(self, data: Union[Dict, List[Dict]]) -> 'QueryBuilder':
+        self.operacao = 'insert'
+        self.dados = self._normaliza_dados(data)
+        return self
+
+    def upsert(self, data: Union[Dict, List[Dict]], on_conflict: Optional[str] = None) -> 'QueryBuilder':
+        self.operacao = 'upsert'
+        self.dados = self._normaliza_dados(data)
+        self.on_conflict = self._parse_colunas(on_conflict or 'id')
+        return self
+
+    def update(self, data: Dict) -> 'QueryBuilder':
+        self.operacao = 'update'
+        self.dados = self._normaliza_dados(data)
+        return self
+
+    def delete(self) -> 'QueryBuilder':
+        self.operacao = 'delete'
+        return self
+
+    # ========== Filtros ==========
+    def _filtro(self, column: str, operador: str, value: Any) -> 'QueryBuilder':
+        quote_identifier(column)
+        self.filtros.append((column, operador, value))
+        return self
+
+    def eq(self, column: str, value: Any) -> 'QueryBuilder':
+        return self._filtro(column, 'eq', value)
+
+    def neq(self, column: str, value: Any) -> 'QueryBuilder':
+        return self._filtro(column, 'neq', value)
+
+    def gt(self, column: str, value: Any) -> 'QueryBuilder':
+        return self._filtro(column, 'gt', value)
+
+    def gte(self, column: str, value: Any) -> 'QueryBuilder':
+        return self._filtro(column, 'gte', value)
+
+    def lt(self, column: str, value: Any) -> 'QueryBuilder':
+        return self._filtro(column, 'lt', value)
+
+    def lte(self, column: str, value: Any) -> 'QueryBuilder':
+        return self._filtro(column, 'lte', value)
+
+    def like(self, column: str, pattern: str) -> 'QueryBuilder':
+        return self._filtro(column, 'like', pattern)
+
+    def ilike(self, column: str, pattern: str) -> 'QueryBuilder':
+        return self._filtro(column, 'ilike', pattern)
+
+    def in_(self, column: str, values: List[Any]) -> 'QueryBuilder':
+        return self._filtro(column, 'in', list(values))
+
+    def is_(self, column: str, value: Any) -> 'QueryBuilder':
+        """Filtro IS NULL / IS TRUE / IS FALSE (aceita 'null' como no Supabase)."""
+        if value in (None, 'null'):
+            value = None
+        elif value not in (True, False):
+            raise ValueError(f"Valor inválido para is_: {value!r}")
+        return self._filtro(column, 'is', value)
+
+    # ========== Modificadores ==========
+    def order(self, column: str, desc: bool = False) -> 'QueryBuilder':
+        quote_identifier(column)
+        self.ordem.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> 'QueryBuilder':
+        self.limite = int(size)
+        return self
+
+    def range(self, start: int, end: int) -> 'QueryBuilder':
+        self.deslocamento = int(start)
+        self.limite = int(end) - int(start) + 1
+        return self
+
+    # ========== Compilação ==========
+    def build(self) -> Tuple[str, List[Any]]:
+        """Gera o SQL parametrizado e a lista de parâmetros."""
+        params: List[Any] = []
+
+        if self.operacao == 'select':
+            colunas = ', '.join('*' if c == '*' else quote_identifier(c) for c in self.colunas)
+            query = f"SELECT {colunas} FROM {quote_identifier(self.table_name)}"
+            query += self._where(params)
+            if self.ordem:
+                query += " ORDER BY " + ', '.join(
+                    f"{quote_identifier(c)} {'DESC' if desc else 'ASC'}" for c, desc in self.ordem
+                )
+            if self.limite is not None:
+                query += f" LIMIT {self._param(params, self.limite)}"
+            if self.deslocamento is not None:
+                query += f" OFFSET {self._param(params, self.deslocamento)}"
+            return query, params
+
+        if self.operacao in ('insert', 'upsert'):
+            colunas = self._colunas_dados()
+            linhas = []
+            for registro in self.dados:
+                linhas.append('(' + ', '.join(
+                    self._param(params, registro.get(c)) for c in colunas
+                ) + ')')
+            query = (
+                f"INSERT INTO {quote_identifier(self.table_name)} "
+                f"({', '.join(quote_identifier(c) for c in colunas)}) "
+                f"VALUES {', '.join(linhas)}"
+            )
+            if self.operacao == 'upsert':
+                atualizar = [c for c in colunas if c not in self.on_conflict]
+                query += f" ON CONFLICT ({', '.join(quote_identifier(c) for c in self.on_conflict)})"
+                if atualizar:
+                    query += " DO UPDATE SET " + ', '.join(
+                        f"{quote_identifier(c)} = EXCLUDED.{quote_identifier(c)}" for c in atualizar
+                    )
+                else:
+                    query += " DO NOTHING"
+            return query + " RETURNING *", params
+
+        if self.operacao == 'update':
+            registro = self.dados[0]
+            sets = ', '.join(
+                f"{quote_identifier(c)} = {self._param(params, v)}" for c, v in registro.items()
+            )
+            query = f"UPDATE {quote_identifier(self.table_name)} SET {sets}"
+            query += self._where(params, obrigatorio=True)
+            return query + " RETURNING *", params
+
+        if self.operacao == 'delete':
+            query = f"DELETE FROM {quote_identifier(self.table_name)}"
+            query += self._where(params, obrigatorio=True)
+            return query + " RETURNING *", params
+
+        raise ValueError(f"Operação não suportada: {self.operacao}")
+
+    def formato(self) -> Dict[str, Any]:
+        """Descreve o formato da query, sem os valores (usado na análise de índices)."""
+        return {
+            'tabela': self.table_name,
+            'operacao': self.operacao,
+            'colunas': list(self.colunas),
+            'igualdade': sorted({c for c, op, _ in self.filtros if op in ('eq', 'in', 'is')}),
+            'intervalo': sorted({c for c, op, _ in self.filtros if op in ('gt', 'gte', 'lt', 'lte')}),
+            'ordem': [c for c, _ in self.ordem],
+        }
+
+    # ========== Métodos Auxiliares ==========
+    def _param(self, params: List[Any], value: Any) -> str:
+        params.append(value)
+        if self.placeholder == '$':
+            return f"${len(params)}"
+        return self.placeholder
+
+    def _where(self, params: List[Any], obrigatorio: bool = False) -> str:
+        if not self.filtros:
+            if obrigatorio:
+                # Evita UPDATE/DELETE acidental na tabela inteira
+                raise ValueError(f"{self.operacao.upper()} sem filtro não é permitido")
+            return ""
+
+        condicoes = []
+        for coluna, operador, valor in self.filtros:
+            col = quote_identifier(coluna)
+            if operador == 'in':
+                condicoes.append(f"{col} = ANY({self._param(params, valor)})")
+            elif operador == 'is':
+                condicoes.append(f"{col} IS {'NULL' if valor is None else str(valor).upper()}")
+            else:
+                condicoes.append(f"{col} {OPERADORES[operador]} {self._param(params, valor)}")
+        return " WHERE " + ' AND '.join(condicoes)
+
+    def _colunas_dados(self) -> List[str]:
+        colunas: List[str] = []
+        for registro in self.dados:
+            for coluna in registro.keys():
+                if coluna not in colunas:
+                    quote_identifier(coluna)
+                    colunas.append(coluna)
+        return colunas
+
+    @staticmethod
+    def _parse_colunas(columns: str) -> List[str]:
+        colunas = [c.strip() for c in columns.split(',') if c.strip()]
+        for coluna in colunas:
+            if '(' in coluna:
+                raise ValueError(f"Seleção de relacionamentos não suportada: {coluna}")
+            if coluna != '*':
+                quote_identifier(coluna)
+        return colunas or ['*']
+
+    @staticmethod
+    def _normaliza_dados(data: Union[Dict, List[Dict]]) -> List[Dict[str, Any]]:
+        registros = [data] if isinstance(data, dict) else list(data)
+        if not registros:
+            raise ValueError("Nenhum registro informado")
+        return registros
@@ -0,0 +1,136 @@
+"""
+Roteamento de leituras para réplica somente leitura.
+
+Leituras vão para a réplica; escritas vão para o primário. Logo após uma escrita
+(ex.: importação de arquivo) e sempre que o atraso medido da réplica passa do limite,
+as leituras voltam temporariamente para o primário.
+"""
+
+import threading
+import time
+import logging
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from config.settings import Config
+
+
+class ReplicaRouter:
+    """Decide, a cada leitura, se a réplica pode ser usada."""
+
+    def __init__(self,
+                 janela_escrita: Optional[float] = None,
+                 max_lag: Optional[float] = None,
+                 intervalo_medicao: float = 5.0):
+        self.logger = logging.getLogger(__name__)
+        self.janela_escrita = Config.REPLICA_LAG_WINDOW_SECONDS if janela_escrita is None else janela_escrita
+        self.max_lag = Config.REPLICA_MAX_LAG_SECONDS if max_lag is None else max_lag
+        self.intervalo_medicao = intervalo_medicao
+        self.medir_lag: Optional[Callable[[], float]] = None
+        self._escritas: Dict[str, float] = {}
+        self._ultimo_lag = 0.0
+        self._ultima_medicao = 0.0
+        self._lock = threading.Lock()
+
+    def registrar_escrita(self, tabela: Optional[str] = None):
+        """Marca escrita no primário, iniciando a janela de fallback da tabela.
+
+        Sem tabela, a janela vale para todas as leituras.
+        """
+        self._escritas[tabela or '*'] = time.monotonic()
+
+    def usar_replica(self, tabelas: Iterable[str] = (), medir: bool = True) -> bool:
+        """Retorna se uma leitura das tabelas informadas pode ir para a réplica."""
+        agora = time.monotonic()
+
+        for tabela in ('*', *tabelas):
+            if agora - self._escritas.get(tabela, 0.0) < self.janela_escrita:
+                return False
+
+        if medir and self.medir_lag and agora - self._ultima_medicao >= self.intervalo_medicao:
+            with self._lock:
+                if agora - self._ultima_medicao >= self.intervalo_medicao:
+                    self._ultima_medicao = agora
+                    try:
+                        self._ultimo_lag = float(self.medir_lag() or 0.0)
+                    except Exception as e:
+                        # Réplica inacessível: trata como atrasada
+                        self.logger.warning(f"Falha ao medir atraso da réplica: {e}")
+                        self._ultimo_lag = float('inf')
+
+        return self._ultimo_lag <= self.max_lag
+
+
+# Funções (RPC) que escrevem e as tabelas que alteram; abrem a janela de fallback
+FUNCOES_ESCRITA: Dict[str, Tuple[str, ...]] = {
+    'inserir_bloco_importacao': ('produtos_vendidos', 'importacoes_arquivos'),
+    'substituir_periodo_produtos_vendidos': ('produtos_vendidos', 'produtos_vendidos_staging'),
+    'garantir_particoes_futuras': ('produtos_vendidos', 'estornos_cancelamento', 'dados_indicadores'),
+}
+
+# Funções só de leitura (não abrem janela)
+FUNCOES_LEITURA = frozenset({'atraso_replicacao'})
+
+
+class ReplicaRoutingClient:
+    """Cliente Supabase que envia selects à réplica e escritas ao primário."""
+
+    def __init__(self, primario, replica, router: ReplicaRouter):
+        self.primario = primario
+        self.replica = replica
+        self.router = router
+        # Atraso medido na própria réplica (função da migration 006)
+        router.medir_lag = self.medir_lag
+
+    def table(self, table_name: str) -> '_RoutedTable':
+        return _RoutedTable(self, table_name)
+
+    def rpc(self, fn: str, params: Optional[Dict] = None):
+        """Funções rodam no primário; as de escrita abrem a janela das tabelas que alteram.
+
+        Uma função fora dos mapas é tratada como escrita em todas as tabelas.
+        """
+        if fn not in FUNCOES_LEITURA:
+            for tabela in FUNCOES_ESCRITA.get(fn, (None,)):
+                self.router.registrar_escrita(tabela)
+        return self.primario.rpc(fn, params or {})
+
+    def medir_lag(self) -> float:
+        """Atraso de replicação da réplica em segundos."""
+        return float(self.replica.rpc('atraso_replicacao', {}).execute().data or 0.0)
+
+    def __getattr__(self, name):
+        # storage, auth etc. sempre no primário
+        return getattr(self.primario, name)
+
+
+class _RoutedTable:
+    """Escolhe o cliente no momento em que a operação é definida."""
+
+    def __init__(self, client: ReplicaRoutingClient, table_name: str):
+        self.client = client
+        self.table_name = table_name
+
+    def select(self, *args, **kwargs):
+        usar_replica = self.client.router.usar_replica([self.table_name])
+        destino = self.client.replica if usar_replica else self.client.primario
+        return destino.table(self.table_name).select(*args, **kwargs)
+
+    def _escrita(self, operacao: str, *args, **kwargs):
+        self.client.router.registrar_escrita(self.table_name)
+        return getattr(self.client.primario.table(self.table_name), operacao)(*args, **kwargs)
+
+    def insert(self, *args, **kwargs):
+        return self._escrita('insert', *args, **kwargs)
+
+    def upsert(self, *args, **kwargs):
+        return self._escrita('upsert', *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._escrita('update', *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._escrita('delete', *args, **kwargs)
+
+
+# Instância global (compartilhada entre as camadas síncrona e assíncrona)
+replica_router = ReplicaRouter()
@@ -0,0 +1,76 @@
+"""
+Cache em memória dos usuários autenticados.
+
+O ``load_user`` do Flask-Login roda em todo request com ``@login_required``. Com o
+cache, o usuário é reconstruído sem ida ao banco enquanto a entrada estiver dentro
+do TTL; alterações de usuário/perfil invalidam a entrada na hora.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from config.settings import Config
+
+
+# Campos necessários para reconstruir o User (nunca guarda senha_hash)
+CAMPOS_USUARIO = ('id', 'email', 'nome', 'perfil', 'ativo')
+
+
+class UserCache:
+    """Cache de usuários por id com TTL curto."""
+
+    def __init__(self, ttl: Optional[float] = None, max_size: int = 1000):
+        self.ttl = Config.USER_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_size = max_size
+        self._entradas: Dict[str, Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[Dict]:
+        """Retorna os dados do usuário se a entrada ainda for válida."""
+        entrada = self._entradas.get(str(user_id))
+        if entrada is None:
+            return None
+        expira_em, dados = entrada
+        if time.monotonic() >= expira_em:
+            self.invalidar(user_id)
+            return None
+        return dados
+
+    def set(self, user_id: str, dados: Dict):
+        """Guarda os campos essenciais do usuário."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entradas) >= self.max_size:
+                # Descarta a entrada que expira primeiro
+                mais_antiga = min(self._entradas, key=lambda k: self._entradas[k][0])
+                self._entradas.pop(mais_antiga, None)
+            self._entradas[str(user_id)] = (time.monotonic() + self.ttl, self._essenciais(dados))
+
+    def obter(self, user_id: str, carregar: Callable[[str], Optional[Dict]]) -> Optional[Dict]:
+        """Retorna do cache ou carrega do banco (e guarda) quando ausente/expirado."""
+        dados = self.get(user_id)
+        if dados is None:
+            dados = carregar(user_id)
+            if not dados:
+                return None
+            dados = self._essenciais(dados)
+            self.set(user_id, dados)
+        return dados
+
+    @staticmethod
+    def _essenciais(dados: Dict) -> Dict:
+        return {campo: dados.get(campo) for campo in CAMPOS_USUARIO}
+
+    def invalidar(self, user_id: Optional[str] = None):
+        """Remove um usuário do cache (ou todos, sem id)."""
+        with self._lock:
+            if user_id is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(str(user_id), None)
+
+
+# Instância global
+user_cache = UserCache()
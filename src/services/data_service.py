@@ -2,14 +2,30 @@
 Serviço principal para acesso e manipulação de dados das tabelas produtos_vendidos e estornos_cancelamentos.
 """
 
+import inspect
 import pandas as pd
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Callable, Optional, Dict, Any, List, Tuple
 from datetime import datetime, date, timedelta
 import numpy as np
 from functools import lru_cache
 import logging
 
+from config.settings import Config
 from models.database import db
+from models.database_async import async_db
+from models.deadline import DeadlineExceeded
+
+
+# Colunas buscadas pelos totais do resumo: cobertas pelos índices compostos
+# (docs/database/migrations/001_indices_compostos.sql), o que permite index-only scan
+COLUNAS_TOTAL_VENDAS = 'produtos_vendidos'
+COLUNAS_TOTAL_ESTORNOS = 'valor'
+
+# Coluna de partição de cada tabela fato (migration 002)
+COLUNAS_PARTICAO = {
+    'produtos_vendidos': 'semana_domingo',
+    'estornos_cancelamento': 'data',
+}
 
 
 class DataService:
@@ -30,7 +46,8 @@ class DataService:
                                  squad: Optional[str] = None,
                                  ano: Optional[int] = None,
                                  mes: Optional[int] = None,
-                                 use_cache: bool = True) -> pd.DataFrame:
+                                 use_cache: bool = True,
+                                 colunas: str = '*') -> pd.DataFrame:
         """
         Retorna DataFrame com dados de produtos vendidos.
         
@@ -42,27 +59,56 @@ class DataService:
             ano: Filtrar por ano específico
             mes: Filtrar por mês específico
             use_cache: Se deve usar cache (padrão: True)
+            colunas: Colunas a buscar (padrão: todas); seleções estreitas permitem
+                index-only scan nos índices compostos
             
         Returns:
             DataFrame com dados de produtos vendidos
         """
-        cache_key = f"produtos_vendidos_{data_inicio}_{data_fim}_{unidade}_{squad}_{ano}_{mes}"
-        
-        # Verifica cache
-        if use_cache and self._is_cache_valid(cache_key):
-            self.logger.info("Retornando dados de produtos_vendidos do cache")
-            return self._cache[cache_key].copy()
-        
-        # Busca dados do banco
-        self.logger.info("Buscando dados de produtos_vendidos do banco")
-        
-        query = db.supabase.table('produtos_vendidos').select('*')
+        return _sem_event_loop(self._consultar_produtos_vendidos(
+            db.supabase.table('produtos_vendidos'),
+            data_inicio, data_fim, unidade, squad, ano, mes, use_cache, colunas
+        ))
+    
+    async def get_produtos_vendidos_df_async(self,
+                                             data_inicio: Optional[date] = None,
+                                             data_fim: Optional[date] = None,
+                                             unidade: Optional[str] = None,
+                                             squad: Optional[str] = None,
+                                             ano: Optional[int] = None,
+                                             mes: Optional[int] = None,
+                                             use_cache: bool = True,
+                                             colunas: str = '*') -> pd.DataFrame:
+        """
+        Versão assíncrona de get_produtos_vendidos_df (mesmos filtros e cache).
+        """
+        return await self._consultar_produtos_vendidos(
+            async_db.table('produtos_vendidos'),
+            data_inicio, data_fim, unidade, squad, ano, mes, use_cache, colunas
+        )
+    
+    async def _consultar_produtos_vendidos(self, tabela, data_inicio, data_fim, unidade, squad,
+                                           ano, mes, use_cache, colunas) -> pd.DataFrame:
+        cache_key = f"produtos_vendidos_{data_inicio}_{data_fim}_{unidade}_{squad}_{ano}_{mes}_{colunas}"
+        query = self._filtrar_produtos_vendidos(
+            tabela.select(colunas), data_inicio, data_fim, unidade, squad, ano, mes
+        )
+        return await self._consultar(
+            'produtos_vendidos', cache_key, query, self._preparar_produtos_vendidos_df, use_cache
+        )
+    
+    def _filtrar_produtos_vendidos(self, query, data_inicio, data_fim, unidade, squad, ano, mes):
+        """Aplica os filtros de produtos_vendidos em um query builder (sync ou async)."""
+        # Predicado de data sempre (partition pruning); a semana (domingo) pode
+        # começar até 6 dias antes ou depois do mês
+        inicio_periodo, fim_periodo = self._periodo_ano_mes(ano, mes, margem_dias=6)
+        data_inicio = data_inicio or inicio_periodo
+        data_fim = data_fim or fim_periodo
         
-        # Aplica filtros
         if data_inicio:
-            query = query.gte('semana_domingo', data_inicio.isoformat())
+            query = query.gte('semana_domingo', data_inicio)
         if data_fim:
-            query = query.lte('semana_domingo', data_fim.isoformat())
+            query = query.lte('semana_domingo', data_fim)
         if unidade:
             query = query.eq('unidade', unidade)
         if squad:
@@ -73,26 +119,17 @@ class DataService:
             query = query.eq('mes', mes)
             
         # Ordena por data
-        query = query.order('semana_domingo', desc=True)
-        
-        # Executa query
-        result = query.execute()
-        
-        # Converte para DataFrame
-        df = pd.DataFrame(result.data)
-        
+        return query.order('semana_domingo', desc=True)
+    
+    def _preparar_produtos_vendidos_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converte os tipos de dados do DataFrame de produtos_vendidos."""
         if not df.empty:
-            # Converte tipos de dados
-            df['semana_domingo'] = pd.to_datetime(df['semana_domingo'])
-            df['produtos_vendidos'] = pd.to_numeric(df['produtos_vendidos'], errors='coerce')
-            df['ano'] = pd.to_numeric(df['ano'], errors='coerce')
-            df['mes'] = pd.to_numeric(df['mes'], errors='coerce')
-            
-        # Atualiza cache
-        if use_cache:
-            self._cache[cache_key] = df.copy()
-            self._last_cache_update[cache_key] = datetime.now()
-            
+            # Seleções estreitas trazem só parte das colunas
+            if 'semana_domingo' in df:
+                df['semana_domingo'] = pd.to_datetime(df['semana_domingo'])
+            for coluna in ('produtos_vendidos', 'ano', 'mes'):
+                if coluna in df:
+                    df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
         return df
     
     # ========== Estornos e Cancelamentos ==========
@@ -106,7 +143,8 @@ class DataService:
                                      categoria: Optional[str] = None,
                                      ano: Optional[int] = None,
                                      mes: Optional[int] = None,
-                                     use_cache: bool = True) -> pd.DataFrame:
+                                     use_cache: bool = True,
+                                     colunas: str = '*') -> pd.DataFrame:
         """
         Retorna DataFrame com dados de estornos e cancelamentos.
         
@@ -120,27 +158,57 @@ class DataService:
             ano: Filtrar por ano específico
             mes: Filtrar por mês específico
             use_cache: Se deve usar cache (padrão: True)
+            colunas: Colunas a buscar (padrão: todas)
             
         Returns:
             DataFrame com dados de estornos e cancelamentos
         """
-        cache_key = f"estornos_{data_inicio}_{data_fim}_{unidade}_{squad}_{tipo}_{categoria}_{ano}_{mes}"
-        
-        # Verifica cache
-        if use_cache and self._is_cache_valid(cache_key):
-            self.logger.info("Retornando dados de estornos_cancelamentos do cache")
-            return self._cache[cache_key].copy()
-        
-        # Busca dados do banco
-        self.logger.info("Buscando dados de estornos_cancelamentos do banco")
-        
-        query = db.supabase.table('estornos_cancelamento').select('*')
+        return _sem_event_loop(self._consultar_estornos_cancelamentos(
+            db.supabase.table('estornos_cancelamento'),
+            data_inicio, data_fim, unidade, squad, tipo, categoria, ano, mes, use_cache, colunas
+        ))
+    
+    async def get_estornos_cancelamentos_df_async(self,
+                                                  data_inicio: Optional[date] = None,
+                                                  data_fim: Optional[date] = None,
+                                                  unidade: Optional[str] = None,
+                                                  squad: Optional[str] = None,
+                                                  tipo: Optional[str] = None,
+                                                  categoria: Optional[str] = None,
+                                                  ano: Optional[int] = None,
+                                                  mes: Optional[int] = None,
+                                                  use_cache: bool = True,
+                                                  colunas: str = '*') -> pd.DataFrame:
+        """
+        Versão assíncrona de get_estornos_cancelamentos_df (mesmos filtros e cache).
+        """
+        return await self._consultar_estornos_cancelamentos(
+            async_db.table('estornos_cancelamento'),
+            data_inicio, data_fim, unidade, squad, tipo, categoria, ano, mes, use_cache, colunas
+        )
+    
+    async def _consultar_estornos_cancelamentos(self, tabela, data_inicio, data_fim, unidade, squad,
+                                                tipo, categoria, ano, mes, use_cache, colunas) -> pd.DataFrame:
+        cache_key = f"estornos_{data_inicio}_{data_fim}_{unidade}_{squad}_{tipo}_{categoria}_{ano}_{mes}_{colunas}"
+        query = self._filtrar_estornos_cancelamentos(
+            tabela.select(colunas), data_inicio, data_fim, unidade, squad, tipo, categoria, ano, mes
+        )
+        return await self._consultar(
+            'estornos_cancelamentos', cache_key, query, self._preparar_estornos_cancelamentos_df, use_cache
+        )
+    
+    def _filtrar_estornos_cancelamentos(self, query, data_inicio, data_fim, unidade, squad,
+                                        tipo, categoria, ano, mes):
+        """Aplica os filtros de estornos_cancelamento em um query builder (sync ou async)."""
+        # Predicado de data sempre (partition pruning)
+        inicio_periodo, fim_periodo = self._periodo_ano_mes(ano, mes)
+        data_inicio = data_inicio or inicio_periodo
+        data_fim = data_fim or fim_periodo
         
-        # Aplica filtros
         if data_inicio:
-            query = query.gte('data', data_inicio.isoformat())
+            query = query.gte('data', data_inicio)
         if data_fim:
-            query = query.lte('data', data_fim.isoformat())
+            query = query.lte('data', data_fim)
         if unidade:
             query = query.eq('unidade', unidade)
         if squad:
@@ -155,34 +223,25 @@ class DataService:
             query = query.eq('mes', mes)
             
         # Ordena por data
-        query = query.order('data', desc=True)
-        
-        # Executa query
-        result = query.execute()
-        
-        # Converte para DataFrame
-        df = pd.DataFrame(result.data)
-        
+        return query.order('data', desc=True)
+    
+    def _preparar_estornos_cancelamentos_df(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converte os tipos de dados do DataFrame de estornos_cancelamento."""
         if not df.empty:
-            # Converte tipos de dados
-            df['data'] = pd.to_datetime(df['data'])
-            df['ano'] = pd.to_numeric(df['ano'], errors='coerce')
-            df['quantidade'] = pd.to_numeric(df['quantidade'], errors='coerce')
-            df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
+            # Seleções estreitas trazem só parte das colunas
+            if 'data' in df:
+                df['data'] = pd.to_datetime(df['data'])
+            for coluna in ('ano', 'quantidade', 'valor'):
+                if coluna in df:
+                    df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
             
             # Converte mes para número se estiver como string
-            if df['mes'].dtype == 'object':
+            if 'mes' in df and df['mes'].dtype == 'object':
                 mes_map = {'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
                           'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12}
                 df['mes_num'] = df['mes'].map(mes_map)
-            else:
+            elif 'mes' in df:
                 df['mes_num'] = df['mes']
-                
-        # Atualiza cache
-        if use_cache:
-            self._cache[cache_key] = df.copy()
-            self._last_cache_update[cache_key] = datetime.now()
-            
         return df
     
     # ========== Métodos de Análise ==========
@@ -197,7 +256,9 @@ class DataService:
         """
         Retorna o total de produtos vendidos (soma).
         """
-        df = self.get_produtos_vendidos_df(data_inicio, data_fim, unidade, squad, ano, mes)
+        df = self.get_produtos_vendidos_df(
+            data_inicio, data_fim, unidade, squad, ano, mes, colunas=COLUNAS_TOTAL_VENDAS
+        )
         
         if df.empty:
             return 0.0
@@ -217,7 +278,8 @@ class DataService:
         """
         df = self.get_estornos_cancelamentos_df(
             data_inicio, data_fim, unidade, squad, 
-            tipo='Cancelado', categoria=categoria, ano=ano, mes=mes
+            tipo='Cancelado', categoria=categoria, ano=ano, mes=mes,
+            colunas=COLUNAS_TOTAL_ESTORNOS
         )
         
         if df.empty:
@@ -238,7 +300,8 @@ class DataService:
         """
         df = self.get_estornos_cancelamentos_df(
             data_inicio, data_fim, unidade, squad, 
-            tipo='Estornado', categoria=categoria, ano=ano, mes=mes
+            tipo='Estornado', categoria=categoria, ano=ano, mes=mes,
+            colunas=COLUNAS_TOTAL_ESTORNOS
         )
         
         if df.empty:
@@ -322,7 +385,15 @@ class DataService:
                              mes: Optional[int] = None) -> Dict[str, Any]:
         """
         Retorna resumo completo para o dashboard.
+        
+        Quando há backend assíncrono disponível, vendas, cancelamentos e estornos
+        são buscados em paralelo (ver get_dashboard_summary_async).
         """
+        if async_db.disponivel:
+            return async_db.run(self.get_dashboard_summary_async(
+                data_inicio, data_fim, unidade, squad, categoria, ano, mes
+            ))
+        
         produtos_vendidos = self.get_total_produtos_vendidos(
             data_inicio, data_fim, unidade, squad, ano, mes
         )
@@ -346,6 +417,51 @@ class DataService:
             )
         }
         
+    async def get_dashboard_summary_async(self,
+                                          data_inicio: Optional[date] = None,
+                                          data_fim: Optional[date] = None,
+                                          unidade: Optional[str] = None,
+                                          squad: Optional[str] = None,
+                                          categoria: Optional[str] = None,
+                                          ano: Optional[int] = None,
+                                          mes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Retorna resumo completo para o dashboard buscando as três fontes em paralelo.
+        """
+        df_vendas, df_cancelados, df_estornados = await async_db.gather(
+            self.get_produtos_vendidos_df_async(
+                data_inicio, data_fim, unidade, squad, ano, mes, colunas=COLUNAS_TOTAL_VENDAS
+            ),
+            self.get_estornos_cancelamentos_df_async(
+                data_inicio, data_fim, unidade, squad,
+                tipo='Cancelado', categoria=categoria, ano=ano, mes=mes,
+                colunas=COLUNAS_TOTAL_ESTORNOS
+            ),
+            self.get_estornos_cancelamentos_df_async(
+                data_inicio, data_fim, unidade, squad,
+                tipo='Estornado', categoria=categoria, ano=ano, mes=mes,
+                colunas=COLUNAS_TOTAL_ESTORNOS
+            )
+        )
+        
+        produtos_vendidos = 0.0 if df_vendas.empty else float(df_vendas['produtos_vendidos'].sum())
+        cancelamentos = 0.0 if df_cancelados.empty else float(df_cancelados['valor'].sum())
+        estornos = 0.0 if df_estornados.empty else float(df_estornados['valor'].sum())
+        
+        def indice(valor: float) -> float:
+            if produtos_vendidos == 0:
+                return 0.0
+            return round((valor / produtos_vendidos) * 100, 2)
+        
+        return {
+            'produtos_vendidos': produtos_vendidos,
+            'cancelamentos': cancelamentos,
+            'estornos': estornos,
+            'estornos_cancelamentos': cancelamentos + estornos,
+            'indice_cancelamento': indice(cancelamentos),
+            'indice_estorno': indice(estornos)
+        }
+        
     def get_resumo_estornos(self,
                            data_inicio: Optional[date] = None,
                            data_fim: Optional[date] = None) -> Dict[str, Any]:
@@ -473,6 +589,35 @@ class DataService:
         
     # ========== Métodos Auxiliares ==========
     
+    async def _consultar(self, origem: str, cache_key: str, query,
+                         preparar: Callable[[pd.DataFrame], pd.DataFrame],
+                         use_cache: bool) -> pd.DataFrame:
+        """Cache, execução e resposta degradada comuns às consultas sync e async.
+        
+        ``query.execute()`` pode retornar o resultado (cliente síncrono) ou uma
+        corrotina (AsyncQuery). Com prazo esgotado, retorna os dados expirados do
+        cache, se houver.
+        """
+        if use_cache and self._is_cache_valid(cache_key):
+            self.logger.info(f"Retornando dados de {origem} do cache")
+            return self._cache[cache_key].copy()
+        
+        self.logger.info(f"Buscando dados de {origem} do banco")
+        try:
+            result = query.execute()
+            if inspect.isawaitable(result):
+                result = await result
+        except DeadlineExceeded:
+            if cache_key not in self._cache:
+                raise
+            self.logger.warning("Prazo esgotado; retornando dados expirados do cache")
+            return self._cache[cache_key].copy()
+        
+        df = preparar(pd.DataFrame(result.data))
+        if use_cache:
+            self._atualizar_cache(cache_key, df)
+        return df
+    
     def _is_cache_valid(self, cache_key: str) -> bool:
         """Verifica se o cache ainda é válido."""
         if cache_key not in self._cache:
@@ -488,6 +633,46 @@ class DataService:
             
         return True
         
+    @staticmethod
+    def _periodo_ano_mes(ano: Optional[int], mes: Optional[int],
+                         margem_dias: int = 0) -> Tuple[date, date]:
+        """Converte os filtros ano/mês em um intervalo de datas.
+        
+        Sem ano, usa a janela padrão (QUERY_DEFAULT_WINDOW_YEARS anos até o fim
+        do ano atual), para que a consulta nunca percorra todas as partições.
+        """
+        if ano:
+            ano = int(ano)
+            if mes and str(mes).isdigit():
+                inicio = date(ano, int(mes), 1)
+                fim = (inicio + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            else:
+                inicio, fim = date(ano, 1, 1), date(ano, 12, 31)
+        else:
+            atual = date.today().year
+            inicio = date(atual - max(Config.QUERY_DEFAULT_WINDOW_YEARS, 1) + 1, 1, 1)
+            fim = date(atual, 12, 31)
+        
+        margem = timedelta(days=margem_dias)
+        return inicio - margem, fim + margem
+    
+    def _na_janela(self, query, tabela: str):
+        """Limita uma consulta de catálogo à janela padrão pela coluna de partição."""
+        margem = 6 if tabela == 'produtos_vendidos' else 0
+        inicio, fim = self._periodo_ano_mes(None, None, margem_dias=margem)
+        coluna = COLUNAS_PARTICAO[tabela]
+        return query.gte(coluna, inicio).lte(coluna, fim)
+    
+    def _valores_catalogo(self, tabela: str, coluna: str) -> set:
+        """Valores distintos de uma coluna de filtro na janela padrão."""
+        query = self._na_janela(db.supabase.table(tabela).select(coluna), tabela).execute()
+        return set([item[coluna] for item in query.data if item.get(coluna)])
+        
+    def _atualizar_cache(self, cache_key: str, df: pd.DataFrame):
+        """Armazena uma cópia do DataFrame no cache."""
+        self._cache[cache_key] = df.copy()
+        self._last_cache_update[cache_key] = datetime.now()
+        
     def clear_cache(self):
         """Limpa todo o cache."""
         self._cache.clear()
@@ -496,13 +681,9 @@ class DataService:
         
     def get_unidades_disponiveis(self) -> List[str]:
         """Retorna lista de unidades disponíveis."""
-        # Busca unidades em produtos vendidos
-        query = db.supabase.table('produtos_vendidos').select('unidade').execute()
-        unidades_vendas = set([item['unidade'] for item in query.data if item.get('unidade')])
-        
-        # Busca unidades em estornos
-        query = db.supabase.table('estornos_cancelamento').select('unidade').execute()
-        unidades_estornos = set([item['unidade'] for item in query.data if item.get('unidade')])
+        # Busca unidades em produtos vendidos e em estornos (na janela padrão)
+        unidades_vendas = self._valores_catalogo('produtos_vendidos', 'unidade')
+        unidades_estornos = self._valores_catalogo('estornos_cancelamento', 'unidade')
         
         # Combina e ordena
         todas_unidades = sorted(list(unidades_vendas.union(unidades_estornos)))
@@ -511,13 +692,9 @@ class DataService:
     
     def get_squads_disponiveis(self) -> List[str]:
         """Retorna lista de squads disponíveis."""
-        # Busca squads em produtos vendidos
-        query = db.supabase.table('produtos_vendidos').select('squad').execute()
-        squads_vendas = set([item['squad'] for item in query.data if item.get('squad')])
-        
-        # Busca squads em estornos
-        query = db.supabase.table('estornos_cancelamento').select('squad').execute()
-        squads_estornos = set([item['squad'] for item in query.data if item.get('squad')])
+        # Busca squads em produtos vendidos e em estornos (na janela padrão)
+        squads_vendas = self._valores_catalogo('produtos_vendidos', 'squad')
+        squads_estornos = self._valores_catalogo('estornos_cancelamento', 'squad')
         
         # Combina e ordena
         todos_squads = sorted(list(squads_vendas.union(squads_estornos)))
@@ -527,26 +704,63 @@ class DataService:
     def get_categorias_disponiveis(self) -> List[str]:
         """Retorna lista de categorias disponíveis."""
         # Categorias estão apenas na tabela estornos_cancelamento
-        query = db.supabase.table('estornos_cancelamento').select('categoria').execute()
-        categorias = set([item['categoria'] for item in query.data if item.get('categoria')])
+        categorias = self._valores_catalogo('estornos_cancelamento', 'categoria')
         
         return sorted(list(categorias))
     
     def get_anos_disponiveis(self) -> List[int]:
         """Retorna lista de anos disponíveis."""
-        # Busca anos em produtos vendidos
-        query = db.supabase.table('produtos_vendidos').select('ano').execute()
-        anos_vendas = set([item['ano'] for item in query.data if item.get('ano')])
-        
-        # Busca anos em estornos
-        query = db.supabase.table('estornos_cancelamento').select('ano').execute()
-        anos_estornos = set([item['ano'] for item in query.data if item.get('ano')])
+        # Busca anos em produtos vendidos e em estornos (na janela padrão)
+        anos_vendas = self._valores_catalogo('produtos_vendidos', 'ano')
+        anos_estornos = self._valores_catalogo('estornos_cancelamento', 'ano')
         
         # Combina e ordena
         todos_anos = sorted(list(anos_vendas.union(anos_estornos)), reverse=True)
         
         return todos_anos
         
+    def get_filtros_disponiveis(self) -> Dict[str, List]:
+        """
+        Retorna anos, unidades, squads e categorias disponíveis para os filtros.
+        
+        Usa consultas paralelas quando há backend assíncrono disponível.
+        """
+        if async_db.disponivel:
+            return async_db.run(self.get_filtros_disponiveis_async())
+        
+        return {
+            'anos': self.get_anos_disponiveis(),
+            'unidades': self.get_unidades_disponiveis(),
+            'squads': self.get_squads_disponiveis(),
+            'categorias': self.get_categorias_disponiveis()
+        }
+    
+    async def get_filtros_disponiveis_async(self) -> Dict[str, List]:
+        """Busca os catálogos de filtros com todas as consultas em paralelo."""
+        async def valores(tabela: str, coluna: str) -> set:
+            result = await self._na_janela(async_db.table(tabela).select(coluna), tabela).execute()
+            return set([item[coluna] for item in result.data if item.get(coluna)])
+        
+        (anos_vendas, anos_estornos,
+         unidades_vendas, unidades_estornos,
+         squads_vendas, squads_estornos,
+         categorias) = await async_db.gather(
+            valores('produtos_vendidos', 'ano'),
+            valores('estornos_cancelamento', 'ano'),
+            valores('produtos_vendidos', 'unidade'),
+            valores('estornos_cancelamento', 'unidade'),
+            valores('produtos_vendidos', 'squad'),
+            valores('estornos_cancelamento', 'squad'),
+            valores('estornos_cancelamento', 'categoria')
+        )
+        
+        return {
+            'anos': sorted(list(anos_vendas.union(anos_estornos)), reverse=True),
+            'unidades': sorted(list(unidades_vendas.union(unidades_estornos))),
+            'squads': sorted(list(squads_vendas.union(squads_estornos))),
+            'categorias': sorted(list(categorias))
+        }
+        
     def get_periodo_dados(self) -> Tuple[date, date]:
         """Retorna o período de dados disponível (data mínima e máxima)."""
         # Produtos vendidos
@@ -578,5 +792,15 @@ class DataService:
         return data_inicio, data_fim
 
 
+def _sem_event_loop(coro):
+    """Executa até o fim uma corrotina que não suspende (consulta com cliente síncrono)."""
+    try:
+        coro.send(None)
+    except StopIteration as fim:
+        return fim.value
+    coro.close()
+    raise RuntimeError("Consulta síncrona não pode aguardar operações assíncronas")
+
+
 # Instância global do serviço
 data_service = DataService()
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Coleta de erros por linha durante importações.
+
+Os erros ficam em listas por coluna (linha, conteúdo, mensagem) e são gravados em
+``importacoes_erros`` em lotes, em vez de um insert por erro. O conteúdo bruto é
+truncado e, acima de um limite, os erros só são contados. O resumo traz o total,
+as mensagens mais frequentes e uma amostra aleatória (reservoir sampling) das
+linhas com erro.
+"""
+
+import logging
+import random
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from config.settings import Config
+from models.database import db
+
+
+class ColetorErrosImportacao:
+    """Acumula erros de linha de uma importação e grava em lotes."""
+
+    def __init__(self,
+                 importacao_id: str,
+                 max_conteudo: Optional[int] = None,
+                 tamanho_lote: Optional[int] = None,
+                 max_gravados: Optional[int] = None,
+                 tamanho_amostra: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.importacao_id = importacao_id
+        self.max_conteudo = max_conteudo or Config.IMPORT_ERROR_MAX_CONTENT
+        self.tamanho_lote = tamanho_lote or Config.IMPORT_ERROR_BATCH
+        self.max_gravados = Config.IMPORT_ERROR_MAX_STORED if max_gravados is None else max_gravados
+        self.tamanho_amostra = tamanho_amostra or Config.IMPORT_ERROR_SAMPLE
+
+        # Pendentes de gravação, em colunas
+        self._linhas: List[Optional[int]] = []
+        self._conteudos: List[Optional[str]] = []
+        self._mensagens: List[str] = []
+
+        self.total = 0
+        self.gravados = 0
+        self.por_mensagem: Counter = Counter()
+        self._amostra: List[Dict[str, Any]] = []
+        self._aleatorio = random.Random(0)
+
+    def retomar(self, total: int):
+        """Parte da contagem de uma importação retomada (erros já gravados antes)."""
+        self.total = total
+        self.gravados = min(total, self.max_gravados)
+
+    def adicionar(self, linha: Optional[int], conteudo: Optional[str], mensagem: str):
+        """Registra um erro de linha."""
+        self.adicionar_lote([linha], [conteudo], [mensagem])
+
+    def adicionar_lote(self,
+                       linhas: Iterable[Optional[int]],
+                       conteudos: Iterable[Optional[str]],
+                       mensagens: Iterable[str]):
+        """Registra vários erros de uma vez (ex.: as linhas inválidas de um bloco)."""
+        for linha, conteudo, mensagem in zip(linhas, conteudos, mensagens):
+            self.total += 1
+            self.por_mensagem[self._tipo(mensagem)] += 1
+            linha = int(linha) if linha is not None else None
+            conteudo = self._truncar(conteudo)
+
+            # Reservoir sampling: cada erro tem a mesma chance de estar na amostra
+            erro = {'linha': linha, 'conteudo': conteudo, 'mensagem': mensagem}
+            if len(self._amostra) < self.tamanho_amostra:
+                self._amostra.append(erro)
+            else:
+                posicao = self._aleatorio.randrange(self.total)
+                if posicao < self.tamanho_amostra:
+                    self._amostra[posicao] = erro
+
+            if self.gravados + len(self._linhas) < self.max_gravados:
+                self._linhas.append(linha)
+                self._conteudos.append(conteudo)
+                self._mensagens.append(mensagem)
+
+        if len(self._linhas) >= self.tamanho_lote:
+            self.flush()
+
+    def flush(self) -> int:
+        """Grava os erros pendentes em importacoes_erros; retorna quantos gravou."""
+        if not self._linhas:
+            return 0
+        registros = [
+            {
+                'importacao_id': self.importacao_id,
+                'linha_numero': linha,
+                'linha_conteudo': conteudo,
+                'erro_mensagem': mensagem
+            }
+            for linha, conteudo, mensagem in zip(self._linhas, self._conteudos, self._mensagens)
+        ]
+        db.create_erros_importacao(registros)
+        self.gravados += len(registros)
+        self._linhas, self._conteudos, self._mensagens = [], [], []
+        return len(registros)
+
+    def resumo(self, max_mensagens: int = 10) -> Dict[str, Any]:
+        """Total, mensagens mais frequentes e amostra das linhas com erro."""
+        return {
+            'total': self.total,
+            'gravados': self.gravados + len(self._linhas),
+            'por_mensagem': dict(self.por_mensagem.most_common(max_mensagens)),
+            'amostra': sorted(self._amostra, key=lambda e: (e['linha'] is None, e['linha'] or 0))
+        }
+
+    def descricao(self) -> Optional[str]:
+        """Resumo em texto para mensagem_erro (None sem erros)."""
+        if not self.total:
+            return None
+        mensagem, quantidade = self.por_mensagem.most_common(1)[0]
+        return f"{self.total} linha(s) com erro; mais frequente: {mensagem} ({quantidade})"
+
+    def _truncar(self, conteudo: Optional[str]) -> Optional[str]:
+        if conteudo is None or len(conteudo) <= self.max_conteudo:
+            return conteudo
+        return conteudo[:self.max_conteudo] + '…'
+
+    @staticmethod
+    def _tipo(mensagem: str) -> str:
+        """Agrupa mensagens pelo texto antes do valor (``"Valor inválido em x: '...'"``)."""
+        return mensagem.split(': ', 1)[0]
@@ -0,0 +1,128 @@
+"""
+Execução de importações em segundo plano.
+
+O upload só salva o arquivo e enfileira o job; um pool limitado de threads faz a
+importação, e o progresso (etapa, linhas, vazão) fica disponível para o endpoint
+``/api/importacoes/<id>``. O estado em memória é por processo; o registro em
+``importacoes_arquivos`` continua sendo a fonte de verdade do status.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import Config
+
+
+class FilaImportacaoCheia(Exception):
+    """Há importações demais aguardando ou em execução."""
+
+
+# Etapas finais (o job não ocupa mais o pool)
+ETAPAS_FINAIS = ('concluido', 'erro')
+
+
+class ImportJobs:
+    """Pool limitado de workers de importação com acompanhamento de progresso."""
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 max_pendentes: Optional[int] = None,
+                 retencao: float = 3600):
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or Config.IMPORT_WORKERS
+        self.max_pendentes = max_pendentes or Config.IMPORT_MAX_PENDING
+        self.retencao = retencao
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def submeter(self, importacao_id: str, funcao: Callable, *args, **kwargs):
+        """Enfileira ``funcao(*args, progresso=..., **kwargs)`` para a importação.
+
+        Levanta FilaImportacaoCheia quando o limite de jobs ativos foi atingido.
+        """
+        with self._lock:
+            self._limpar_antigos()
+            ativos = sum(1 for job in self._jobs.values() if job['etapa'] not in ETAPAS_FINAIS)
+            if ativos >= self.max_pendentes:
+                raise FilaImportacaoCheia(f"{ativos} importações em andamento; tente novamente em instantes")
+
+            self._jobs[str(importacao_id)] = {
+                'etapa': 'na_fila',
+                'linhas_processadas': 0,
+                'total_linhas': None,
+                'criado_em': time.time(),
+                'iniciado_em': None,
+                'finalizado_em': None,
+                'erro': None,
+                'resumo_erros': None,
+            }
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='import-job'
+                )
+
+        self._executor.submit(self._executar, str(importacao_id), funcao, args, kwargs)
+
+    def _executar(self, importacao_id: str, funcao: Callable, args: tuple, kwargs: dict):
+        self._atualizar(importacao_id, etapa='iniciando', iniciado_em=time.time())
+
+        def progresso(etapa: str, linhas: int, total: Optional[int]):
+            self._atualizar(importacao_id, etapa=etapa, linhas_processadas=linhas, total_linhas=total)
+
+        try:
+            resultado = funcao(*args, progresso=progresso, **kwargs)
+        except Exception as e:
+            self.logger.error(f"Job de importação {importacao_id} falhou: {e}")
+            self._atualizar(importacao_id, etapa='erro', erro=str(e), finalizado_em=time.time())
+            return
+
+        total = (resultado or {}).get('total_registros')
+        campos = {'etapa': 'concluido', 'finalizado_em': time.time(),
+                  'resumo_erros': (resultado or {}).get('erros')}
+        if total is not None:
+            campos.update(linhas_processadas=total, total_linhas=total)
+        self._atualizar(importacao_id, **campos)
+
+    def _atualizar(self, importacao_id: str, **campos):
+        with self._lock:
+            job = self._jobs.get(importacao_id)
+            if job is not None:
+                job.update(campos)
+
+    def progresso(self, importacao_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna o progresso do job neste processo (None se desconhecido)."""
+        with self._lock:
+            job = self._jobs.get(str(importacao_id))
+            if job is None:
+                return None
+            job = dict(job)
+
+        inicio = job['iniciado_em']
+        fim = job['finalizado_em'] or time.time()
+        decorrido = (fim - inicio) if inicio else 0.0
+        return {
+            'etapa': job['etapa'],
+            'linhas_processadas': job['linhas_processadas'],
+            'total_linhas': job['total_linhas'],
+            'percentual': round(job['linhas_processadas'] / job['total_linhas'] * 100, 1)
+            if job['total_linhas'] else None,
+            'decorrido_s': round(decorrido, 1),
+            'linhas_por_segundo': round(job['linhas_processadas'] / decorrido, 1) if decorrido > 0 else None,
+            'erro': job['erro'],
+            'resumo_erros': job['resumo_erros'],
+        }
+
+    def _limpar_antigos(self):
+        """Descarta jobs finalizados há mais tempo que a retenção (chamar com _lock)."""
+        limite = time.time() - self.retencao
+        for importacao_id in [i for i, job in self._jobs.items()
+                              if job['finalizado_em'] and job['finalizado_em'] < limite]:
+            del self._jobs[importacao_id]
+
+
+# Instância global
+import_jobs = ImportJobs()
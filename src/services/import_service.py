@@ -0,0 +1,542 @@
+"""
+Importação de arquivos de produtos vendidos.
+
+Leitura, limpeza e gravação que antes rodavam dentro do request de upload. É
+executado em segundo plano pelos workers de services/import_jobs.py.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import Config
+from data.converters.numbers import parse_br_numbers
+from models.database import db
+from services.import_errors import ColetorErrosImportacao
+
+
+# Colunas do CSV exportado pelo sistema de vendas (após as 4 linhas de cabeçalho)
+COLUNAS_CSV = ['sku', 'nome', 'categoria', 'operacao', 'montavel',
+               'quantidade', 'valor_unitario', 'subtotal', 'descontos', 'valor_total']
+
+COLUNAS_MONETARIAS = ['valor_unitario', 'subtotal', 'descontos', 'valor_total']
+
+COLUNAS_TEXTO = ['sku', 'nome', 'categoria', 'operacao']
+
+# Callback de progresso: (etapa, linhas processadas, total de linhas ou None)
+Progresso = Callable[[str, int, Optional[int]], None]
+
+
+class ImportService:
+    """Importa arquivos CSV de produtos vendidos para o banco."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def preparar_produtos_vendidos(self, df: pd.DataFrame,
+                                   periodo_inicio: date,
+                                   periodo_fim: date,
+                                   erros: Optional[ColetorErrosImportacao] = None) -> pd.DataFrame:
+        """Limpa e converte o DataFrame lido do CSV para as colunas da tabela.
+
+        Linhas inválidas (valores que não são número, quantidade ou total ausente)
+        vão para o coletor ``erros`` e saem do resultado; sem coletor, a primeira
+        linha inválida interrompe com ValueError.
+        """
+        df.columns = COLUNAS_CSV
+
+        # Remover linhas vazias
+        df = df.dropna(subset=['nome'])
+        brutos = df
+
+        # Converter tipos
+        df = df.assign(montavel=df['montavel'] == 'VERDADEIRO')
+        mensagens = pd.Series(None, index=df.index, dtype=object)
+
+        # Coluna INTEGER: valores com fração são inválidos (e "2.0" não entra no insert)
+        quantidade = parse_br_numbers(df['quantidade'])
+        fracionaria = (quantidade.values % 1 != 0) & quantidade.values.notna()
+        df['quantidade'] = quantidade.values.mask(fracionaria).astype('Int64')
+        mensagens = mensagens.mask((quantidade.errors | fracionaria) & mensagens.isna(),
+                                   'Quantidade inválida: ' + brutos['quantidade'].astype(str))
+
+        # Valores monetários ("R$ 1.234,56") em uma passada vetorizada por coluna
+        for col in COLUNAS_MONETARIAS:
+            numeros = parse_br_numbers(df[col])
+            df[col] = numeros.values
+            mensagens = mensagens.mask(numeros.errors & mensagens.isna(),
+                                       f'Valor inválido em {col}: ' + brutos[col].astype(str))
+
+        # Obrigatórios na tabela (NOT NULL)
+        for col in ('quantidade', 'valor_total'):
+            mensagens = mensagens.mask(df[col].isna() & mensagens.isna(), f'{col} ausente')
+
+        invalidas = mensagens.notna()
+        if invalidas.any():
+            if erros is None:
+                primeira = invalidas.idxmax()
+                raise ValueError(f"{int(invalidas.sum())} linha(s) inválida(s); linha "
+                                 f"{self.numero_linha(primeira)}: {mensagens[primeira]}")
+            conteudos = brutos.loc[invalidas, COLUNAS_CSV].fillna('').astype(str).agg(';'.join, axis=1)
+            erros.adicionar_lote(
+                (self.numero_linha(i) for i in conteudos.index), conteudos, mensagens[invalidas]
+            )
+            df = df[~invalidas]
+
+        df['data_venda'] = datetime.now().date()
+        df['periodo_inicio'] = periodo_inicio
+        df['periodo_fim'] = periodo_fim
+        # Chave de partição da tabela (migration 002)
+        df['semana_domingo'] = self.semana_domingo(periodo_fim)
+        df['hash_linha'] = self.hash_linhas(df)
+        return df
+
+    @staticmethod
+    def semana_domingo(dia: date) -> date:
+        """Domingo que fecha a semana de ``dia`` (o próprio dia, se for domingo)."""
+        return dia + timedelta(days=6 - dia.weekday())
+
+    @staticmethod
+    def numero_linha(indice: int) -> int:
+        """Linha no arquivo (1-based) de um índice do read_csv: 4 de cabeçalho do export + nomes."""
+        return int(indice) + 6
+
+    @staticmethod
+    def hash_linhas(df: pd.DataFrame) -> np.ndarray:
+        """Hash de cada linha normalizada (sem data_venda, que muda a cada importação).
+
+        Os tipos são fixados (texto sem espaços nas pontas, números em float64) para
+        que a mesma linha tenha o mesmo hash independente do bloco em que foi lida.
+        O uint64 é gravado como BIGINT (mesmos bits em int64).
+        """
+        normalizado = pd.DataFrame({
+            **{col: df[col].fillna('').astype(str).str.strip() for col in COLUNAS_TEXTO},
+            'montavel': df['montavel'].astype(bool),
+            **{col: df[col].astype('float64') for col in ['quantidade', *COLUNAS_MONETARIAS]},
+            'periodo_inicio': df['periodo_inicio'].astype(str),
+            'periodo_fim': df['periodo_fim'].astype(str),
+        })
+        return pd.util.hash_pandas_object(normalizado, index=False).to_numpy().view(np.int64)
+
+    @staticmethod
+    def hash_arquivo(caminho: str) -> str:
+        """SHA-256 do arquivo, lido em blocos."""
+        sha = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(bloco)
+        return sha.hexdigest()
+
+    @staticmethod
+    def diff_hashes(hashes_arquivo: np.ndarray, existentes: pd.DataFrame) -> Tuple[np.ndarray, List[Any]]:
+        """Diferença de multiconjuntos entre o arquivo e as linhas do período.
+
+        Linhas repetidas contam uma a uma (a k-ésima ocorrência de um hash no arquivo
+        casa com a k-ésima no banco). Retorna as posições do arquivo a inserir
+        (ordenadas) e os ids a remover; linhas sem hash_linha sempre saem.
+        """
+        sem_hash = existentes['hash_linha'].isna()
+        banco = existentes[~sem_hash].astype({'hash_linha': np.int64})
+        banco = banco.assign(ocorrencia=banco.groupby('hash_linha').cumcount())
+
+        arquivo = pd.DataFrame({'hash_linha': hashes_arquivo, 'posicao': np.arange(len(hashes_arquivo))})
+        arquivo['ocorrencia'] = arquivo.groupby('hash_linha').cumcount()
+
+        cruzado = arquivo.merge(banco, on=['hash_linha', 'ocorrencia'], how='outer', indicator=True)
+        inserir = np.sort(cruzado.loc[cruzado['_merge'] == 'left_only', 'posicao'].to_numpy(dtype=np.int64))
+        remover = cruzado.loc[cruzado['_merge'] == 'right_only', 'id'].tolist()
+        return inserir, existentes.loc[sem_hash, 'id'].tolist() + remover
+
+    def ler_produtos_vendidos(self, caminho: str,
+                              periodo_inicio: date,
+                              periodo_fim: date,
+                              chunk_size: Optional[int] = None,
+                              erros: Optional[ColetorErrosImportacao] = None) -> Iterator[pd.DataFrame]:
+        """Lê o CSV em blocos de ``chunk_size`` linhas, já limpos e convertidos.
+
+        Só um bloco fica em memória por vez, independente do tamanho do arquivo.
+        """
+        for bloco in self.ler_blocos_csv(caminho, chunk_size):
+            yield self.preparar_produtos_vendidos(bloco, periodo_inicio, periodo_fim, erros)
+
+    @staticmethod
+    def ler_blocos_csv(caminho: str,
+                       chunk_size: Optional[int] = None,
+                       linha_inicial: int = 0) -> Iterator[pd.DataFrame]:
+        """Blocos brutos do CSV (texto), pulando as ``linha_inicial`` primeiras linhas de dados.
+
+        As linhas puladas são contadas já lidas pelo parser, como em
+        linhas_confirmadas: linhas em branco e quebras de linha dentro de campos
+        entre aspas não deslocam a retomada. O índice continua contando a partir
+        de ``linha_inicial``.
+        """
+        chunk_size = chunk_size or Config.IMPORT_CHUNK_SIZE
+        # dtype=str: mantém os tipos iguais entre blocos (um bloco sem valores
+        # monetários não vira float); 4 linhas de cabeçalho do export antes dos nomes
+        leitor = pd.read_csv(caminho, sep=';', encoding='latin-1', skiprows=4,
+                             dtype=str, chunksize=chunk_size)
+        pular = linha_inicial
+        for bloco in leitor:
+            if pular:
+                # Checkpoints caem no fim de um bloco: em geral, blocos inteiros são pulados
+                descartadas = min(pular, len(bloco))
+                pular -= descartadas
+                bloco = bloco.iloc[descartadas:]
+                if bloco.empty:
+                    continue
+            yield bloco
+
+    @staticmethod
+    def estimar_linhas(caminho: str) -> int:
+        """Conta as linhas de dados do CSV sem carregá-lo (estimativa para progresso)."""
+        linhas = 0
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                linhas += bloco.count(b'\n')
+        # 4 linhas de cabeçalho do export + linha de nomes das colunas
+        return max(linhas - 5, 0)
+
+    def importar_produtos_vendidos(self,
+                                   caminho: str,
+                                   importacao_id: str,
+                                   periodo_inicio: date,
+                                   periodo_fim: date,
+                                   modo: str = 'adicionar',
+                                   progresso: Optional[Progresso] = None,
+                                   retomar: bool = False) -> Dict[str, Any]:
+        """Importa o CSV salvo em ``caminho`` em blocos e atualiza o registro da importação.
+
+        Em modo 'adicionar', cada bloco é gravado junto com o checkpoint da importação
+        (ultimo_bloco, linhas_confirmadas) em uma transação; com ``retomar``, a leitura
+        recomeça depois das linhas já confirmadas. Em modo 'substituir', os blocos
+        vão para a staging e o período é trocado no fim, em uma transação (ver
+        db.substituir_periodo_produtos_vendidos). Em modo 'incremental', o período
+        passa a refletir o arquivo, mas só a diferença é gravada (ver
+        _importar_incremental).
+        """
+        progresso = progresso or (lambda etapa, linhas, total: None)
+        db.update_importacao(importacao_id, {'status': 'processando'})
+
+        lidas = 0
+        importadas = 0
+        result: Dict[str, Any] = {}
+        # Linhas inválidas não interrompem a importação: vão para importacoes_erros
+        erros = ColetorErrosImportacao(importacao_id)
+        try:
+            progresso('lendo', 0, None)
+            estimativa = self.estimar_linhas(caminho)
+            db.update_importacao(importacao_id, {'total_registros': estimativa})
+            if retomar and modo != 'adicionar':
+                # Gravação atômica: a tentativa anterior não deixou linhas, só erros
+                db.delete_erros_importacao(importacao_id)
+
+            if modo == 'incremental':
+                result, lidas = self._importar_incremental(
+                    caminho, periodo_inicio, periodo_fim, estimativa, progresso, erros
+                )
+                if not result.get('success', True):
+                    raise Exception(f"{len(result.get('failed_chunks', []))} lote(s) falharam na gravação")
+                importadas = result['inseridos']
+            elif modo == 'substituir':
+                def blocos_com_progresso():
+                    nonlocal lidas
+                    for bloco in self.ler_produtos_vendidos(caminho, periodo_inicio, periodo_fim, erros=erros):
+                        lidas += len(bloco)
+                        progresso('gravando', lidas, max(estimativa, lidas))
+                        yield bloco
+
+                result = db.substituir_periodo_produtos_vendidos(
+                    blocos_com_progresso(), periodo_inicio, periodo_fim
+                )
+                if not result.get('success', True):
+                    raise Exception(f"{len(result.get('failed_chunks', []))} lote(s) falharam na gravação")
+                importadas = result.get('count', lidas)
+            else:
+                result, lidas, importadas = self._importar_com_checkpoint(
+                    caminho, importacao_id, periodo_inicio, periodo_fim,
+                    estimativa, progresso, erros, retomar
+                )
+
+            erros.flush()
+            db.update_importacao(importacao_id, {
+                'status': 'concluido',
+                'total_registros': lidas + erros.total,
+                'registros_importados': importadas,
+                'registros_erro': erros.total,
+                'mensagem_erro': erros.descricao(),
+                'periodo_inicio': periodo_inicio.isoformat(),
+                'periodo_fim': periodo_fim.isoformat()
+            })
+        except Exception as e:
+            self.logger.error(f"Erro na importação {importacao_id}: {e}")
+            try:
+                erros.flush()
+            except Exception as falha:
+                self.logger.warning(f"Falha ao gravar erros da importação {importacao_id}: {falha}")
+            campos = {'status': 'erro', 'mensagem_erro': str(e)}
+            # No modo 'adicionar', os blocos anteriores à falha já estão gravados e as
+            # contagens vêm do checkpoint (gravado junto com cada bloco)
+            if modo != 'adicionar':
+                campos.update(registros_importados=importadas, registros_erro=erros.total)
+            db.update_importacao(importacao_id, campos)
+            raise
+
+        # Arquivo já gravado no banco: libera o disco
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+        return {**result, 'total_registros': lidas + erros.total, 'modo': modo, 'erros': erros.resumo()}
+
+    def _importar_com_checkpoint(self, caminho: str,
+                                 importacao_id: str,
+                                 periodo_inicio: date,
+                                 periodo_fim: date,
+                                 estimativa: int,
+                                 progresso: Progresso,
+                                 erros: ColetorErrosImportacao,
+                                 retomar: bool) -> Tuple[Dict[str, Any], int, int]:
+        """Modo 'adicionar': grava bloco a bloco, cada um com seu checkpoint.
+
+        Retomando, os erros registrados depois do checkpoint (do bloco que falhou)
+        são descartados e as linhas voltam a ser lidas a partir de linhas_confirmadas.
+        """
+        bloco, confirmadas, importadas = -1, 0, 0
+        if retomar:
+            importacao = db.get_importacao(importacao_id) or {}
+            if importacao.get('ultimo_bloco') is not None:
+                bloco = importacao['ultimo_bloco']
+                confirmadas = importacao.get('linhas_confirmadas') or 0
+                importadas = importacao.get('registros_importados') or 0
+                erros.retomar(importacao.get('registros_erro') or 0)
+            db.delete_erros_importacao(importacao_id, self.numero_linha(confirmadas))
+            self.logger.info(f"Retomando importação {importacao_id} após o bloco {bloco} "
+                             f"({confirmadas} linhas confirmadas)")
+
+        def preparados():
+            for bruto in self.ler_blocos_csv(caminho, linha_inicial=confirmadas):
+                dados = self.preparar_produtos_vendidos(bruto, periodo_inicio, periodo_fim, erros)
+                yield len(bruto), erros.total, dados
+
+        return self._gravar_blocos(importacao_id, preparados(), estimativa, progresso,
+                                   bloco, confirmadas, importadas)
+
+    def _gravar_blocos(self, importacao_id: str,
+                       blocos: Iterable[Tuple[int, int, pd.DataFrame]],
+                       estimativa: int,
+                       progresso: Progresso,
+                       bloco: int = -1,
+                       confirmadas: int = 0,
+                       importadas: int = 0) -> Tuple[Dict[str, Any], int, int]:
+        """Grava blocos (linhas brutas, erros acumulados, dados) com checkpoint a cada um."""
+        # Linhas válidas lidas: as já gravadas antes da retomada e as novas
+        lidas = importadas
+        progresso('gravando', confirmadas, max(estimativa, confirmadas))
+        for linhas_brutas, total_erros, dados in blocos:
+            confirmadas += linhas_brutas
+            lidas += len(dados)
+            bloco += 1
+            parcial = db.inserir_bloco_importacao(importacao_id, bloco, dados, {
+                'linhas_confirmadas': confirmadas,
+                'registros_erro': total_erros,
+                'total_registros': max(estimativa, lidas + total_erros)
+            })
+            importadas += parcial['count']
+            progresso('gravando', confirmadas, max(estimativa, confirmadas))
+
+        return {'success': True, 'count': importadas, 'blocos': bloco + 1}, lidas, importadas
+
+    def importar_varios(self,
+                        arquivos: List[Tuple[str, str]],
+                        periodo_inicio: date,
+                        periodo_fim: date,
+                        progresso: Optional[Progresso] = None,
+                        max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """Importa vários CSVs (``(caminho, importacao_id)``) do mesmo período em modo 'adicionar'.
+
+        A leitura e a conversão (CPU) de cada arquivo rodam em um pool de processos;
+        a gravação fica neste thread, um arquivo por vez, com o mesmo checkpoint por
+        bloco da importação simples. Os blocos preparados passam por arquivos
+        temporários (ver _preparar_arquivo), lidos e apagados um a um: a memória
+        fica em um bloco por processo, não na soma dos arquivos. Um arquivo com
+        falha fica com status 'erro' (e pode ser retomado) sem interromper os demais.
+        """
+        progresso = progresso or (lambda etapa, linhas, total: None)
+        max_workers = max_workers or Config.IMPORT_PROCESSES
+        estimativas = {importacao_id: self.estimar_linhas(caminho) for caminho, importacao_id in arquivos}
+        total = sum(estimativas.values())
+        for _, importacao_id in arquivos:
+            db.update_importacao(importacao_id, {'status': 'processando',
+                                                 'total_registros': estimativas[importacao_id]})
+
+        resultados: Dict[str, Any] = {}
+        gravadas = 0
+        progresso('lendo', 0, total)
+        # spawn: o processo web tem threads e conexões abertas, que não sobrevivem a um fork
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(arquivos)) or 1,
+                                 mp_context=contexto) as executor:
+            futuros = {
+                executor.submit(_preparar_arquivo, caminho, importacao_id,
+                                periodo_inicio, periodo_fim): (caminho, importacao_id)
+                for caminho, importacao_id in arquivos
+            }
+            for futuro in as_completed(futuros):
+                caminho, importacao_id = futuros.pop(futuro)
+                pasta, erros = None, None
+                try:
+                    pasta, blocos, erros = futuro.result()
+                    result, lidas, importadas = self._gravar_blocos(
+                        importacao_id, _ler_blocos_temporarios(blocos), estimativas[importacao_id],
+                        lambda etapa, linhas, _: progresso(etapa, gravadas + linhas, total)
+                    )
+                    erros.flush()
+                    db.update_importacao(importacao_id, {
+                        'status': 'concluido',
+                        'total_registros': lidas + erros.total,
+                        'registros_importados': importadas,
+                        'registros_erro': erros.total,
+                        'mensagem_erro': erros.descricao(),
+                        'periodo_inicio': periodo_inicio.isoformat(),
+                        'periodo_fim': periodo_fim.isoformat()
+                    })
+                    resultados[importacao_id] = {**result, 'total_registros': lidas + erros.total,
+                                                 'erros': erros.resumo()}
+                    os.remove(caminho)
+                except Exception as e:
+                    self.logger.error(f"Erro na importação {importacao_id} (lote): {e}")
+                    # Erros de linha coletados antes da falha (como na importação simples);
+                    # na retomada, os posteriores ao checkpoint são descartados
+                    if erros is not None:
+                        try:
+                            erros.flush()
+                        except Exception as falha:
+                            self.logger.warning(f"Falha ao gravar erros da importação {importacao_id}: {falha}")
+                    db.update_importacao(importacao_id, {'status': 'erro', 'mensagem_erro': str(e)})
+                    resultados[importacao_id] = {'success': False, 'erro': str(e)}
+                finally:
+                    if pasta:
+                        shutil.rmtree(pasta, ignore_errors=True)
+                gravadas += estimativas[importacao_id]
+                progresso('gravando', gravadas, total)
+
+        return {
+            'success': all(r.get('success') for r in resultados.values()),
+            'total_registros': sum(r.get('total_registros', 0) for r in resultados.values()),
+            'arquivos': resultados
+        }
+
+    def retomar_importacao(self, importacao_id: str,
+                           progresso: Optional[Progresso] = None) -> Dict[str, Any]:
+        """Retoma uma importação que terminou em erro, a partir do último bloco confirmado."""
+        importacao = db.get_importacao(importacao_id)
+        if not importacao:
+            raise ValueError(f"Importação {importacao_id} não encontrada")
+        return self.importar_produtos_vendidos(
+            self.caminho_upload(importacao_id), importacao_id,
+            self._data(importacao['periodo_inicio']), self._data(importacao['periodo_fim']),
+            modo=importacao.get('modo') or 'adicionar', progresso=progresso, retomar=True
+        )
+
+    @staticmethod
+    def caminho_upload(importacao_id: str) -> str:
+        """Arquivo salvo no upload (removido só quando a importação conclui)."""
+        return os.path.join(Config.UPLOAD_FOLDER, f"{importacao_id}.csv")
+
+    @staticmethod
+    def _data(valor: Any) -> date:
+        return valor if isinstance(valor, date) else date.fromisoformat(str(valor)[:10])
+
+    def _importar_incremental(self, caminho: str,
+                              periodo_inicio: date,
+                              periodo_fim: date,
+                              estimativa: int,
+                              progresso: Progresso,
+                              erros: Optional[ColetorErrosImportacao] = None) -> Tuple[Dict[str, Any], int]:
+        """Aplica só a diferença entre o arquivo e o período já gravado.
+
+        Lê o arquivo duas vezes: a primeira guarda só os hashes (8 bytes por linha)
+        e a segunda separa as linhas que faltam no banco. Correções pontuais num
+        export reenviado viram poucas inserções/remoções em vez de recarregar o mês.
+        """
+        # Erros de linha são coletados só na primeira leitura
+        blocos = self.ler_produtos_vendidos(caminho, periodo_inicio, periodo_fim, erros=erros)
+        hashes = [bloco['hash_linha'] for bloco in blocos]
+        hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.int64)
+
+        progresso('comparando', 0, len(hashes))
+        existentes = db.get_hashes_produtos_vendidos(periodo_inicio.isoformat(), periodo_fim.isoformat())
+        inserir, remover_ids = self.diff_hashes(hashes, existentes)
+        self.logger.info(
+            f"Importação incremental {periodo_inicio}..{periodo_fim}: {len(inserir)} novas, "
+            f"{len(remover_ids)} removidas, {len(hashes) - len(inserir)} inalteradas"
+        )
+
+        def linhas_novas():
+            # Mesmas linhas da primeira leitura: as inválidas saem de novo, mas os
+            # erros já foram registrados e este coletor não grava nada
+            descartados = ColetorErrosImportacao(erros.importacao_id if erros else '', max_gravados=0)
+            inicio = 0
+            for bloco in self.ler_produtos_vendidos(caminho, periodo_inicio, periodo_fim, erros=descartados):
+                fim = inicio + len(bloco)
+                posicoes = inserir[np.searchsorted(inserir, inicio):np.searchsorted(inserir, fim)]
+                if len(posicoes):
+                    yield bloco.iloc[posicoes - inicio]
+                inicio = fim
+
+        progresso('gravando', 0, len(inserir))
+        result = db.aplicar_diff_produtos_vendidos(
+            remover_ids, linhas_novas(),
+            progress_callback=lambda gravadas, total: progresso('gravando', gravadas, len(inserir))
+        )
+        result['inalteradas'] = len(hashes) - len(inserir)
+        return result, len(hashes)
+
+
+def _preparar_arquivo(caminho: str, importacao_id: str, periodo_inicio: date,
+                      periodo_fim: date) -> Tuple[str, List[Tuple[int, int, str]], ColetorErrosImportacao]:
+    """Lê e converte um CSV num processo do pool de ImportService.importar_varios.
+
+    Cada bloco preparado é gravado em um arquivo temporário (pickle) numa pasta
+    própria, e só os caminhos voltam ao processo principal: nem o filho nem o
+    resultado do pool guardam o arquivo inteiro em memória. Os erros ficam só no
+    coletor (sem gravar no banco a partir do processo filho); quem grava é o
+    processo principal, junto com os blocos.
+    """
+    erros = ColetorErrosImportacao(importacao_id, tamanho_lote=sys.maxsize)
+    os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+    pasta = tempfile.mkdtemp(prefix=f"{importacao_id}-", dir=Config.UPLOAD_FOLDER)
+    blocos = []
+    try:
+        for numero, bruto in enumerate(ImportService.ler_blocos_csv(caminho)):
+            dados = import_service.preparar_produtos_vendidos(bruto, periodo_inicio, periodo_fim, erros)
+            arquivo = os.path.join(pasta, f"{numero:06d}.pkl")
+            dados.to_pickle(arquivo)
+            blocos.append((len(bruto), erros.total, arquivo))
+    except Exception:
+        shutil.rmtree(pasta, ignore_errors=True)
+        raise
+    return pasta, blocos, erros
+
+
+def _ler_blocos_temporarios(blocos: List[Tuple[int, int, str]]) -> Iterator[Tuple[int, int, pd.DataFrame]]:
+    """Blocos gravados por _preparar_arquivo, um por vez (cada arquivo é apagado ao ser lido)."""
+    for linhas_brutas, total_erros, arquivo in blocos:
+        dados = pd.read_pickle(arquivo)
+        os.remove(arquivo)
+        yield linhas_brutas, total_erros, dados
+
+
+# Instância global
+import_service = ImportService()
@@ -0,0 +1,184 @@
+"""
+Recebimento de uploads grandes direto para o disco.
+
+O corpo do request é copiado em blocos de tamanho fixo para um arquivo de spool
+(``<UPLOAD_FOLDER>/spool/<upload_id>.part``), sem passar pelo parser de
+formulários nem pelo limite de MAX_CONTENT_LENGTH. O envio pode ser feito em
+partes (``Content-Range``) e retomado: o offset aceito é sempre o tamanho atual
+do arquivo em disco, então vale entre processos e após reinícios. Concluído, o
+arquivo é entregue ao importador por caminho.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, Optional
+
+from config.settings import Config
+
+
+class UploadSpoolErro(Exception):
+    """Erro de upload com o status HTTP correspondente."""
+
+    def __init__(self, mensagem: str, status: int = 400, **detalhes):
+        super().__init__(mensagem)
+        self.status = status
+        self.detalhes = detalhes
+
+
+_UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadSpool:
+    """Sessões de upload gravadas em disco em blocos."""
+
+    def __init__(self,
+                 pasta: Optional[str] = None,
+                 tamanho_bloco: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 validade: Optional[float] = None):
+        self.logger = logging.getLogger(__name__)
+        self.pasta = pasta or os.path.join(Config.UPLOAD_FOLDER, 'spool')
+        self.tamanho_bloco = tamanho_bloco or Config.UPLOAD_SPOOL_BLOCK_SIZE
+        self.max_bytes = max_bytes or Config.UPLOAD_SPOOL_MAX_SIZE
+        self.validade = validade or Config.UPLOAD_SPOOL_TTL
+        # Um envio por vez em cada sessão (neste processo)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def criar(self, nome_arquivo: str, tamanho_total: Optional[int] = None,
+              usuario_id: Optional[str] = None) -> Dict[str, Any]:
+        """Abre uma sessão de upload e retorna seu estado."""
+        if tamanho_total is not None and tamanho_total > self.max_bytes:
+            raise UploadSpoolErro(f"Arquivo maior que o limite de {self.max_bytes} bytes", 413)
+        self.limpar_expirados()
+        os.makedirs(self.pasta, exist_ok=True)
+
+        upload_id = uuid.uuid4().hex
+        meta = {
+            'upload_id': upload_id,
+            'nome_arquivo': nome_arquivo,
+            'tamanho_total': tamanho_total,
+            'usuario_id': usuario_id,
+            'criado_em': time.time()
+        }
+        with open(self._caminho_meta(upload_id), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        open(self.caminho(upload_id), 'wb').close()
+        return self.estado(upload_id)
+
+    def estado(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """Bytes recebidos e se o arquivo está completo (None se a sessão não existe)."""
+        meta = self._meta(upload_id)
+        if meta is None:
+            return None
+        try:
+            recebidos = os.path.getsize(self.caminho(upload_id))
+        except OSError:
+            return None
+        total = meta.get('tamanho_total')
+        return {
+            **meta,
+            'recebidos': recebidos,
+            'completo': total is not None and recebidos == total
+        }
+
+    def receber(self, upload_id: str, stream: BinaryIO, inicio: Optional[int] = None) -> Dict[str, Any]:
+        """Acrescenta o conteúdo de ``stream`` ao spool, em blocos de tamanho fixo.
+
+        ``inicio`` (offset do Content-Range) tem que ser igual aos bytes já
+        recebidos; caso contrário o cliente deve consultar o estado e retomar dali.
+        """
+        with self._lock_da_sessao(upload_id):
+            estado = self.estado(upload_id)
+            if estado is None:
+                raise UploadSpoolErro("Upload não encontrado", 404)
+            recebidos = estado['recebidos']
+            if inicio is not None and inicio != recebidos:
+                raise UploadSpoolErro("Offset não corresponde aos bytes já recebidos", 409,
+                                      recebidos=recebidos)
+            limite = estado['tamanho_total'] if estado['tamanho_total'] is not None else self.max_bytes
+
+            offset_inicial = recebidos
+            with open(self.caminho(upload_id), 'ab') as arquivo:
+                for bloco in iter(lambda: stream.read(self.tamanho_bloco), b''):
+                    if recebidos + len(bloco) > limite:
+                        # Envio que passa do tamanho declarado é descartado inteiro
+                        arquivo.truncate(offset_inicial)
+                        raise UploadSpoolErro(f"Upload excede o tamanho declarado/limite ({limite} bytes)", 413,
+                                              recebidos=offset_inicial)
+                    arquivo.write(bloco)
+                    recebidos += len(bloco)
+        return self.estado(upload_id)
+
+    def concluir(self, upload_id: str, destino: str) -> Dict[str, Any]:
+        """Move o arquivo completo para ``destino`` e encerra a sessão."""
+        with self._lock_da_sessao(upload_id):
+            estado = self.estado(upload_id)
+            if estado is None:
+                raise UploadSpoolErro("Upload não encontrado", 404)
+            if estado['tamanho_total'] is not None and not estado['completo']:
+                raise UploadSpoolErro("Upload incompleto", 409, recebidos=estado['recebidos'])
+            os.replace(self.caminho(upload_id), destino)
+            self._remover(upload_id)
+        return estado
+
+    def descartar(self, upload_id: str):
+        """Remove a sessão e o arquivo parcial."""
+        with self._lock_da_sessao(upload_id):
+            self._remover(upload_id, arquivo=True)
+
+    def limpar_expirados(self) -> int:
+        """Remove sessões abandonadas há mais que a validade; retorna quantas."""
+        if not os.path.isdir(self.pasta):
+            return 0
+        limite = time.time() - self.validade
+        removidas = 0
+        for nome in os.listdir(self.pasta):
+            upload_id, extensao = os.path.splitext(nome)
+            if extensao != '.json':
+                continue
+            meta = self._meta(upload_id)
+            if meta and meta.get('criado_em', 0) < limite:
+                self._remover(upload_id, arquivo=True)
+                removidas += 1
+        return removidas
+
+    def caminho(self, upload_id: str) -> str:
+        if not _UPLOAD_ID.match(upload_id or ''):
+            raise UploadSpoolErro("Identificador de upload inválido", 400)
+        return os.path.join(self.pasta, f"{upload_id}.part")
+
+    def _caminho_meta(self, upload_id: str) -> str:
+        return os.path.join(self.pasta, f"{upload_id}.json")
+
+    def _meta(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        if not _UPLOAD_ID.match(upload_id or ''):
+            return None
+        try:
+            with open(self._caminho_meta(upload_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _remover(self, upload_id: str, arquivo: bool = False):
+        caminhos = [self._caminho_meta(upload_id)] + ([self.caminho(upload_id)] if arquivo else [])
+        for caminho in caminhos:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+        with self._lock:
+            self._locks.pop(upload_id, None)
+
+    def _lock_da_sessao(self, upload_id: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+
+# Instância global
+upload_spool = UploadSpool()
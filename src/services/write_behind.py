@@ -0,0 +1,277 @@
+"""
+Fila write-behind para escritas que não precisam bloquear o request.
+
+Logs de auditoria e ``ultimo_acesso`` entram em uma fila em memória e são gravados
+por uma thread em lotes (a cada N ms ou M eventos), com inserts multi-linha. Cada
+evento também vai para um arquivo de spool (JSONL) antes de o request responder:
+se o processo cair, os eventos pendentes são regravados na próxima inicialização.
+No encerramento normal, a fila é drenada.
+
+Cada processo (worker do gunicorn) tem o seu spool, ``<nome>.<pid>.jsonl``; os
+arquivos de processos que já terminaram são assumidos por quem inicia depois.
+Com o banco indisponível, as tentativas são espaçadas (backoff exponencial), e um
+evento que falha ``WRITE_BEHIND_MAX_ATTEMPTS`` vezes vai para
+``<nome>.descartados.jsonl`` em vez de travar a fila.
+"""
+
+import atexit
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from config.settings import Config
+from models.database import db
+
+
+class WriteBehindQueue:
+    """Fila com flusher em segundo plano e spool em disco."""
+
+    def __init__(self,
+                 intervalo_ms: Optional[int] = None,
+                 max_lote: Optional[int] = None,
+                 spool_path: Optional[str] = None,
+                 max_tentativas: Optional[int] = None,
+                 max_espera_ms: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.intervalo = (Config.WRITE_BEHIND_FLUSH_MS if intervalo_ms is None else intervalo_ms) / 1000
+        self.max_lote = max_lote or Config.WRITE_BEHIND_MAX_BATCH
+        self.spool_path = spool_path or Config.WRITE_BEHIND_SPOOL
+        self.max_tentativas = max_tentativas or Config.WRITE_BEHIND_MAX_ATTEMPTS
+        self.max_espera = (max_espera_ms or Config.WRITE_BEHIND_MAX_BACKOFF_MS) / 1000
+        raiz, extensao = os.path.splitext(self.spool_path)
+        self.descartados_path = f"{raiz}.descartados{extensao}"
+        self._fila: List[Dict[str, Any]] = []
+        # Arquivos de spool cujos eventos ainda estão na fila (apagados após gravar)
+        self._lotes_pendentes: List[str] = []
+        self._spool = None
+        self._arquivo: Optional[str] = None
+        self._pid: Optional[int] = None
+        self._sequencia = 0
+        self._falhas_seguidas = 0
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._apos_fork)
+
+    # ========== Eventos ==========
+    def registrar_log_auditoria(self, data: Dict):
+        """Enfileira um log de auditoria (mesmo formato de db.create_log_auditoria)."""
+        self._enfileirar({'tipo': 'log_auditoria', 'dados': data})
+
+    def registrar_ultimo_acesso(self, usuario_id: str):
+        """Enfileira a atualização de último acesso com o horário do evento."""
+        self._enfileirar({
+            'tipo': 'ultimo_acesso',
+            'usuario_id': str(usuario_id),
+            'em': datetime.now(timezone.utc).isoformat()
+        })
+
+    def _enfileirar(self, evento: Dict[str, Any]):
+        self.iniciar()
+        with self._cond:
+            self._spool.write(json.dumps(evento, default=str) + '\n')
+            self._spool.flush()
+            self._fila.append(evento)
+            if len(self._fila) >= self.max_lote:
+                self._cond.notify()
+
+    # ========== Ciclo de vida ==========
+    def iniciar(self):
+        """Recupera spools de processos encerrados e inicia o flusher (idempotente)."""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._pid = os.getpid()
+            raiz, extensao = os.path.splitext(self.spool_path)
+            self._arquivo = f"{raiz}.{self._pid}{extensao}"
+            os.makedirs(os.path.dirname(self.spool_path) or '.', exist_ok=True)
+            self._recuperar_spool()
+            self._spool = open(self._arquivo, 'a', encoding='utf-8')
+            self._thread = threading.Thread(target=self._executar, name='write-behind', daemon=True)
+            self._thread.start()
+        atexit.register(self.encerrar)
+
+    def encerrar(self, timeout: float = 5.0):
+        """Para o flusher e drena a fila (o que não gravar fica no spool)."""
+        if self._thread is None:
+            return
+        self._parar.set()
+        with self._cond:
+            self._cond.notify()
+        self._thread.join(timeout)
+        self.flush()
+
+    def _apos_fork(self):
+        """No processo filho (gunicorn --preload), a fila, o spool e a thread são do pai."""
+        self._fila, self._lotes_pendentes = [], []
+        self._spool, self._arquivo, self._pid, self._thread = None, None, None, None
+        self._falhas_seguidas = 0
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._parar = threading.Event()
+
+    def _executar(self):
+        while not self._parar.is_set():
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self._fila) >= self.max_lote or self._parar.is_set(),
+                    timeout=self.intervalo
+                )
+            self.flush()
+            if self._falhas_seguidas:
+                # Banco indisponível: espera crescente antes de tentar de novo
+                self._parar.wait(self._espera())
+
+    def _espera(self) -> float:
+        base = max(self.intervalo, 0.1)
+        return min(base * 2 ** min(self._falhas_seguidas, 30), self.max_espera)
+
+    # ========== Gravação ==========
+    def flush(self) -> int:
+        """Grava os eventos pendentes em lote; retorna quantos foram gravados."""
+        with self._flush_lock:
+            with self._cond:
+                if not self._fila:
+                    return 0
+                lote, self._fila = self._fila, []
+                arquivos = self._lotes_pendentes
+                if self._spool.tell() > 0:
+                    arquivos = arquivos + [self._rotacionar_spool()]
+                self._lotes_pendentes = []
+
+            falhas = self._gravar(lote)
+            if not falhas:
+                self._falhas_seguidas = 0
+                self._remover(arquivos)
+                return len(lote)
+
+            self._falhas_seguidas += 1
+            for evento in falhas:
+                evento['tentativas'] = evento.get('tentativas', 0) + 1
+            pendentes = [evento for evento in falhas if evento['tentativas'] < self.max_tentativas]
+            esgotados = [evento for evento in falhas if evento['tentativas'] >= self.max_tentativas]
+            if esgotados:
+                self._descartar(esgotados)
+
+            if pendentes:
+                # Volta para a fila; os eventos continuam nos arquivos de spool
+                with self._cond:
+                    self._fila[:0] = pendentes
+                    self._lotes_pendentes[:0] = arquivos
+            else:
+                self._remover(arquivos)
+            return len(lote) - len(falhas)
+
+    def _gravar(self, lote: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Grava logs e acessos do lote; retorna os eventos que falharam."""
+        logs = [evento for evento in lote if evento['tipo'] == 'log_auditoria']
+        acessos = [evento for evento in lote if evento['tipo'] == 'ultimo_acesso']
+        pendentes = []
+
+        if logs:
+            try:
+                db.create_logs_auditoria([evento['dados'] for evento in logs])
+            except Exception as e:
+                self.logger.warning(f"Falha ao gravar {len(logs)} logs de auditoria: {e}")
+                pendentes += logs
+
+        if acessos:
+            # Vários acessos do mesmo usuário no lote: vale o mais recente
+            ultimos: Dict[str, str] = {}
+            for evento in acessos:
+                ultimos[evento['usuario_id']] = max(evento['em'], ultimos.get(evento['usuario_id'], ''))
+            try:
+                db.update_ultimos_acessos(ultimos)
+            except Exception as e:
+                self.logger.warning(f"Falha ao gravar {len(ultimos)} últimos acessos: {e}")
+                pendentes += acessos
+
+        return pendentes
+
+    def _descartar(self, eventos: List[Dict[str, Any]]):
+        """Tira da fila eventos que esgotaram as tentativas (ficam no arquivo de descartados)."""
+        self.logger.error(f"{len(eventos)} eventos write-behind descartados após "
+                          f"{self.max_tentativas} tentativas; ver {self.descartados_path}")
+        with open(self.descartados_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(evento, default=str) + '\n' for evento in eventos))
+
+    # ========== Spool ==========
+    def _rotacionar_spool(self) -> str:
+        """Fecha o spool atual sob um novo nome (chamar com _cond adquirido)."""
+        destino = self._nome_lote()
+        self._spool.close()
+        os.replace(self._arquivo, destino)
+        self._spool = open(self._arquivo, 'a', encoding='utf-8')
+        return destino
+
+    def _nome_lote(self) -> str:
+        self._sequencia += 1
+        return f"{self._arquivo}.{int(time.time() * 1000)}-{self._sequencia}.lote"
+
+    def _recuperar_spool(self):
+        """Carrega na fila os eventos não gravados de processos que já terminaram.
+
+        Cada arquivo é assumido com um rename atômico para o nome deste processo:
+        se dois workers iniciam juntos, só um fica com ele.
+        """
+        raiz, extensao = os.path.splitext(self.spool_path)
+        padrao = re.compile(re.escape(raiz) + r'\.(\d+)' + re.escape(extensao) + r'(\..+\.lote)?$')
+        for arquivo in sorted(glob.glob(f"{glob.escape(raiz)}.*{extensao}*")):
+            encontrado = padrao.match(arquivo)
+            if not encontrado:
+                continue
+            pid = int(encontrado.group(1))
+            if pid != self._pid and _processo_vivo(pid):
+                continue
+            destino = self._nome_lote()
+            try:
+                os.replace(arquivo, destino)
+            except FileNotFoundError:
+                continue
+
+            with open(destino, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        self._fila.append(json.loads(linha))
+                    except ValueError:
+                        # Última linha truncada por uma queda no meio da escrita
+                        self.logger.warning(f"Linha inválida ignorada no spool {arquivo}")
+            self._lotes_pendentes.append(destino)
+
+        if self._fila:
+            self.logger.info(f"{len(self._fila)} eventos write-behind recuperados do spool")
+
+    @staticmethod
+    def _remover(arquivos: List[str]):
+        for arquivo in arquivos:
+            try:
+                os.remove(arquivo)
+            except OSError:
+                pass
+
+
+def _processo_vivo(pid: int) -> bool:
+    """Se o processo ``pid`` ainda existe (dono de um spool)."""
+    if os.name != 'posix':
+        # Sem sinal 0 fora do POSIX (no Windows os.kill encerra o processo); o
+        # servidor de desenvolvimento roda um processo só
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Instância global
+write_behind = WriteBehindQueue()
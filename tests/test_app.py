@@ -0,0 +1,57 @@
+from unittest import mock
+
+import pytest
+
+from models.database import LazyDatabase
+from services.write_behind import WriteBehindQueue
+
+# Importar o app resolveria o banco e iniciaria o flusher do write-behind
+with mock.patch.object(LazyDatabase, 'aquecer'), mock.patch.object(WriteBehindQueue, 'iniciar'):
+    import app as modulo
+
+
+IMPORTACAO = {'id': 'imp-1', 'status': 'erro', 'nome_arquivo': 'vendas.csv', 'mensagem_erro': 'falhou'}
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    banco = mock.Mock()
+    banco.get_importacao.return_value = IMPORTACAO
+    monkeypatch.setattr(modulo, 'db', banco)
+    monkeypatch.setattr(modulo.import_jobs, 'progresso', lambda importacao_id: None)
+
+    def entrar(perfil):
+        usuario = {'id': 'u1', 'email': 'a@b.c', 'nome': 'A', 'perfil': perfil, 'ativo': True}
+        monkeypatch.setattr(modulo.user_cache, 'obter', lambda user_id, carregar: usuario)
+        cliente = modulo.app.test_client()
+        with cliente.session_transaction() as sessao:
+            sessao['_user_id'] = 'u1'
+            sessao['_fresh'] = True
+        return cliente
+
+    return entrar, banco
+
+
+@pytest.mark.parametrize('perfil', ['admin', 'gestor'])
+def test_status_da_importacao_para_admin_e_gestor(cliente, perfil):
+    entrar, _ = cliente
+    resposta = entrar(perfil).get('/api/importacoes/imp-1')
+    assert resposta.status_code == 200
+    assert resposta.get_json()['nome_arquivo'] == 'vendas.csv'
+
+
+def test_status_da_importacao_sem_permissao(cliente):
+    entrar, banco = cliente
+    resposta = entrar('visualizador').get('/api/importacoes/imp-1')
+    assert resposta.status_code == 403
+    assert 'nome_arquivo' not in resposta.get_json()
+    banco.get_importacao.assert_not_called()
+
+
+def test_progresso_do_lote_sem_permissao(cliente, monkeypatch):
+    entrar, _ = cliente
+    monkeypatch.setattr(modulo.import_jobs, 'progresso', lambda lote_id: {'imp-1': {'status': 'processando'}})
+    assert entrar('visualizador').get('/api/importacoes/lote/l1').status_code == 403
+    resposta = entrar('gestor').get('/api/importacoes/lote/l1')
+    assert resposta.status_code == 200
+    assert resposta.get_json()['progresso'] == {'imp-1': {'status': 'processando'}}
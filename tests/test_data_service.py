@@ -0,0 +1,168 @@
+import asyncio
+from datetime import date, timedelta
+from unittest import mock
+
+import pytest
+
+from models import database as database_module
+from models.database_async import AsyncDatabase
+from models.deadline import DeadlineExceeded
+from models.query_builder import QueryBuilder
+from services import data_service as modulo
+from services.data_service import DataService
+
+
+class _Resultado:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    """Query estilo Supabase que só guarda o resultado (síncrono ou assíncrono)."""
+
+    def __init__(self, data=None, erro=None, assincrona=False):
+        self.data, self.erro, self.assincrona = data or [], erro, assincrona
+
+    def __getattr__(self, nome):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        def resultado():
+            if self.erro:
+                raise self.erro
+            return _Resultado(self.data)
+
+        if self.assincrona:
+            async def corrotina():
+                return resultado()
+            return corrotina()
+        return resultado()
+
+
+@pytest.fixture
+def sync_db(monkeypatch):
+    fake = mock.MagicMock()
+    monkeypatch.setattr(modulo, 'db', fake)
+    # Sem backend assíncrono (resolvê-lo testaria a conexão de verdade)
+    monkeypatch.setattr(modulo, 'async_db', mock.Mock(disponivel=False))
+    return fake
+
+
+def test_consulta_sincrona_usa_cache_e_dados_expirados(sync_db):
+    service = DataService()
+    sync_db.supabase.table.return_value = _Query([{'produtos_vendidos': '3', 'semana_domingo': '2025-01-05'}])
+    assert service.get_produtos_vendidos_df(ano=2025, mes=1)['produtos_vendidos'].tolist() == [3]
+
+    # Cache expirado + prazo esgotado: resposta degradada com os dados antigos
+    service._last_cache_update.clear()
+    sync_db.supabase.table.return_value = _Query(erro=DeadlineExceeded('prazo'))
+    assert service.get_produtos_vendidos_df(ano=2025, mes=1)['produtos_vendidos'].tolist() == [3]
+
+    with pytest.raises(DeadlineExceeded):
+        service.get_produtos_vendidos_df(ano=2024)
+
+
+def test_consulta_assincrona_compartilha_o_cache(sync_db, monkeypatch):
+    service = DataService()
+    assincrono = mock.MagicMock()
+    assincrono.table.return_value = _Query([{'valor': '2', 'data': '2025-01-02'}], assincrona=True)
+    monkeypatch.setattr(modulo, 'async_db', assincrono)
+
+    df = asyncio.run(service.get_estornos_cancelamentos_df_async(ano=2025))
+    assert df['valor'].tolist() == [2]
+
+    # Mesma chave de cache: a versão síncrona não vai ao banco
+    sync_db.supabase.table.return_value = _Query(erro=AssertionError('não deveria consultar'))
+    assert service.get_estornos_cancelamentos_df(ano=2025)['valor'].tolist() == [2]
+
+
+@pytest.mark.parametrize('backend_sync, esperado', [('supabase', 'rest'), ('postgres', 'pg')])
+def test_backend_async_segue_o_backend_sincrono(backend_sync, esperado, monkeypatch):
+    monkeypatch.setattr(database_module.LazyDatabase, 'backend', property(lambda self: backend_sync))
+    monkeypatch.setattr(AsyncDatabase, '_modulo_disponivel', staticmethod(lambda nome: True))
+
+    async_db = AsyncDatabase(dsn='postgresql://localhost/db', rest_url='https://x.supabase.co', rest_key='chave')
+    assert async_db.backend == esperado
+
+
+def test_sem_driver_do_backend_sincrono_nao_usa_async(monkeypatch):
+    monkeypatch.setattr(database_module.LazyDatabase, 'backend', property(lambda self: 'postgres'))
+    monkeypatch.setattr(AsyncDatabase, '_modulo_disponivel', staticmethod(lambda nome: nome == 'httpx'))
+
+    async_db = AsyncDatabase(dsn='postgresql://localhost/db', rest_url='https://x.supabase.co', rest_key='chave')
+    assert async_db.backend is None
+    assert not async_db.disponivel
+
+
+class _Gravada(QueryBuilder):
+    """QueryBuilder que registra a query montada e retorna vazio."""
+
+    def __init__(self, tabela, feitas):
+        super().__init__(tabela)
+        feitas.append(self)
+
+    def execute(self):
+        return _Resultado([])
+
+
+def _intervalo(query, coluna):
+    return ([v for c, op, v in query.filtros if c == coluna and op == 'gte'],
+            [v for c, op, v in query.filtros if c == coluna and op == 'lte'])
+
+
+def test_sem_periodo_usa_a_janela_padrao(sync_db, monkeypatch):
+    monkeypatch.setattr(modulo.Config, 'QUERY_DEFAULT_WINDOW_YEARS', 2)
+    feitas = []
+    sync_db.supabase.table.side_effect = lambda tabela: _Gravada(tabela, feitas)
+    DataService().get_dashboard_summary()
+
+    atual = date.today().year
+    assert {q.table_name for q in feitas} == {'produtos_vendidos', 'estornos_cancelamento'}
+    for query in feitas:
+        coluna = modulo.COLUNAS_PARTICAO[query.table_name]
+        margem = timedelta(days=6 if query.table_name == 'produtos_vendidos' else 0)
+        assert _intervalo(query, coluna) == ([date(atual - 1, 1, 1) - margem], [date(atual, 12, 31) + margem])
+
+
+def test_periodo_informado_prevalece(sync_db):
+    feitas = []
+    sync_db.supabase.table.side_effect = lambda tabela: _Gravada(tabela, feitas)
+    DataService().get_estornos_cancelamentos_df(ano=2024, mes=2)
+    assert _intervalo(feitas[0], 'data') == ([date(2024, 2, 1)], [date(2024, 2, 29)])
+
+    DataService().get_estornos_cancelamentos_df(data_inicio=date(2020, 5, 1), data_fim=date(2020, 6, 1))
+    assert _intervalo(feitas[1], 'data') == ([date(2020, 5, 1)], [date(2020, 6, 1)])
+
+
+def test_catalogos_de_filtros_com_intervalo(sync_db, monkeypatch):
+    feitas = []
+    sync_db.supabase.table.side_effect = lambda tabela: _Gravada(tabela, feitas)
+    DataService().get_filtros_disponiveis()
+
+    assert len(feitas) == 7
+    for query in feitas:
+        inicio, fim = _intervalo(query, modulo.COLUNAS_PARTICAO[query.table_name])
+        assert len(inicio) == 1 and len(fim) == 1
+
+
+def test_catalogos_assincronos_com_intervalo(sync_db, monkeypatch):
+    feitas = []
+
+    class _GravadaAsync(_Gravada):
+        async def _resultado(self):
+            return _Resultado([{'ano': 2025}])
+
+        def execute(self):
+            return self._resultado()
+
+    assincrono = mock.MagicMock()
+    assincrono.table.side_effect = lambda tabela: _GravadaAsync(tabela, feitas)
+    assincrono.gather = lambda *coros: asyncio.gather(*coros)
+    monkeypatch.setattr(modulo, 'async_db', assincrono)
+
+    filtros = asyncio.run(DataService().get_filtros_disponiveis_async())
+    assert filtros['anos'] == [2025]
+    assert len(feitas) == 7
+    for query in feitas:
+        inicio, fim = _intervalo(query, modulo.COLUNAS_PARTICAO[query.table_name])
+        assert len(inicio) == 1 and len(fim) == 1
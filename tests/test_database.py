@@ -0,0 +1,109 @@
+import threading
+from unittest import mock
+
+import httpx
+import pytest
+
+from config.settings import Config
+from models.database import LazyDatabase, _criar_cliente
+from models.deadline import DeadlineExceeded, deadline
+
+
+def test_aquecer_so_resolve_o_backend():
+    instancia = mock.Mock()
+    lazy = LazyDatabase()
+    with mock.patch.object(LazyDatabase, '_resolver', return_value=instancia):
+        lazy.aquecer()
+        for thread in threading.enumerate():
+            if thread.name == 'db-backend-init':
+                thread.join(5)
+
+    assert lazy._db is instancia
+    # DDL de partições fica no deploy (scripts/garantir-particoes.py)
+    instancia.garantir_particoes.assert_not_called()
+
+
+def _cliente_supabase(monkeypatch, **kwargs):
+    monkeypatch.setattr(Config, 'SUPABASE_KEY', 'cabecalho.corpo.assinatura')
+    monkeypatch.setattr(Config, 'QUERY_DEADLINE_SECONDS', 4.0)
+    return _criar_cliente('https://exemplo.supabase.co', **kwargs)
+
+
+def test_timeout_pelo_client_options_sobrevive_a_nova_sessao(monkeypatch):
+    cliente = _cliente_supabase(monkeypatch)
+    assert cliente.postgrest.session.timeout == httpx.Timeout(4.0)
+
+    # O supabase recria o cliente PostgREST (ex.: troca de sessão): o timeout continua
+    cliente.client._postgrest = None
+    assert cliente.postgrest.session.timeout == httpx.Timeout(4.0)
+
+    sonda = _cliente_supabase(monkeypatch, timeout=1.5)
+    assert sonda.postgrest.session.timeout == httpx.Timeout(1.5)
+
+
+def _responder(handler):
+    def request(session, method, url, **kwargs):
+        return handler(httpx.Request(method, session.base_url.join(url), params=kwargs.get('params')))
+    return request
+
+
+def test_consulta_encadeada_e_prazo(monkeypatch):
+    cliente = _cliente_supabase(monkeypatch)
+    urls = []
+
+    def ok(request):
+        urls.append(str(request.url))
+        return httpx.Response(200, json=[{'id': 1}], request=request)
+
+    monkeypatch.setattr(httpx.Client, 'request', _responder(ok))
+    resposta = cliente.table('categorias').select('id').eq('id', 1).not_.is_('nome', 'null').limit(1).execute()
+    assert resposta.data == [{'id': 1}]
+    assert 'id=eq.1' in urls[0] and 'nome=not.is.null' in urls[0]
+
+    # Prazo esgotado: nem chega a chamar o PostgREST
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            cliente.table('categorias').select('*').execute()
+    assert len(urls) == 1
+
+
+def test_timeout_http_dentro_do_prazo_vira_deadline(monkeypatch):
+    cliente = _cliente_supabase(monkeypatch)
+
+    def lento(request):
+        raise httpx.ReadTimeout('lento', request=request)
+
+    monkeypatch.setattr(httpx.Client, 'request', _responder(lento))
+    with deadline(5):
+        with pytest.raises(DeadlineExceeded):
+            cliente.rpc('garantir_particoes_futuras', {'meses': 1}).execute()
+    # Sem prazo ativo, o timeout segue como erro do httpx
+    with pytest.raises(httpx.ReadTimeout):
+        cliente.table('categorias').select('*').execute()
+
+
+def test_timeout_da_chamada_e_o_prazo_restante(monkeypatch):
+    cliente = _cliente_supabase(monkeypatch)
+    timeouts = []
+
+    def enviar(transporte, request):
+        timeouts.append(request.extensions['timeout'])
+        return httpx.Response(200, json=[], request=request)
+
+    monkeypatch.setattr(httpx.HTTPTransport, 'handle_request', enviar)
+
+    # Sem prazo: timeout do cliente (ClientOptions)
+    cliente.table('categorias').select('*').execute()
+    assert timeouts[-1] == dict.fromkeys(('connect', 'read', 'write', 'pool'), 4.0)
+
+    # Prazo menor que o do cliente: a chamada leva só o restante
+    with deadline(0.5):
+        cliente.rpc('garantir_particoes_futuras', {'meses': 1}).execute()
+    assert all(0 < valor <= 0.5 for valor in timeouts[-1].values())
+
+    # Sessão recriada pelo supabase: o hook é reinstalado na próxima query
+    cliente.client._postgrest = None
+    with deadline(0.5):
+        cliente.table('categorias').select('*').execute()
+    assert all(0 < valor <= 0.5 for valor in timeouts[-1].values())
+    assert len(timeouts) == 3
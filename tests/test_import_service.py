@@ -0,0 +1,168 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from services import import_errors as modulo_erros
+from services import import_service as modulo
+from services.import_errors import ColetorErrosImportacao
+from services.import_service import COLUNAS_CSV, ImportService
+
+
+def _bloco(*linhas):
+    """Bloco bruto como o de ler_blocos_csv (texto, índice a partir de 0)."""
+    return pd.DataFrame([list(linha) for linha in linhas], columns=COLUNAS_CSV, dtype=object)
+
+
+LINHA = ('1', 'Mesa', 'Móveis', 'Loja', 'VERDADEIRO', '2', 'R$ 10,00', 'R$ 20,00', 'R$ 0,00', 'R$ 20,00')
+
+
+def test_semana_domingo_fecha_a_semana():
+    assert ImportService.semana_domingo(date(2025, 5, 26)) == date(2025, 6, 1)   # segunda
+    assert ImportService.semana_domingo(date(2025, 5, 31)) == date(2025, 6, 1)   # sábado
+    assert ImportService.semana_domingo(date(2025, 6, 1)) == date(2025, 6, 1)    # domingo
+
+
+def test_preparar_grava_semana_domingo():
+    df = ImportService().preparar_produtos_vendidos(_bloco(LINHA), date(2025, 5, 26), date(2025, 5, 31))
+    assert df['semana_domingo'].tolist() == [date(2025, 6, 1)]
+    assert df['semana_domingo'].notna().all()
+
+
+def test_quantidade_inteira():
+    fracionaria = LINHA[:5] + ('2,5',) + LINHA[6:]
+    texto = LINHA[:5] + ('abc',) + LINHA[6:]
+    erros = ColetorErrosImportacao('importacao', max_gravados=0)
+
+    df = ImportService().preparar_produtos_vendidos(
+        _bloco(LINHA, fracionaria, texto), date(2025, 5, 26), date(2025, 5, 31), erros
+    )
+    assert str(df['quantidade'].dtype) == 'Int64'
+    assert df['quantidade'].tolist() == [2]
+    assert json.loads(df[['quantidade']].to_json(orient='records')) == [{'quantidade': 2}]
+    assert erros.total == 2
+    assert set(erros.por_mensagem) == {'Quantidade inválida'}
+
+
+def _preparar(*linhas, inicio=date(2025, 5, 26), fim=date(2025, 5, 31)):
+    return ImportService().preparar_produtos_vendidos(_bloco(*linhas), inicio, fim)
+
+
+def test_hash_linhas_independe_do_bloco():
+    outra = LINHA[:1] + ('Cadeira',) + LINHA[2:]
+    sozinha = _preparar(LINHA)['hash_linha']
+    junto = _preparar(outra, LINHA)['hash_linha']
+    assert sozinha.iloc[0] == junto.iloc[1]
+    assert junto.iloc[0] != junto.iloc[1]
+
+
+def test_hash_linhas_normaliza_e_ignora_data_venda():
+    espacos = (' 1 ', ' Mesa') + LINHA[2:]
+    df = _preparar(LINHA, espacos)
+    assert df['hash_linha'].iloc[0] == df['hash_linha'].iloc[1]
+
+    df['data_venda'] = date(2000, 1, 1)
+    assert (ImportService.hash_linhas(df) == df['hash_linha'].to_numpy()).all()
+
+
+def test_hash_linhas_muda_com_periodo_e_valores():
+    base = _preparar(LINHA)['hash_linha'].iloc[0]
+    assert _preparar(LINHA, fim=date(2025, 6, 1))['hash_linha'].iloc[0] != base
+    mais_cara = LINHA[:6] + ('R$ 11,00',) + LINHA[7:]
+    assert _preparar(mais_cara)['hash_linha'].iloc[0] != base
+
+
+def _existentes(*pares):
+    return pd.DataFrame(list(pares), columns=['id', 'hash_linha']).astype({'hash_linha': 'Int64'})
+
+
+def test_diff_hashes_conta_repetidas_uma_a_uma():
+    # Arquivo: A A B C; banco: A B B D -> insere a 2ª A e o C; remove a 2ª B e o D
+    arquivo = np.array([10, 10, 20, 30], dtype=np.int64)
+    banco = _existentes((1, 10), (2, 20), (3, 20), (4, 40))
+
+    inserir, remover = ImportService.diff_hashes(arquivo, banco)
+    assert inserir.tolist() == [1, 3]
+    assert sorted(remover) == [3, 4]
+
+
+def test_diff_hashes_iguais_e_vazios():
+    arquivo = np.array([10, 10, 20], dtype=np.int64)
+    inserir, remover = ImportService.diff_hashes(arquivo, _existentes((1, 20), (2, 10), (3, 10)))
+    assert inserir.tolist() == [] and remover == []
+
+    inserir, remover = ImportService.diff_hashes(arquivo, _existentes())
+    assert inserir.tolist() == [0, 1, 2] and remover == []
+
+    inserir, remover = ImportService.diff_hashes(np.array([], dtype=np.int64), _existentes((1, 10)))
+    assert inserir.tolist() == [] and remover == [1]
+
+
+def test_diff_hashes_remove_linhas_sem_hash():
+    arquivo = np.array([10], dtype=np.int64)
+    inserir, remover = ImportService.diff_hashes(arquivo, _existentes((1, None), (2, 10)))
+    assert inserir.tolist() == []
+    assert remover == [1]
+
+
+def test_diff_hashes_aceita_hash_negativo():
+    # uint64 gravado como BIGINT: metade dos hashes é negativa no banco
+    hashes = _preparar(LINHA, LINHA[:1] + ('Cadeira',) + LINHA[2:])['hash_linha'].to_numpy()
+    banco = _existentes(*((i, int(h)) for i, h in enumerate(hashes)))
+    inserir, remover = ImportService.diff_hashes(hashes, banco)
+    assert inserir.tolist() == [] and remover == []
+
+
+def test_ler_blocos_csv_retoma_por_linhas_lidas(tmp_path):
+    # Linha em branco e campo entre aspas com quebra de linha: linhas físicas != linhas lidas
+    linhas = [';'.join(LINHA[:1] + (f'Item {i}',) + LINHA[2:]) for i in range(7)]
+    linhas[2] = linhas[2].replace('Item 2', '"Item\n2"')
+    conteudo = '\n'.join(['Relatório', 'Loja', 'Período', '', ';'.join(COLUNAS_CSV),
+                          linhas[0], '', *linhas[1:]]) + '\n'
+    caminho = tmp_path / 'produtos.csv'
+    caminho.write_bytes(conteudo.encode('latin-1'))
+
+    completo = pd.concat(ImportService.ler_blocos_csv(str(caminho), chunk_size=2))
+    assert len(completo) == 7
+    assert completo['nome'].tolist()[2] == 'Item\n2'
+
+    for confirmadas in (2, 3, 6, 7):
+        retomado = list(ImportService.ler_blocos_csv(str(caminho), chunk_size=2, linha_inicial=confirmadas))
+        resto = pd.concat(retomado) if retomado else completo.iloc[:0]
+        pd.testing.assert_frame_equal(resto, completo.iloc[confirmadas:])
+
+
+class _PoolNoProcesso(ThreadPoolExecutor):
+    """Pool no próprio processo (aceita mp_context, como o ProcessPoolExecutor)."""
+
+    def __init__(self, max_workers=None, mp_context=None):
+        super().__init__(max_workers)
+
+
+def test_importar_varios_grava_erros_de_linha_quando_falha(tmp_path, monkeypatch):
+    invalida = LINHA[:5] + ('abc',) + LINHA[6:]
+    conteudo = '\n'.join(['Relatório', 'Loja', 'Período', '', ';'.join(COLUNAS_CSV),
+                          ';'.join(LINHA), ';'.join(invalida)]) + '\n'
+    caminho = tmp_path / 'vendas.csv'
+    caminho.write_bytes(conteudo.encode('latin-1'))
+
+    banco = mock.Mock()
+    banco.inserir_bloco_importacao.side_effect = RuntimeError('banco fora')
+    monkeypatch.setattr(modulo, 'db', banco)
+    monkeypatch.setattr(modulo_erros, 'db', banco)
+    monkeypatch.setattr(modulo, 'ProcessPoolExecutor', _PoolNoProcesso)
+    monkeypatch.setattr(modulo.Config, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+
+    resultado = ImportService().importar_varios([(str(caminho), 'imp-1')], date(2025, 5, 26), date(2025, 5, 31))
+
+    assert resultado['arquivos']['imp-1'] == {'success': False, 'erro': 'banco fora'}
+    gravados = [erro for chamada in banco.create_erros_importacao.call_args_list for erro in chamada.args[0]]
+    assert [erro['linha_numero'] for erro in gravados] == [7]
+    # Erros gravados antes de marcar a importação como 'erro'
+    nomes = [chamada[0] for chamada in banco.mock_calls]
+    assert nomes.index('create_erros_importacao') < len(nomes) - 1 - nomes[::-1].index('update_importacao')
+    assert banco.update_importacao.call_args.args == ('imp-1', {'status': 'erro', 'mensagem_erro': 'banco fora'})
+    assert caminho.exists()
@@ -0,0 +1,125 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from data.converters.numbers import parse_br_money, parse_br_number, parse_br_numbers
+from data.validators import DataValidator
+
+
+# Ponto único seguido de 3 dígitos é milhar no formato brasileiro
+MILHAR = [
+    ('R$ 1.234', 1234.0),
+    ('1.234', 1234.0),
+    ('-R$ 1.234', -1234.0),
+    ('(1.234)', -1234.0),
+    ('12.500', 12500.0),
+    ('123.456', 123456.0),
+]
+
+# Continuam decimais
+DECIMAIS = [
+    ('1.5', 1.5),
+    ('1.23', 1.23),
+    ('1.2345', 1.2345),
+    ('1234.567', 1234.567),
+    ('0.500', 0.5),
+    ('1234.56', 1234.56),
+    ('1,234.56', 1234.56),
+]
+
+
+@pytest.mark.parametrize('texto, esperado', MILHAR + DECIMAIS)
+def test_ponto_unico(texto, esperado):
+    assert parse_br_number(texto) == esperado
+    assert parse_br_numbers([texto]).values.iloc[0] == esperado
+
+
+@pytest.mark.parametrize('texto, esperado', MILHAR)
+def test_ponto_unico_milhar_em_centavos(texto, esperado):
+    assert parse_br_numbers([texto], cents=True).values.iloc[0] == round(esperado * 100)
+
+
+def test_valor_monetario_com_milhar():
+    assert parse_br_money('R$ 1.234') == Decimal('1234.00')
+    assert DataValidator().validate('1.234', 'money').sanitized_value == Decimal('1234.00')
+
+
+# Paridade entre o parser vetorizado e o escalar
+TEXTOS = [
+    '1.234,56', 'R$ 1.234,56', 'R$ 1.234,5', '-R$ 10,00', 'R$ -10,00', '(10,00)', '10,00-',
+    '1234.56', '1,234.56', '1.234.567', '1.234.567,89', '0,5', ',5', '.5', '5,', '5.',
+    '0', '-0', '007', ' 12 ', '12\xa0345,00', 'R$\xa01,00', '$ 3.50',
+    '999999999999999', '9999999999999999', '0,123456789012345', '0,1234567890123456',
+    '1,2,3', '1.2.3,4,5', '--1', '(1', '1)', '((1))', '-(1)', 'abc', '1a', 'R 1', 'R$',
+    '', '   ', '1' * 70, '١٢٣',
+    '1-2', '1 - 2', '1$2', '12$', '12 R$', 'R$ 1,00 R$', '$$1', '1(2)', '(1)2', '1)',
+    '(R$ 10,00)', 'R$ (10,00)', '- 10,00', '10,00 -', '(10,00) ',
+]
+
+
+@pytest.mark.parametrize('texto', TEXTOS)
+def test_paridade_vetorizado_escalar(texto):
+    resultado = parse_br_numbers([texto])
+    escalar = parse_br_number(texto)
+    vetorizado = resultado.values.iloc[0]
+    if escalar is None:
+        assert pd.isna(vetorizado)
+    else:
+        assert vetorizado == pytest.approx(escalar, rel=1e-15)
+    # Brancos viram nulo sem erro; texto que não é número é erro
+    assert bool(resultado.errors.iloc[0]) == (escalar is None and texto.strip() != '')
+
+
+@pytest.mark.parametrize('texto', ['1-2', '12-34,56', '1$2', '12$', '1,00R$', '$1$', '1(2)'])
+def test_sinal_e_moeda_fora_das_pontas(texto):
+    assert parse_br_number(texto) is None
+    resultado = parse_br_numbers([texto])
+    assert pd.isna(resultado.values.iloc[0])
+    assert resultado.has_errors
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('-12', -12.0), ('12-', -12.0), ('R$ -1,00', -1.0), ('-R$ 1,00', -1.0), ('(R$ 1,00)', -1.0),
+])
+def test_sinal_nas_pontas_e_moeda_como_prefixo(texto, esperado):
+    assert parse_br_number(texto) == esperado
+    assert parse_br_numbers([texto]).values.iloc[0] == esperado
+
+
+def test_brancos_e_nulos():
+    resultado = parse_br_numbers(['', None, float('nan'), '  '])
+    assert resultado.values.isna().all()
+    assert not resultado.has_errors
+
+
+def test_coluna_mista_com_numeros():
+    resultado = parse_br_numbers(pd.Series(['1,50', 2, 3.25, None, 'x'], dtype=object))
+    assert resultado.values.tolist()[:3] == [1.5, 2.0, 3.25]
+    assert resultado.errors.tolist() == [False, False, False, False, True]
+
+
+def test_coluna_numerica():
+    resultado = parse_br_numbers(pd.Series([1, 2, 3]))
+    assert resultado.values.dtype == 'float64'
+    assert parse_br_numbers(pd.Series([1.005, 2.5]), cents=True).values.tolist() == [100, 250]
+
+
+@pytest.mark.parametrize('texto, centavos', [
+    ('0,005', 1), ('0,004', 0), ('-0,005', -1), ('1,999', 200), ('R$ 1.234,56', 123456),
+    ('123456789012,345', 12345678901235), ('1,5', 150),
+])
+def test_centavos_arredonda_meio_para_cima(texto, centavos):
+    assert parse_br_numbers([texto], cents=True).values.iloc[0] == centavos
+
+
+def test_centavos_exatos_para_valores_grandes():
+    # 15 dígitos inteiros: float64 perderia os centavos
+    assert parse_br_numbers(['999999999999999,99'], cents=True).values.iloc[0] == 99999999999999999
+
+
+def test_repetidos_e_indice_preservado():
+    serie = pd.Series(['1,00', '2,00', '1,00'] * 3, index=range(10, 19))
+    resultado = parse_br_numbers(serie)
+    assert resultado.values.index.equals(serie.index)
+    assert resultado.values.tolist() == [1.0, 2.0, 1.0] * 3
@@ -0,0 +1,107 @@
+import pytest
+
+from models.query_builder import QueryBuilder, quote_identifier
+
+
+def test_select_com_filtros_ordem_e_paginacao():
+    query, params = (QueryBuilder('produtos_vendidos')
+                     .select('id, loja, valor_total')
+                     .eq('loja', "X'; DROP TABLE y; --")
+                     .gte('periodo_inicio', '2025-01-01')
+                     .lte('periodo_fim', '2025-01-31')
+                     .order('periodo_fim', desc=True)
+                     .order('id')
+                     .range(20, 29)
+                     .build())
+    assert query == (
+        'SELECT "id", "loja", "valor_total" FROM "produtos_vendidos"'
+        ' WHERE "loja" = %s AND "periodo_inicio" >= %s AND "periodo_fim" <= %s'
+        ' ORDER BY "periodo_fim" DESC, "id" ASC LIMIT %s OFFSET %s'
+    )
+    assert params == ["X'; DROP TABLE y; --", '2025-01-01', '2025-01-31', 10, 20]
+
+
+def test_select_padrao_e_placeholder_numerado():
+    assert QueryBuilder('usuarios').build() == ('SELECT * FROM "usuarios"', [])
+
+    query, params = QueryBuilder('usuarios', placeholder='$').eq('ativo', True).in_('id', (1, 2)).limit(5).build()
+    assert query == 'SELECT * FROM "usuarios" WHERE "ativo" = $1 AND "id" = ANY($2) LIMIT $3'
+    assert params == [True, [1, 2], 5]
+
+
+@pytest.mark.parametrize('metodo, sql', [
+    ('neq', '<>'), ('gt', '>'), ('lt', '<'), ('like', 'LIKE'), ('ilike', 'ILIKE'),
+])
+def test_operadores(metodo, sql):
+    query, params = getattr(QueryBuilder('t'), metodo)('c', 'v').build()
+    assert query == f'SELECT * FROM "t" WHERE "c" {sql} %s'
+    assert params == ['v']
+
+
+def test_is_sem_parametro():
+    query, params = QueryBuilder('t').is_('a', 'null').is_('b', False).build()
+    assert query == 'SELECT * FROM "t" WHERE "a" IS NULL AND "b" IS FALSE'
+    assert params == []
+    with pytest.raises(ValueError):
+        QueryBuilder('t').is_('a', 'x')
+
+
+def test_insert_varias_linhas_com_chaves_diferentes():
+    query, params = QueryBuilder('logs').insert([{'a': 1, 'b': 2}, {'b': 3, 'c': 4}]).build()
+    assert query == 'INSERT INTO "logs" ("a", "b", "c") VALUES (%s, %s, %s), (%s, %s, %s) RETURNING *'
+    assert params == [1, 2, None, None, 3, 4]
+
+
+def test_upsert():
+    query, params = QueryBuilder('t').upsert({'id': 1, 'nome': 'x'}).build()
+    assert query == ('INSERT INTO "t" ("id", "nome") VALUES (%s, %s) ON CONFLICT ("id")'
+                     ' DO UPDATE SET "nome" = EXCLUDED."nome" RETURNING *')
+    assert params == [1, 'x']
+
+    query, _ = QueryBuilder('t').upsert({'a': 1, 'b': 2}, on_conflict='a, b').build()
+    assert query.endswith('ON CONFLICT ("a", "b") DO NOTHING RETURNING *')
+
+
+def test_update_e_delete_exigem_filtro():
+    query, params = QueryBuilder('usuarios').update({'nome': 'x'}).eq('id', 7).build()
+    assert query == 'UPDATE "usuarios" SET "nome" = %s WHERE "id" = %s RETURNING *'
+    assert params == ['x', 7]
+
+    query, params = QueryBuilder('usuarios').delete().eq('id', 7).build()
+    assert query == 'DELETE FROM "usuarios" WHERE "id" = %s RETURNING *'
+    assert params == [7]
+
+    with pytest.raises(ValueError):
+        QueryBuilder('usuarios').update({'nome': 'x'}).build()
+    with pytest.raises(ValueError):
+        QueryBuilder('usuarios').delete().build()
+
+
+@pytest.mark.parametrize('nome', ['a"b', 'a b', '1a', 'a;--', '', None])
+def test_identificadores_invalidos(nome):
+    with pytest.raises(ValueError):
+        quote_identifier(nome)
+
+
+def test_identificadores_invalidos_na_query():
+    with pytest.raises(ValueError):
+        QueryBuilder('t; DROP TABLE t')
+    with pytest.raises(ValueError):
+        QueryBuilder('t').select('id, nome as x')
+    with pytest.raises(ValueError):
+        QueryBuilder('t').select('*, lojas(nome)')
+    with pytest.raises(ValueError):
+        QueryBuilder('t').order('id desc')
+    with pytest.raises(ValueError):
+        QueryBuilder('t').insert({'a b': 1}).build()
+    with pytest.raises(ValueError):
+        QueryBuilder('t').insert([])
+
+
+def test_formato_sem_valores():
+    formato = (QueryBuilder('produtos_vendidos').select('id')
+               .eq('loja', 'x').in_('categoria', ['a']).gte('periodo_fim', 1).order('id').formato())
+    assert formato == {
+        'tabela': 'produtos_vendidos', 'operacao': 'select', 'colunas': ['id'],
+        'igualdade': ['categoria', 'loja'], 'intervalo': ['periodo_fim'], 'ordem': ['id'],
+    }
@@ -0,0 +1,66 @@
+from unittest import mock
+
+import pytest
+
+from models.replica import ReplicaRouter, ReplicaRoutingClient
+
+
+def _cliente(lag=0.0):
+    primario, replica = mock.Mock(name='primario'), mock.Mock(name='replica')
+    replica.rpc.return_value.execute.return_value.data = lag
+    router = ReplicaRouter(janela_escrita=30, max_lag=5, intervalo_medicao=0)
+    return ReplicaRoutingClient(primario, replica, router), primario, replica
+
+
+@pytest.mark.parametrize('funcao, tabelas', [
+    ('inserir_bloco_importacao', ['produtos_vendidos', 'importacoes_arquivos']),
+    ('substituir_periodo_produtos_vendidos', ['produtos_vendidos']),
+    ('garantir_particoes_futuras', ['estornos_cancelamento', 'dados_indicadores']),
+])
+def test_rpc_de_escrita_abre_janela_das_tabelas(funcao, tabelas):
+    cliente, primario, replica = _cliente()
+    assert cliente.router.usar_replica(['produtos_vendidos'])
+
+    cliente.rpc(funcao, {'p': 1})
+    primario.rpc.assert_called_once_with(funcao, {'p': 1})
+    for tabela in tabelas:
+        assert not cliente.router.usar_replica([tabela], medir=False)
+    assert cliente.router.usar_replica(['usuarios'], medir=False)
+
+    cliente.table('produtos_vendidos').select('*')
+    primario.table.assert_called_with('produtos_vendidos')
+    replica.table.assert_not_called()
+
+
+def test_rpc_desconhecida_abre_janela_geral():
+    cliente, _, _ = _cliente()
+    cliente.rpc('outra_funcao')
+    assert not cliente.router.usar_replica(['usuarios'], medir=False)
+
+
+def test_lag_medido_na_replica():
+    cliente, _, replica = _cliente(lag=2.0)
+    assert cliente.router.usar_replica(['produtos_vendidos'])
+    replica.rpc.assert_called_with('atraso_replicacao', {})
+
+    replica.rpc.return_value.execute.return_value.data = 10.0
+    assert not cliente.router.usar_replica(['produtos_vendidos'])
+
+    # Sem a função na réplica: leituras ficam no primário
+    replica.rpc.return_value.execute.side_effect = RuntimeError('função não existe')
+    assert not cliente.router.usar_replica(['produtos_vendidos'])
+
+
+def test_hashes_lidos_no_primario_sem_abrir_janela():
+    from models.database import Database
+
+    cliente, primario, replica = _cliente()
+    primario.table.return_value.select.return_value.gte.return_value.lte.return_value \
+        .order.return_value.range.return_value.execute.return_value.data = [{'id': 1, 'hash_linha': 5}]
+    banco = Database.__new__(Database)
+    banco.supabase = cliente
+
+    hashes = banco.get_hashes_produtos_vendidos('2025-01-01', '2025-01-31')
+    assert hashes.to_dict('records') == [{'id': 1, 'hash_linha': 5}]
+    replica.table.assert_not_called()
+    assert cliente.router.usar_replica(['produtos_vendidos'], medir=False)
@@ -0,0 +1,113 @@
+import math
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from data.validators import DataValidator, ValidationRule
+
+CASOS = {
+    'text': ['a', '  b ', None, '', ' ', 1, 2.5, 'x' * 300, float('nan')],
+    'integer': ['12', ' 7 ', '-3', '1.5', 'abc', None, '', 0, 5, 5.9, True, float('nan'),
+                '99999999999999999999999'],
+    'float': ['1.234,56', 'x', None, '', 3, 2.5],
+    'date': ['2024-01-02', '02/01/2024', '31/02/2024', 'x', None, '', date(2024, 1, 2),
+             datetime(2024, 1, 2, 3), 45000, '2024-01-02 10:00:00'],
+    'email': ['A@B.com', ' x@y.org ', 'bad', None, ''],
+    'cpf': ['529.982.247-25', '111.111.111-11', '12345678900', None, '123'],
+    'cnpj': ['11.222.333/0001-81', '11.222.333/0001-82', None, '00000000000000'],
+    'money': ['R$ 1.234,56', 'x', None, '', 3],
+}
+
+
+def _nulo(valor):
+    return None if isinstance(valor, float) and math.isnan(valor) else valor
+
+
+@pytest.mark.parametrize('tipo', sorted(CASOS))
+def test_validate_dataframe_igual_a_validate(tipo):
+    validador = DataValidator()
+    valores = CASOS[tipo]
+    resultado = validador.validate_dataframe(pd.DataFrame({'c': pd.Series(valores, dtype=object)}), {'c': tipo})
+
+    for i, valor in enumerate(valores):
+        esperado = validador.validate(_nulo(valor), tipo)
+        regras = {erro.split(':')[0] for erro in esperado.errors}
+        falhas = set(resultado.errors.loc[resultado.errors['row'] == i, 'rule'])
+        assert falhas == regras, (tipo, valor)
+
+        sanitizado = _nulo(resultado.sanitized['c'].iloc[i])
+        original = _nulo(esperado.sanitized_value if esperado.is_valid else valor)
+        assert sanitizado == original and type(sanitizado) is type(original), (tipo, valor)
+
+
+def test_validate_dataframe_indice_e_colunas_fora_do_schema():
+    df = pd.DataFrame({'email': ['a@b.com', 'ruim'], 'extra': [1, 2]}, index=[10, 20])
+    resultado = DataValidator().validate_dataframe(df, {'email': 'email'})
+
+    assert not resultado.is_valid
+    assert resultado.errors.to_dict('records') == [{'row': 20, 'column': 'email', 'rule': 'is_email'}]
+    assert resultado.sanitized['extra'].tolist() == [1, 2]
+    assert resultado.sanitized.index.tolist() == [10, 20]
+    # Célula inválida mantém o valor original
+    assert resultado.sanitized.loc[20, 'email'] == 'ruim'
+    assert resultado.message('email', 'is_email').startswith('is_email: ')
+
+
+def test_validate_dataframe_sem_erros():
+    resultado = DataValidator().validate_dataframe(pd.DataFrame({'n': ['1', '2']}), {'n': 'integer'})
+    assert resultado.is_valid
+    assert list(resultado.errors.columns) == ['row', 'column', 'rule']
+
+
+def test_compile_plan_reaproveita_e_invalida_com_add_rule():
+    validador = DataValidator()
+    plano = validador.compile_plan({'c': 'text'})
+    assert validador.compile_plan({'c': 'text'}) is plano
+
+    validador.add_rule('text', ValidationRule(name='curto', validator=lambda v: v is None or len(v) < 3,
+                                              error_message='Texto longo'))
+    novo = validador.compile_plan({'c': 'text'})
+    assert novo is not plano
+
+    resultado = validador.validate_dataframe(pd.DataFrame({'c': ['ab', 'abcd']}), {'c': 'text'})
+    assert resultado.errors['rule'].tolist() == ['curto']
+    assert resultado.message('c', 'curto') == 'curto: Texto longo'
+
+
+def test_additional_rules_por_coluna():
+    par = ValidationRule(name='par', validator=lambda v: v is None or v % 2 == 0, error_message='Ímpar')
+    df = pd.DataFrame({'a': ['2', '3'], 'b': ['3', '5']})
+    resultado = DataValidator().validate_dataframe(df, {'a': 'integer', 'b': 'integer'}, {'a': [par]})
+
+    assert resultado.errors.to_dict('records') == [{'row': 1, 'column': 'a', 'rule': 'par'}]
+    assert resultado.sanitized['a'].tolist() == [2, '3']
+
+
+def test_validate_row_coleta_todos_os_erros():
+    validador = DataValidator()
+    validador.add_rule('text', ValidationRule(name='sem_x', validator=lambda v: 'x' not in v,
+                                              error_message='Contém x'))
+    linha = {'nome': 'x' * 300, 'n': ' 7 ', 'extra': 'y'}
+    schema = {'nome': 'text', 'n': 'integer'}
+
+    resultados = validador.validate_row(linha, schema)
+    # Mesmo resultado de validate, valor a valor (todas as regras que falham)
+    for coluna, tipo in schema.items():
+        esperado = validador.validate(linha[coluna], tipo)
+        assert resultados[coluna].errors == esperado.errors
+        assert resultados[coluna].sanitized_value == esperado.sanitized_value
+    assert [e.split(':')[0] for e in resultados['nome'].errors] == ['max_length', 'sem_x']
+    assert resultados['n'].is_valid and resultados['n'].sanitized_value == 7
+    assert resultados['extra'].warnings == ['Coluna não mapeada no schema']
+
+
+def test_validate_row_first_error_para_na_primeira_regra():
+    validador = DataValidator()
+    validador.add_rule('text', ValidationRule(name='sem_x', validator=lambda v: 'x' not in v,
+                                              error_message='Contém x'))
+    resultados = validador.validate_row({'nome': 'x' * 300, 'extra': 'y'}, {'nome': 'text'}, first_error=True)
+
+    assert len(resultados['nome'].errors) == 1
+    assert resultados['nome'].errors[0].split(':')[0] in {'max_length', 'sem_x'}
+    assert resultados['extra'].warnings == ['Coluna não mapeada no schema']
@@ -0,0 +1,52 @@
+import json
+import os
+from unittest import mock
+
+import pytest
+
+from services import write_behind as modulo
+from services.write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def fila(tmp_path):
+    # Intervalo longo: os testes chamam flush() diretamente
+    fila = WriteBehindQueue(intervalo_ms=60000, spool_path=str(tmp_path / 'wb.jsonl'), max_tentativas=2)
+    yield fila
+    fila._parar.set()
+    with fila._cond:
+        fila._cond.notify()
+
+
+def test_evento_rejeitado_vai_para_descartados(fila, monkeypatch):
+    def rejeitar(logs):
+        raise RuntimeError('rejeitado')
+    # Sem resolver o backend de verdade (o LazyDatabase testaria a conexão)
+    monkeypatch.setattr(modulo, 'db', mock.Mock(create_logs_auditoria=rejeitar))
+
+    fila.registrar_log_auditoria({'acao': 'a'})
+    assert fila.flush() == 0
+    assert fila._fila                     # primeira falha: continua na fila
+    assert fila.flush() == 0
+    assert not fila._fila                 # esgotou as tentativas
+
+    with open(fila.descartados_path, encoding='utf-8') as f:
+        descartados = [json.loads(linha) for linha in f]
+    assert descartados == [{'tipo': 'log_auditoria', 'dados': {'acao': 'a'}, 'tentativas': 2}]
+    assert not [nome for nome in os.listdir(os.path.dirname(fila.spool_path)) if nome.endswith('.lote')]
+
+
+def test_spool_por_processo(fila, tmp_path, monkeypatch):
+    evento = {'tipo': 'ultimo_acesso', 'usuario_id': 'u1', 'em': '2025-01-01T00:00:00+00:00'}
+    (tmp_path / 'wb.999999999.jsonl').write_text(json.dumps(evento) + '\n')   # processo encerrado
+    vivo = tmp_path / f'wb.{os.getppid()}.jsonl'                              # outro processo ativo
+    vivo.write_text(json.dumps({**evento, 'usuario_id': 'u2'}) + '\n')
+    gravados = []
+    monkeypatch.setattr(modulo, 'db', mock.Mock(update_ultimos_acessos=gravados.append))
+
+    fila.iniciar()
+    assert fila._arquivo == str(tmp_path / f'wb.{os.getpid()}.jsonl')
+    assert fila.flush() == 1
+    assert gravados == [{'u1': evento['em']}]
+    assert vivo.exists()
+    assert not (tmp_path / 'wb.999999999.jsonl').exists()